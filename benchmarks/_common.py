@@ -0,0 +1,113 @@
+"""Shared helpers for the benchmark scripts: percentiles, result files, baselines."""
+
+from __future__ import annotations
+
+import json
+import math
+import platform
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+SRC_DIR = ROOT_DIR / "src"
+
+PERCENTILES = (50, 90, 99)
+
+
+def ensure_src_on_path() -> None:
+    """Make the app's top-level packages (``client``, ``ui``, ``utils``) importable."""
+    if str(SRC_DIR) not in sys.path:
+        sys.path.insert(0, str(SRC_DIR))
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Linear-interpolated percentile of ``values`` (0 <= pct <= 100)."""
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    if low == high:
+        return ordered[low]
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(values: Iterable[float]) -> Dict[str, float]:
+    samples = [float(v) for v in values]
+    summary = {f"p{p}": round(percentile(samples, p), 3) for p in PERCENTILES}
+    summary.update(
+        mean=round(sum(samples) / len(samples), 3) if samples else math.nan,
+        min=round(min(samples), 3) if samples else math.nan,
+        max=round(max(samples), 3) if samples else math.nan,
+        runs=len(samples),
+    )
+    return summary
+
+
+def environment_info() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR, check=True, capture_output=True, text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = "unknown"
+    try:
+        import flet.version
+
+        flet_version = flet.version.version
+    except Exception:
+        flet_version = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "flet": flet_version,
+        "platform": platform.platform(),
+    }
+
+
+def write_results(path: str | Path, results: Dict[str, Any]) -> None:
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def compare_results(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = 0.2,
+    min_delta: float = 2.0,
+    stat: str = "p50",
+) -> List[str]:
+    """Return a message for every metric whose ``stat`` regressed past ``tolerance``.
+
+    A regression must also exceed ``min_delta`` in absolute terms so that
+    sub-millisecond jitter on tiny metrics does not fail the comparison.
+    """
+    regressions = []
+    for name, summary in current.get("metrics", {}).items():
+        base = baseline.get("metrics", {}).get(name)
+        if not base or stat not in base or stat not in summary:
+            continue
+        old, new = base[stat], summary[stat]
+        if new - old > min_delta and new > old * (1 + tolerance):
+            regressions.append(
+                f"{name}: {stat} {old:.2f} -> {new:.2f} (+{(new / old - 1) * 100:.0f}%)"
+                if old else f"{name}: {stat} {old:.2f} -> {new:.2f}"
+            )
+    return regressions
+
+
+def print_report(results: Dict[str, Any]) -> None:
+    env = results.get("environment", {})
+    print(f"commit {env.get('commit')}  python {env.get('python')}  flet {env.get('flet')}")
+    width = max([32, *(len(name) + 2 for name in results.get("metrics", {}))])
+    header = f"{'metric':<{width}}" + "".join(f"{key:>10}" for key in ("p50", "p90", "p99", "mean", "max"))
+    print(header)
+    print("-" * len(header))
+    for name, summary in results.get("metrics", {}).items():
+        print(f"{name:<{width}}" + "".join(f"{summary.get(key, math.nan):>10.2f}"
+                                      for key in ("p50", "p90", "p99", "mean", "max")))
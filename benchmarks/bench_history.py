@@ -0,0 +1,186 @@
+"""Scaling benchmark of the history, analysis and export code on synthetic histories.
+
+Generates 1k/10k/100k records with ``client.synthetic`` (shaped like the
+``history/cursor`` payload, spread over a year) and times, per size:
+
+- ``sync.fetch``: paging through the history over the replay transport;
+- ``history.index``: building a ``HistoryIndex`` and its newest-first order;
+- ``history.filter``: the search/timeframe/sort selections behind
+  ``update_history_grid`` plus the incremental summary chips;
+- ``topk.most_common``: top UP主 and categories of the whole history;
+- ``analysis.generate_data`` and ``analysis.rollups``: raw and pre-aggregated statistics;
+- ``export.csv``: ``export_history_to_csv``;
+- ``wordcloud.generate``: ``generate_wordcloud`` (skipped without wordcloud or the font).
+
+Each case also runs once under ``tracemalloc`` and reports its peak
+allocation as ``<case>@<size>_peak_kb``.
+
+Usage::
+
+    python benchmarks/bench_history.py --runs 5 --output bench/history.json
+    python benchmarks/bench_history.py --sizes 1000 10000 --baseline bench/history.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from _common import compare_results, ensure_src_on_path, environment_info, print_report, summarize, write_results
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+# 模拟一年的观看记录，与设置中最大的历史范围一致
+HISTORY_DAYS = 365
+
+
+def _label(size: int) -> str:
+    return f"{size // 1000}k" if size % 1000 == 0 else str(size)
+
+
+def build_cases(size: int, export_dir: str) -> Dict[str, Callable[[], Any]]:
+    """Name -> zero-argument callable for one history size; setup happens here, not in the timings."""
+    from client.api import iter_watch_history
+    from client.history_refresher import fetch_history_since, record_key
+    from client.synthetic import generate_history, history_cassette
+    from client.transport import ReplayTransport, set_transport
+    from utils.analysis import generate_analysis_data, generate_rollup_analysis
+    from utils.history_exporter import export_history_to_csv
+    from utils.history_model import SORT_DURATION_DESC, SORT_NEWEST, HistoryIndex, SelectionSummary
+    from utils.rollups import HistoryRollups
+    from utils.topk import most_common
+
+    now = int(time.time())
+    records = generate_history(size, days=HISTORY_DAYS, now=now)
+    cassette = history_cassette(records)
+    index = HistoryIndex(records, version=1)
+    index.order(SORT_NEWEST)
+    index.order(SORT_DURATION_DESC)
+    week_ago = now - 7 * 86400
+
+    def sync():
+        set_transport(ReplayTransport(cassette, shift_time=False))
+        try:
+            # 不受每 7 天 20 页的保护上限限制，完整翻完所有页
+            pages = functools.partial(iter_watch_history, max_pages=len(cassette))
+            return fetch_history_since({}, 0, days=HISTORY_DAYS, iter_pages=pages)
+        finally:
+            set_transport(None)
+
+    def build_index():
+        HistoryIndex(records, version=2).order(SORT_NEWEST)
+
+    def filter_grid():
+        # 与历史页一致：先搜索，再缩小到最近 7 天，再按时长排序，摘要增量更新
+        summary = SelectionSummary()
+        for mode, query, since in ((SORT_NEWEST, "", None), (SORT_NEWEST, "游戏", None),
+                                   (SORT_NEWEST, "游戏", week_ago), (SORT_DURATION_DESC, "", week_ago)):
+            summary.update(index, index.select(mode, query=query, since=since))
+        return summary
+
+    def top_k():
+        ups: Dict[str, int] = {}
+        categories: Dict[str, int] = {}
+        for item in records:
+            ups[item["author_name"]] = ups.get(item["author_name"], 0) + 1
+            categories[item["tag_name"]] = categories.get(item["tag_name"], 0) + 1
+        return most_common(ups, 10), most_common(categories, 5)
+
+    rollups = HistoryRollups()
+    rollups.apply(records, record_key)
+
+    cases: Dict[str, Callable[[], Any]] = {
+        "sync.fetch": sync,
+        "history.index": build_index,
+        "history.filter": filter_grid,
+        "topk.most_common": top_k,
+        "analysis.generate_data": lambda: generate_analysis_data(records, days=HISTORY_DAYS, now=now),
+        "analysis.rollups": lambda: generate_rollup_analysis(rollups, days=HISTORY_DAYS, now=now),
+        "export.csv": lambda: export_history_to_csv(records, export_dir),
+    }
+    try:
+        import wordcloud  # noqa: F401
+    except ImportError:
+        print("wordcloud is not installed, skipping wordcloud.generate", file=sys.stderr)
+        return cases
+    from utils.wordcloud_gen import FONT_PATH, generate_wordcloud
+
+    if not os.path.exists(FONT_PATH):
+        print(f"font {FONT_PATH} is missing, skipping wordcloud.generate", file=sys.stderr)
+    else:
+        tags = [item["tag_name"] for item in records]
+        cases["wordcloud.generate"] = lambda: generate_wordcloud(tags, background_color=None)
+    return cases
+
+
+def measure_peak_kb(func: Callable[[], Any]) -> float:
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1,
+                        help="discarded runs per case before measuring")
+    parser.add_argument("--cases", nargs="+", help="only run cases whose name starts with one of these")
+    parser.add_argument("--output", help="write results JSON to this path")
+    parser.add_argument("--baseline", help="compare against a previous results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed relative p50 regression against the baseline")
+    args = parser.parse_args(argv)
+
+    ensure_src_on_path()
+    logging.getLogger("biliinsight").setLevel(logging.WARNING)
+
+    metrics: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory(prefix="biliinsight-bench-") as export_dir:
+        for size in args.sizes:
+            for name, func in build_cases(size, export_dir).items():
+                if args.cases and not name.startswith(tuple(args.cases)):
+                    continue
+                samples = []
+                for index in range(args.warmup + args.runs):
+                    start = time.perf_counter()
+                    func()
+                    elapsed = (time.perf_counter() - start) * 1000
+                    if index >= args.warmup:
+                        samples.append(elapsed)
+                metrics[f"{name}@{_label(size)}_ms"] = summarize(samples)
+                metrics[f"{name}@{_label(size)}_peak_kb"] = summarize([measure_peak_kb(func)])
+
+    results = {
+        "benchmark": "history",
+        "environment": environment_info(),
+        "config": {"sizes": args.sizes, "runs": args.runs, "warmup": args.warmup, "days": HISTORY_DAYS},
+        "metrics": metrics,
+    }
+    print_report(results)
+
+    if args.output:
+        write_results(args.output, results)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fp:
+            regressions = compare_results(results, json.load(fp), args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""Startup and first-paint benchmark.
+
+Drives ``setup_login_screen`` and the post-login ``show_watch_history`` flow on a
+headless page against the local stub server, then reports percentiles for:
+
+- ``import_ms``: fresh-interpreter import of flet plus the login screen chain;
+- ``time_to_qr_ms``: ``setup_login_screen`` until the QR image is visible;
+- ``time_to_first_card_ms``: QR visible until the first history card is on the page;
+- ``time_to_analysis_ms``: one ``show_analysis_overview`` call of the loaded history,
+  i.e. until the summary cards are on the page;
+- ``time_to_analysis_complete_ms``: the same call until every lazily built
+  section has replaced its placeholder;
+- ``warm_start_to_first_card_ms``: ``resume_session`` with the session saved by
+  the cold run until the first (cached) history card is on the page.
+
+Usage::
+
+    python benchmarks/bench_startup.py --runs 20 --output bench/startup.json
+    python benchmarks/bench_startup.py --baseline bench/startup.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from _common import (
+    SRC_DIR,
+    compare_results,
+    ensure_src_on_path,
+    environment_info,
+    print_report,
+    summarize,
+    write_results,
+)
+from stub_server import StubBilibiliServer
+
+_IMPORT_PROBE = """
+import sys, time
+sys.path.insert(0, {src!r})
+start = time.perf_counter()
+import flet
+import utils.logging_config, client.bilibili_client, ui.login_screen
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def measure_import_ms() -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", _IMPORT_PROBE.format(src=str(SRC_DIR))],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def run_once(timeout: float) -> Dict[str, float]:
+    import flet as ft
+
+    from client.bilibili_client import BilibiliClient
+    from headless import HeadlessPage, find_control, is_rendered, wait_for
+    from main import set_page_attribute
+    from ui.login_screen import setup_login_screen
+
+    with HeadlessPage() as headless:
+        page = headless.page
+        client = BilibiliClient()
+
+        start = time.perf_counter()
+        set_page_attribute(page)
+        setup_login_screen(page, client)
+        wait_for(lambda: find_control(
+            page, lambda c: getattr(c, "key", None) == "qr_code" and c.visible and is_rendered(c)), timeout)
+        qr_at = time.perf_counter()
+
+        wait_for(lambda: find_control(
+            page, lambda c: isinstance(c, ft.Card) and is_rendered(c)), timeout)
+        card_at = time.perf_counter()
+
+        history_view = find_control(page, lambda c: getattr(c, "key", None) == "history_view")
+        content_area = history_view.parent
+        from ui.analysis_view import ANALYSIS_PLACEHOLDER_KEY, show_analysis_overview
+
+        analysis_start = time.perf_counter()
+        show_analysis_overview(client, client.history, content_area)
+        analysis_end = time.perf_counter()
+        wait_for(lambda: find_control(
+            page, lambda c: getattr(c, "key", None) == ANALYSIS_PLACEHOLDER_KEY) is None, timeout)
+        analysis_complete = time.perf_counter()
+
+        client.cancel_login_polling()
+        # 等待后台历史拉取写入本地缓存，供下面的热启动使用。
+        wait_for(lambda: client.session_store.history_store(client.user_info["mid"]).load(), timeout)
+        client.history_refresher.stop()
+
+    with HeadlessPage() as headless:
+        page = headless.page
+        warm_client = BilibiliClient()
+
+        warm_start = time.perf_counter()
+        set_page_attribute(page)
+        if not warm_client.resume_session(page):
+            raise RuntimeError("warm start did not find the stored session")
+        wait_for(lambda: find_control(
+            page, lambda c: isinstance(c, ft.Card) and is_rendered(c)), timeout)
+        warm_card_at = time.perf_counter()
+        warm_client.history_refresher.stop()
+
+    return {
+        "time_to_qr_ms": (qr_at - start) * 1000,
+        "time_to_first_card_ms": (card_at - qr_at) * 1000,
+        "time_to_analysis_ms": (analysis_end - analysis_start) * 1000,
+        "time_to_analysis_complete_ms": (analysis_complete - analysis_start) * 1000,
+        "warm_start_to_first_card_ms": (warm_card_at - warm_start) * 1000,
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=1,
+                        help="discarded runs before measuring (module imports, caches)")
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="artificial latency added by the stub server")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--output", help="write results JSON to this path")
+    parser.add_argument("--baseline", help="compare against a previous results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed relative p50 regression against the baseline")
+    args = parser.parse_args(argv)
+
+    with StubBilibiliServer(latency_ms=args.latency_ms) as stub, \
+            tempfile.TemporaryDirectory(prefix="biliinsight-bench-") as data_dir:
+        # 登录会话与历史缓存写入临时目录，不影响本机真实数据。
+        os.environ["BILIINSIGHT_HOME"] = data_dir
+        os.environ["BILIINSIGHT_PASSPORT_BASE_URL"] = stub.base_url
+        os.environ["BILIINSIGHT_API_BASE_URL"] = stub.base_url
+        ensure_src_on_path()
+        import main as app_main  # noqa: F401 - 与 ft.app(main) 相同的日志初始化
+
+        logging.getLogger("biliinsight").setLevel(logging.WARNING)
+
+        samples: Dict[str, List[float]] = {"import_ms": []}
+        for index in range(args.warmup + args.runs):
+            result = run_once(args.timeout)
+            if index < args.warmup:
+                continue
+            samples["import_ms"].append(measure_import_ms())
+            for name, value in result.items():
+                samples.setdefault(name, []).append(value)
+
+    results = {
+        "benchmark": "startup",
+        "environment": environment_info(),
+        "config": {"runs": args.runs, "warmup": args.warmup, "latency_ms": args.latency_ms},
+        "metrics": {name: summarize(values) for name, values in samples.items()},
+    }
+    print_report(results)
+
+    if args.output:
+        write_results(args.output, results)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fp:
+            regressions = compare_results(results, json.load(fp), args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
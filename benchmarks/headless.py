@@ -0,0 +1,139 @@
+"""A real ``ft.Page`` wired to an in-process connection instead of a Flet client.
+
+Control trees are built, diffed and serialized exactly as they would be for a
+desktop window; the resulting JSON is only measured, never sent anywhere.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, Optional
+
+import flet as ft
+from flet.core.local_connection import LocalConnection
+from flet.core.protocol import (
+    ClientActions,
+    ClientMessage,
+    Command,
+    CommandEncoder,
+    PageCommandsBatchResponsePayload,
+    RegisterWebClientRequestPayload,
+)
+
+
+class HeadlessConnection(LocalConnection):
+    """Process page commands locally and keep counters of the outgoing payload."""
+
+    def __init__(self, width: int = 1100, height: int = 700):
+        super().__init__()
+        self._client_details = RegisterWebClientRequestPayload(
+            pageName="",
+            pageRoute="/",
+            pageWidth=str(width),
+            pageHeight=str(height),
+            windowWidth=str(width),
+            windowHeight=str(height),
+            windowTop="0",
+            windowLeft="0",
+            isPWA="false",
+            isWeb="false",
+            isDebug="false",
+            platform="linux",
+            platformBrightness="dark",
+            media="{}",
+            sessionId="headless",
+        )
+        self._lock = threading.Lock()
+        self.bytes_sent = 0
+        self.batches = 0
+
+    def send_commands(self, session_id: str, commands: List[Command]):
+        results = []
+        messages = []
+        for command in commands:
+            result, message = self._process_command(command)
+            if command.name in ["add", "get"]:
+                results.append(result)
+            if message:
+                messages.append(message)
+        if messages:
+            payload = json.dumps(
+                ClientMessage(ClientActions.PAGE_CONTROLS_BATCH, messages),
+                cls=CommandEncoder,
+                separators=(",", ":"),
+            )
+            with self._lock:
+                self.bytes_sent += len(payload.encode("utf-8"))
+                self.batches += 1
+        return PageCommandsBatchResponsePayload(results=results, error="")
+
+    def send_command(self, session_id: str, command: Command):
+        result = self.send_commands(session_id, [command]).results
+        return PageCommandsBatchResponsePayload(results=result, error="")
+
+
+class HeadlessPage:
+    """Own an event loop thread, an executor and a page bound to ``HeadlessConnection``."""
+
+    def __init__(self, width: int = 1100, height: int = 700):
+        self.connection = HeadlessConnection(width, height)
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(
+            target=self._loop.run_forever, name="headless-loop", daemon=True)
+        self._loop_thread.start()
+        self._executor = ThreadPoolExecutor(thread_name_prefix="headless-page")
+        self.page = ft.Page(self.connection, "headless", self._loop, self._executor)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def __enter__(self) -> "HeadlessPage":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def iter_controls(root: ft.Control) -> Iterator[ft.Control]:
+    """Depth-first walk over ``root`` and every control currently beneath it."""
+    stack = [root]
+    while stack:
+        control = stack.pop()
+        yield control
+        stack.extend(child for child in control._get_children() if isinstance(child, ft.Control))
+
+
+def is_rendered(control: ft.Control) -> bool:
+    """True once ``control`` was sent to the connection and has no unsent changes."""
+    if control.uid is None:
+        return False
+    attrs = getattr(control, "_Control__attrs", {})
+    return not any(dirty for _, dirty in attrs.values())
+
+
+def find_control(root: ft.Control, predicate: Callable[[ft.Control], bool]) -> Optional[ft.Control]:
+    for control in iter_controls(root):
+        if predicate(control):
+            return control
+    return None
+
+
+def wait_for(predicate: Callable[[], object], timeout: float = 30.0, interval: float = 0.001):
+    """Poll ``predicate`` until it returns a truthy value and return that value."""
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            value = predicate()
+        except RuntimeError:
+            # 控件树正被工作线程修改，下一轮再检查。
+            value = None
+        if value:
+            return value
+        if time.perf_counter() > deadline:
+            raise TimeoutError("condition not met before timeout")
+        time.sleep(interval)
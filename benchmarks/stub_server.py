@@ -0,0 +1,140 @@
+"""Local stub of the Bilibili endpoints used by the app, backed by recorded fixtures.
+
+Point the client at it through ``BILIINSIGHT_PASSPORT_BASE_URL`` and
+``BILIINSIGHT_API_BASE_URL``. History fixtures are time-shifted so the newest
+record is always "now", which keeps the 7-day window filters meaningful.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+LOGIN_COOKIES = {
+    "SESSDATA": "stub-sessdata",
+    "bili_jct": "stub-bili-jct",
+    "DedeUserID": "1001",
+}
+
+
+def _load_fixture(name: str) -> Dict[str, Any]:
+    with (FIXTURES_DIR / name).open(encoding="utf-8") as fp:
+        return json.load(fp)
+
+
+class StubBilibiliServer:
+    """Serve the QR login, nav and history/cursor endpoints on localhost.
+
+    Args:
+        latency_ms: Artificial delay added to every response.
+        pending_polls: Number of "not scanned" poll answers before the login succeeds.
+    """
+
+    def __init__(self, latency_ms: float = 0.0, pending_polls: int = 0):
+        self.latency_ms = latency_ms
+        self.pending_polls = pending_polls
+        self._poll_count = 0
+        self._qrcode = _load_fixture("qrcode_generate.json")
+        self._poll = _load_fixture("qrcode_poll.json")
+        self._nav = _load_fixture("nav.json")
+        history = _load_fixture("history_cursor.json")
+        self._history_meta = history["data"]
+        records: List[Dict[str, Any]] = sorted(
+            history["data"]["list"], key=lambda x: x["view_at"], reverse=True)
+        shift = int(time.time()) - records[0]["view_at"] if records else 0
+        self._records = [dict(item, view_at=item["view_at"] + shift) for item in records]
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        assert self._server is not None, "server is not running"
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubBilibiliServer":
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802 - http.server API
+                stub._handle(self)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="stub-bilibili", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "StubBilibiliServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def _handle(self, request: BaseHTTPRequestHandler) -> None:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+        url = urlparse(request.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        cookies: Dict[str, str] = {}
+
+        if url.path.endswith("/qrcode/generate"):
+            body = self._qrcode
+        elif url.path.endswith("/qrcode/poll"):
+            body, cookies = self._poll_body()
+        elif url.path.endswith("/web-interface/nav"):
+            body = self._nav
+        elif url.path.endswith("/history/cursor"):
+            body = self._history_page(query)
+        else:
+            request.send_error(404)
+            return
+
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        request.send_response(200)
+        request.send_header("Content-Type", "application/json; charset=utf-8")
+        request.send_header("Content-Length", str(len(payload)))
+        for name, value in cookies.items():
+            request.send_header("Set-Cookie", f"{name}={value}; Path=/")
+        request.end_headers()
+        request.wfile.write(payload)
+
+    def _poll_body(self):
+        self._poll_count += 1
+        if self._poll_count <= self.pending_polls:
+            pending = {"code": 86101, "message": "未扫码"}
+            return {"code": 0, "message": "0", "data": dict(self._poll["data"], url="", **pending)}, {}
+        return self._poll, LOGIN_COOKIES
+
+    def _history_page(self, query: Dict[str, str]) -> Dict[str, Any]:
+        page_size = int(query.get("ps", 20))
+        cursor_view_at = int(query.get("view_at", 0) or 0)
+        records = self._records
+        if cursor_view_at:
+            records = [item for item in records if item["view_at"] < cursor_view_at]
+        page = records[:page_size]
+
+        cursor = {"max": 0, "view_at": 0, "business": "", "ps": page_size}
+        if page:
+            last = page[-1]
+            cursor.update(max=last["kid"], view_at=last["view_at"], business="archive")
+        data = dict(self._history_meta, cursor=cursor, list=page)
+        return {"code": 0, "message": "0", "ttl": 1, "data": data}
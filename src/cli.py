@@ -0,0 +1,248 @@
+"""Headless command line entry point: log in, sync, export and summarize watch history.
+
+Usage::
+
+    python src/cli.py login
+    python src/cli.py sync [--account MID | --all] [--days 7] [--jobs 3] [--rate 4]
+    python src/cli.py export --format csv|json [--output exports]
+    python src/cli.py stats [--days 7] [--json]
+    python src/cli.py --metrics metrics.prom sync   # 结束时写入耗时统计
+
+Nothing here imports ``flet``. Sessions and synced history live in the same
+per-account directories as the GUI (see ``client.storage``), so a session
+created by either front end works in the other. ``sync --all`` syncs every
+stored account concurrently through ``client.account_manager``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+import threading
+from typing import Any, Dict, List, Optional
+
+from client.account_manager import (
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_RATE,
+    SYNC_EXPIRED,
+    SYNC_OK,
+    AccountManager,
+)
+from client.api import check_login_status, get_qr_login_url, get_user_info
+from client.login_poller import STATUS_SCANNED, STATUS_SUCCESS, LoginPoller
+from client.rate_limit import TokenBucket
+from client.storage import SessionStore
+
+logger = logging.getLogger("biliinsight.cli")
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_NOT_LOGGED_IN = 2
+
+
+def _configure_logging(verbose: bool) -> None:
+    # CLI 的日志只写到 stderr，不创建 Log 目录，stdout 留给命令输出。
+    root = logging.getLogger("biliinsight")
+    root.handlers.clear()
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(name)s - %(message)s"))
+    root.addHandler(handler)
+    root.setLevel(logging.DEBUG if verbose else logging.WARNING)
+    root.propagate = False
+
+
+def _error(message: str) -> None:
+    print(message, file=sys.stderr)
+
+
+def _resolve_account(store: SessionStore, account: Optional[str]) -> Optional[str]:
+    return str(account) if account else store.active_account()
+
+
+def _load_history(store: SessionStore, account: Optional[str]) -> Optional[List[Dict[str, Any]]]:
+    mid = _resolve_account(store, account)
+    if mid is None:
+        _error("没有可用的账号，请先运行 login 和 sync")
+        return None
+    records = store.history_store(mid).load()
+    if not records:
+        _error(f"账号 {mid} 没有本地历史记录，请先运行 sync")
+        return None
+    return records
+
+
+def cmd_login(args: argparse.Namespace, store: SessionStore) -> int:
+    result = get_qr_login_url()
+    if result is None:
+        _error("获取登录二维码失败")
+        return EXIT_ERROR
+    qrcode_key, url = result
+
+    import qrcode
+
+    qr = qrcode.QRCode(border=1)
+    qr.add_data(url)
+    qr.print_ascii(out=sys.stdout, invert=True)
+    print(f"请使用哔哩哔哩 App 扫码登录，或打开: {url}")
+
+    done = threading.Event()
+    outcome: Dict[str, Any] = {}
+
+    def on_result(status: int, cookies: Any) -> None:
+        outcome.update(status=status, cookies=cookies)
+        done.set()
+
+    def on_status(status: int) -> None:
+        if status == STATUS_SCANNED:
+            print("已扫码，请在手机上确认登录")
+
+    poller = LoginPoller(check_login_status, timeout=args.timeout)
+    poller.start(qrcode_key, on_result, on_status)
+    try:
+        done.wait()
+    except KeyboardInterrupt:
+        poller.cancel()
+        return EXIT_ERROR
+
+    if outcome["status"] != STATUS_SUCCESS:
+        _error(f"登录未完成，状态码: {outcome['status']}")
+        return EXIT_ERROR
+
+    user_info = get_user_info(outcome["cookies"])
+    if not user_info:
+        _error("登录成功，但获取用户信息失败")
+        return EXIT_ERROR
+    store.save(outcome["cookies"], user_info)
+    print(f"登录成功: {user_info['uname']} ({user_info['mid']})")
+    return EXIT_OK
+
+
+def cmd_sync(args: argparse.Namespace, store: SessionStore) -> int:
+    if args.all:
+        mids = None
+    else:
+        mid = _resolve_account(store, args.account)
+        if mid is None or store.load(mid) is None:
+            _error("没有有效的本地登录会话，请先运行 login")
+            return EXIT_NOT_LOGGED_IN
+        mids = [mid]
+
+    from client.history_refresher import record_key, rollup_retain_since
+    from utils.rollups import update_rollup_store
+
+    retain_since = rollup_retain_since(args.days)
+
+    def on_synced(account, records):
+        # 同步时增量更新按天预聚合的统计表，stats 不再扫描原始记录
+        update_rollup_store(store.rollup_store(account.mid), records, record_key, retain_since)
+
+    manager = AccountManager(store, max_workers=args.jobs, rate_limiter=TokenBucket(args.rate),
+                             on_synced=on_synced)
+    results = manager.sync_all(mids, days=args.days)
+    if not results:
+        _error("没有有效的本地登录会话，请先运行 login")
+        return EXIT_NOT_LOGGED_IN
+
+    code = EXIT_OK
+    for result in results:
+        if result["status"] == SYNC_OK:
+            print(f"{result['uname']} ({result['mid']}): 同步 {result['records']} 条记录")
+        elif result["status"] == SYNC_EXPIRED:
+            _error(f"账号 {result['mid']} 的登录已失效，请重新运行 login")
+            code = max(code, EXIT_NOT_LOGGED_IN)
+        else:
+            _error(f"账号 {result['mid']} 同步失败: {result['error']}")
+            code = max(code, EXIT_ERROR)
+    return code
+
+
+def cmd_export(args: argparse.Namespace, store: SessionStore) -> int:
+    records = _load_history(store, args.account)
+    if records is None:
+        return EXIT_ERROR
+
+    from utils.history_exporter import export_history_to_csv, export_history_to_json
+
+    exporter = export_history_to_json if args.format == "json" else export_history_to_csv
+    print(exporter(records, args.output))
+    return EXIT_OK
+
+
+def cmd_stats(args: argparse.Namespace, store: SessionStore) -> int:
+    records = _load_history(store, args.account)
+    if records is None:
+        return EXIT_ERROR
+
+    from client.history_refresher import record_key
+    from utils.analysis import generate_personality_report, generate_rollup_analysis
+    from utils.rollups import HistoryRollups
+
+    rollups = HistoryRollups.from_dict(store.rollup_store(_resolve_account(store, args.account)).load())
+    # 兼容同步时尚未生成统计表的本地记录；已计入的观看不会重复统计
+    rollups.apply(records, record_key)
+    data = generate_rollup_analysis(rollups, days=args.days)
+    if args.json:
+        print(json.dumps(data, ensure_ascii=False, indent=2))
+        return EXIT_OK
+
+    print(f"观看总数: {data['total_videos']} 个")
+    print(f"累计时长: {data['total_hours']} 小时")
+    print(f"活跃天数: {data['active_days']} 天")
+    print(f"观看连击: {data['viewing_streak']} 天")
+    print(f"常看分区: {data['top_category']}")
+    print(f"常看UP: {data['top_up_name']}")
+    print()
+    print(generate_personality_report(data))
+    return EXIT_OK
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="biliinsight", description="Bilibili Insight 命令行工具")
+    parser.add_argument("--home", help="数据目录，默认 $BILIINSIGHT_HOME 或 ~/.biliinsight")
+    parser.add_argument("-v", "--verbose", action="store_true", help="输出调试日志")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="结束时写入耗时统计，.prom 为 Prometheus 文本格式，其余为 JSON")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    login = subparsers.add_parser("login", help="在终端扫码登录并保存会话")
+    login.add_argument("--timeout", type=float, default=360, help="等待扫码的最长时间（秒）")
+    login.set_defaults(handler=cmd_login)
+
+    sync = subparsers.add_parser("sync", help="拉取观看历史并保存到本地")
+    sync.add_argument("--account", help="账号 mid，默认最近登录的账号")
+    sync.add_argument("--all", action="store_true", help="并行同步所有已保存的账号")
+    sync.add_argument("--days", type=int, default=7, help="同步最近几天的记录")
+    sync.add_argument("--jobs", type=int, default=DEFAULT_MAX_WORKERS, help="同时请求的最大账号数")
+    sync.add_argument("--rate", type=float, default=DEFAULT_RATE, help="全局每秒最多请求次数")
+    sync.set_defaults(handler=cmd_sync)
+
+    export = subparsers.add_parser("export", help="导出本地历史记录")
+    export.add_argument("--account", help="账号 mid，默认最近登录的账号")
+    export.add_argument("--format", choices=("csv", "json"), default="csv")
+    export.add_argument("--output", default="exports", help="导出目录")
+    export.set_defaults(handler=cmd_export)
+
+    stats = subparsers.add_parser("stats", help="输出观看数据统计")
+    stats.add_argument("--account", help="账号 mid，默认最近登录的账号")
+    stats.add_argument("--days", type=int, default=7, help="每日统计覆盖的天数，如 7/30/365")
+    stats.add_argument("--json", action="store_true", help="以 JSON 输出完整统计数据")
+    stats.set_defaults(handler=cmd_stats)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    _configure_logging(args.verbose)
+    try:
+        return args.handler(args, SessionStore(args.home))
+    finally:
+        if args.metrics:
+            from utils.metrics import REGISTRY
+
+            REGISTRY.dump(args.metrics)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
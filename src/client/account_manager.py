@@ -0,0 +1,191 @@
+"""Concurrent, rate-limited and fair history sync for every locally stored account."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional
+
+from client.api import HistoryFetchError, get_nav_info, iter_watch_history
+from client.rate_limit import TokenBucket
+from client.storage import HistoryStore, SessionStore
+
+logger = logging.getLogger("biliinsight.client.account_manager")
+
+# 同步结果状态
+SYNC_OK = "ok"
+SYNC_EXPIRED = "expired"
+SYNC_ERROR = "error"
+
+# 默认并发与全局限流：同时最多 3 个账号在请求，总体不超过每秒 4 次请求
+DEFAULT_MAX_WORKERS = 3
+DEFAULT_RATE = 4.0
+
+ProgressCallback = Callable[["Account"], None]
+SyncedCallback = Callable[["Account", List[Dict[str, Any]]], None]
+
+
+class Account:
+    """Cookies, cached user info and history store of one stored account."""
+
+    def __init__(self, mid: str, session: Dict[str, Any], history_store: HistoryStore):
+        self.mid = mid
+        self.cookies: Dict[str, str] = session["cookies"]
+        self.user_info: Dict[str, Any] = session.get("user_info") or {"mid": mid}
+        self.history_store = history_store
+        self.pages = 0
+        self.records = 0
+        self.status: Optional[str] = None
+        self.error: Optional[str] = None
+        self.last_sync: Optional[float] = None
+
+    @property
+    def name(self) -> str:
+        return self.user_info.get("uname") or self.mid
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            "mid": self.mid,
+            "uname": self.name,
+            "status": self.status,
+            "records": self.records,
+            "pages": self.pages,
+            "error": self.error,
+        }
+
+
+class AccountManager:
+    """Sync the watch history of several accounts through one bounded worker pool.
+
+    Every account is driven as a sequence of single-request steps (login check,
+    then one history page per step). A dispatcher hands steps to at most
+    ``max_workers`` threads in round-robin order, with at most one step in
+    flight per account, and takes a token from the shared ``rate_limiter``
+    before each request. An account with many pages therefore advances one
+    page per turn and cannot hold back accounts with only a few.
+
+    Args:
+        session_store: Where sessions and per-account history are stored.
+        max_workers: Maximum number of concurrent requests.
+        rate_limiter: Request budget, also used by the client's own history
+            fetches; defaults to ``DEFAULT_RATE`` requests/s.
+        get_nav: ``cookies -> nav data`` (``client.api.get_nav_info``).
+        iter_pages: ``(cookies, days) -> iterator of record pages``.
+        on_synced: ``(account, records)`` called from a worker thread after an
+            account's history was saved, e.g. to update its statistics tables.
+    """
+
+    def __init__(
+        self,
+        session_store: Optional[SessionStore] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        rate_limiter: Optional[TokenBucket] = None,
+        get_nav: Callable[[Any], Optional[Dict[str, Any]]] = get_nav_info,
+        iter_pages: Callable[..., Iterator[List[Dict[str, Any]]]] = iter_watch_history,
+        on_synced: Optional[SyncedCallback] = None,
+    ):
+        self.session_store = session_store or SessionStore()
+        self.max_workers = max(1, max_workers)
+        self.rate_limiter = rate_limiter or TokenBucket(DEFAULT_RATE)
+        self._get_nav = get_nav
+        self._iter_pages = iter_pages
+        self._on_synced = on_synced
+        self._lock = threading.Lock()
+
+    def load_accounts(self, mids: Optional[Iterable[Any]] = None) -> List[Account]:
+        """Return the accounts in ``mids`` (default: all stored ones) with a valid session."""
+        accounts = []
+        for mid in (mids if mids is not None else self.session_store.list_accounts()):
+            mid = str(mid)
+            session = self.session_store.load(mid)
+            if session is None:
+                logger.info("账号 %s 没有有效的本地会话，跳过", mid)
+                continue
+            accounts.append(Account(mid, session, self.session_store.history_store(mid)))
+        return accounts
+
+    def sync_all(self, mids: Optional[Iterable[Any]] = None, days: int = 7,
+                 on_progress: Optional[ProgressCallback] = None) -> List[Dict[str, Any]]:
+        """Sync the given accounts (default: all stored ones) and return one result per account.
+
+        Only one ``sync_all`` runs at a time; ``on_progress(account)`` is called
+        from the dispatcher thread after every finished account.
+        """
+        with self._lock:
+            accounts = self.load_accounts(mids)
+            if not accounts:
+                return []
+            self._run(accounts, days, on_progress)
+            return [account.result() for account in accounts]
+
+    def _run(self, accounts: List[Account], days: int,
+             on_progress: Optional[ProgressCallback]) -> None:
+        ready: Deque[tuple] = deque((account, self._sync_steps(account, days)) for account in accounts)
+        in_flight: Dict[Future, tuple] = {}
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix="biliinsight-sync") as executor:
+            while ready or in_flight:
+                while ready and len(in_flight) < self.max_workers:
+                    job = ready.popleft()
+                    self.rate_limiter.acquire()
+                    in_flight[executor.submit(next, job[1], None)] = job
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    account, steps = in_flight.pop(future)
+                    try:
+                        finished = future.result() is None
+                    except HistoryFetchError as exc:
+                        account.status, account.error, finished = SYNC_ERROR, str(exc), True
+                    except Exception as exc:  # pragma: no cover - unexpected bugs
+                        logger.exception("同步账号 %s 时发生错误: %s", account.mid, exc)
+                        account.status, account.error, finished = SYNC_ERROR, str(exc), True
+                    if finished:
+                        logger.info("账号 %s 同步结束: %s，%s 条记录，%s 页",
+                                    account.mid, account.status, account.records, account.pages)
+                        if on_progress:
+                            on_progress(account)
+                    else:
+                        # 完成一步后排到队尾，实现按页轮转。
+                        ready.append((account, steps))
+
+        logger.info("%s 个账号同步完成，耗时 %.0f ms",
+                    len(accounts), (time.perf_counter() - started) * 1000)
+
+    def _sync_steps(self, account: Account, days: int) -> Iterator[bool]:
+        """Generator whose every ``next()`` sends exactly one request for ``account``."""
+        nav = self._get_nav(account.cookies)
+        if nav is None:
+            raise HistoryFetchError("验证登录状态失败")
+        if not nav.get("isLogin", True):
+            self.session_store.clear(account.mid)
+            account.status = SYNC_EXPIRED
+            return
+        account.user_info = {
+            "uname": nav.get("uname", account.name),
+            "mid": nav.get("mid", account.mid),
+            "face": nav.get("face", account.user_info.get("face")),
+        }
+        yield True
+
+        records: List[Dict[str, Any]] = []
+        for page in self._iter_pages(account.cookies, days=days):
+            account.pages += 1
+            records.extend(page)
+            yield True
+
+        if records:
+            account.history_store.save(records)
+            if self._on_synced:
+                self._on_synced(account, records)
+        else:
+            logger.warning("账号 %s 未获取到历史记录，保留本地缓存", account.mid)
+        self.session_store.touch(account.mid, account.user_info)
+        account.records = len(records)
+        account.status = SYNC_OK
+        account.last_sync = time.time()
@@ -1,9 +1,15 @@
+from __future__ import annotations
+
+import base64
 import logging
+import os
 import threading
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from io import BytesIO
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
 
-import requests
+if TYPE_CHECKING:
+    import requests
 
 logger = logging.getLogger("biliinsight.client.api")
 
@@ -12,41 +18,53 @@ HEADERS = {
 }
 
 REQUEST_TIMEOUT = 10
+QR_CODE_SIZE = 220
+# 每 7 天时间范围最多请求的历史记录页数，防止游标异常时无限循环
+HISTORY_MAX_PAGES = 20
+# 允许通过环境变量指向本地桩服务（基准测试、离线调试）。
+PASSPORT_BASE_URL = os.environ.get(
+    "BILIINSIGHT_PASSPORT_BASE_URL", "https://passport.bilibili.com").rstrip("/")
+API_BASE_URL = os.environ.get(
+    "BILIINSIGHT_API_BASE_URL", "https://api.bilibili.com").rstrip("/")
 _THREAD_LOCAL = threading.local()
 
 
 def _get_session() -> requests.Session:
-    """Return a per-thread requests session for connection reuse."""
+    """Return a per-thread requests session for connection reuse.
+
+    ``requests`` is imported lazily so that importing this module stays cheap
+    on the startup path; the first network call pays for the import instead.
+    When a record/replay transport is active (see ``client.transport``) it is
+    returned instead.
+    """
+    from client.transport import get_transport
+
+    transport = get_transport()
+    if transport is not None:
+        return transport
     session = getattr(_THREAD_LOCAL, "session", None)
     if session is None:
+        import requests
+
         session = requests.Session()
         session.headers.update(HEADERS)
         _THREAD_LOCAL.session = session
     return session
 
 
-def get_qr_code() -> Optional[Tuple[str, str]]:
-    """Get Bilibili login QR code and return the QR code key."""
-    try:
-        import qrcode
+def get_qr_login_url() -> Optional[Tuple[str, str]]:
+    """Request a new QR login session and return ``(qrcode_key, url)``."""
+    import requests
 
+    try:
         response = _get_session().get(
-            "https://passport.bilibili.com/x/passport-login/web/qrcode/generate",
+            f"{PASSPORT_BASE_URL}/x/passport-login/web/qrcode/generate",
             timeout=REQUEST_TIMEOUT,
         )
         response.raise_for_status()
         data = response.json()
         if data["code"] == 0:
-            qr_code_url = data["data"]["url"]
-            login_qrcode_key = data["data"]["qrcode_key"]
-            timestamp = int(time.time())
-            qr_file_path = f"qr_code_{timestamp}.png"
-
-            # 生成二维码图片
-            img = qrcode.make(qr_code_url)
-            img.save(qr_file_path)
-
-            return login_qrcode_key, qr_file_path
+            return data["data"]["qrcode_key"], data["data"]["url"]
 
         return None
     except (requests.RequestException, KeyError) as e:
@@ -54,11 +72,51 @@ def get_qr_code() -> Optional[Tuple[str, str]]:
         return None
 
 
+def get_qr_code(size: int = QR_CODE_SIZE) -> Optional[Tuple[str, str]]:
+    """Get Bilibili login QR code and return the QR code key with a base64 PNG.
+
+    The image is rendered in memory at exactly ``size`` x ``size`` pixels so the
+    UI can show it without scaling and nothing is written to disk.
+    """
+    result = get_qr_login_url()
+    if result is None:
+        return None
+    login_qrcode_key, qr_code_url = result
+    return login_qrcode_key, _render_qr_code_base64(qr_code_url, size)
+
+
+def _render_qr_code_base64(content: str, size: int) -> str:
+    """Render ``content`` as a ``size``-pixel square PNG and return it base64-encoded."""
+    import qrcode
+    from PIL import Image
+
+    qr = qrcode.QRCode(border=2)
+    qr.add_data(content)
+    qr.make(fit=True)
+
+    # 取不超过目标尺寸的最大整数模块宽度，保证像素边缘清晰，再居中补白到精确尺寸。
+    modules = qr.modules_count + qr.border * 2
+    qr.box_size = max(size // modules, 1)
+    img = qr.make_image(fill_color="black", back_color="white").get_image().convert("RGB")
+    if img.size[0] > size:
+        img = img.resize((size, size), Image.NEAREST)
+
+    canvas = Image.new("RGB", (size, size), "white")
+    offset = (size - img.size[0]) // 2
+    canvas.paste(img, (offset, offset))
+
+    buffer = BytesIO()
+    canvas.save(buffer, format="PNG", optimize=True)
+    return base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
 def check_login_status(qrcode_key: str) -> Tuple[int, Optional[requests.cookies.RequestsCookieJar]]:
     """Check QR code login status."""
+    import requests
+
     try:
         response = _get_session().get(
-            f"https://passport.bilibili.com/x/passport-login/web/qrcode/poll?qrcode_key={qrcode_key}",
+            f"{PASSPORT_BASE_URL}/x/passport-login/web/qrcode/poll?qrcode_key={qrcode_key}",
             timeout=REQUEST_TIMEOUT,
         )
         response.raise_for_status()
@@ -74,11 +132,17 @@ def check_login_status(qrcode_key: str) -> Tuple[int, Optional[requests.cookies.
         return -1, None
 
 
-def get_user_info(cookies) -> Optional[Dict[str, Any]]:
-    """Get user information using the login cookies."""
+def get_nav_info(cookies) -> Optional[Dict[str, Any]]:
+    """Return the ``data`` of ``/x/web-interface/nav``, or None if the request failed.
+
+    A successful response whose ``isLogin`` is false means the cookies are no
+    longer valid, which lets callers tell an expired session from a network error.
+    """
+    import requests
+
     try:
         response = _get_session().get(
-            "https://api.bilibili.com/x/web-interface/nav",
+            f"{API_BASE_URL}/x/web-interface/nav",
             cookies=cookies,
             timeout=REQUEST_TIMEOUT,
         )
@@ -86,110 +150,163 @@ def get_user_info(cookies) -> Optional[Dict[str, Any]]:
         data = response.json()
 
         if data["code"] == 0:
-            user_info = data["data"]
-            return {
-                "uname": user_info["uname"],
-                "mid": user_info["mid"],
-                "face": user_info["face"],
-            }
-        else:
-            print(f"Failed to get user info: {data['message']}")
-            return None
-    except (requests.RequestException, KeyError) as e:
+            return data["data"]
+        if data["code"] == -101:  # 账号未登录
+            return {"isLogin": False}
+        print(f"Failed to get user info: {data['message']}")
+        return None
+    except (requests.RequestException, KeyError, ValueError) as e:
         print(f"Error getting user info: {e}")
         return None
 
 
-def get_watch_history(cookies, days=7, page_size=30) -> Optional[List[Dict[str, Any]]]:
+def get_user_info(cookies) -> Optional[Dict[str, Any]]:
+    """Get user information using the login cookies."""
+    nav = get_nav_info(cookies)
+    if not nav or not nav.get("isLogin", True):
+        return None
+    try:
+        return {
+            "uname": nav["uname"],
+            "mid": nav["mid"],
+            "face": nav["face"],
+        }
+    except KeyError as e:
+        print(f"Error getting user info: {e}")
+        return None
+
+
+class HistoryFetchError(RuntimeError):
+    """A history page could not be fetched (network error or non-zero API code)."""
+
+
+def fetch_history_page(cookies, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Request one page of ``/x/web-interface/history/cursor`` and return its ``data``.
+
+    Raises:
+        HistoryFetchError: If the request fails or the API reports an error.
     """
-    获取完整的观看历史记录，通过多次分页请求获取全部数据。
+    import requests
+
+    from utils.metrics import span
+
+    with span("api.history_page") as page_span:
+        try:
+            response = _get_session().get(
+                f"{API_BASE_URL}/x/web-interface/history/cursor",
+                cookies=cookies,
+                params=params,
+                timeout=REQUEST_TIMEOUT,
+            )
+            response.raise_for_status()
+            page_span.bytes = len(response.content)
+            data = response.json()
+        except (requests.RequestException, ValueError) as e:
+            raise HistoryFetchError(f"请求历史记录失败: {e}") from e
+
+        if data.get("code") != 0:
+            raise HistoryFetchError(f"获取观看历史失败: {data.get('message', '未知错误')}")
+        page_data = data.get("data") or {}
+        page_span.count = len(page_data.get("list") or [])
+    return page_data
+
+
+def iter_watch_history(cookies, days=7, page_size=30, max_pages=None,
+                       rate_limiter=None) -> Iterator[List[Dict[str, Any]]]:
+    """
+    逐页获取观看历史，每次迭代只发送一次请求，便于调用方在页之间调度或限流。
 
     Args:
         cookies: 用户登录的cookies
         days: 获取最近几天的记录，默认7天
         page_size: 每页返回的记录数，默认30条(API最大允许值)
+        max_pages: 最多请求的页数，默认每 7 天 HISTORY_MAX_PAGES 页
+        rate_limiter: 每次请求前从中取一个令牌（``client.rate_limit.TokenBucket``）
 
-    Returns:
-        历史记录列表
+    Yields:
+        每页中位于时间范围内的记录
+
+    Raises:
+        HistoryFetchError: 某一页请求失败
     """
-    all_history = []
-    page_size = 30  # 最大页大小
-    current_time = int(time.time())
-    one_week_ago = current_time - (days * 24 * 60 * 60)
+    one_week_ago = int(time.time()) - (days * 24 * 60 * 60)
+    if max_pages is None:
+        max_pages = HISTORY_MAX_PAGES * max(1, -(-days // 7))
 
     # 设置初始请求参数 - 不指定view_at，先获取最新的记录
-    params = {
+    params: Dict[str, Any] = {
         "ps": page_size,
         "type": "all"
     }
 
     total_pages = 0
-    try:
-        while True:
-            total_pages += 1
-            logger.debug(f"获取历史记录第{total_pages}页，参数：{params}")
-
-            response = _get_session().get(
-                "https://api.bilibili.com/x/web-interface/history/cursor",
-                cookies=cookies,
-                params=params,
-                timeout=REQUEST_TIMEOUT,
-            )
-            response.raise_for_status()
-            data = response.json()
+    while True:
+        total_pages += 1
+        logger.debug("获取历史记录第%s页，参数：%s", total_pages, params)
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        data = fetch_history_page(cookies, params)
+
+        # 提取记录
+        history_list = data.get("list") or []
+        if not history_list:
+            logger.debug("没有更多记录，结束获取")
+            return
+
+        # 只保留时间范围内的记录
+        filtered_list = [item for item in history_list if item.get("view_at", 0) >= one_week_ago]
+        logger.debug("本页获取%s条记录，过滤后保留%s条", len(history_list), len(filtered_list))
+        yield filtered_list
+
+        # 检查是否已经超出时间范围 - 如果本页最后一条记录时间早于一周前，不再继续
+        if history_list[-1].get("view_at", 0) < one_week_ago:
+            logger.debug("已到达时间范围边界，停止获取")
+            return
+
+        # 检查是否有下一页 - 获取游标
+        cursor = data.get("cursor")
+        if not cursor:
+            logger.debug("没有游标信息，结束获取")
+            return
+
+        # 检查获取页数是否过多，防止无限循环
+        if total_pages >= max_pages:
+            logger.warning("达到最大页数限制，停止获取")
+            return
+
+        # 更新参数用于获取下一页
+        params = {
+            "type": "all",
+            "ps": page_size
+        }
+
+        # 添加游标参数
+        for key in ("max", "view_at", "business"):
+            if cursor.get(key):
+                params[key] = cursor[key]
+
+
+def get_watch_history(cookies, days=7, page_size=30, iter_pages=None) -> Optional[List[Dict[str, Any]]]:
+    """
+    获取完整的观看历史记录，通过多次分页请求获取全部数据。
 
-            if data["code"] != 0:
-                logger.error(f"获取观看历史失败: {data.get('message', '未知错误')}")
-                break
-
-            # 提取记录
-            history_list = data["data"]["list"]
-            if not history_list:
-                logger.debug("没有更多记录，结束获取")
-                break
-
-            # 检查返回数据中是否有需要的信息
-            filtered_list = []
-            for item in history_list:
-                view_at = item.get("view_at", 0)
-                # 只保留一周内的记录
-                if view_at >= one_week_ago:
-                    filtered_list.append(item)
-
-            logger.debug(
-                f"本页获取{len(history_list)}条记录，过滤后保留{len(filtered_list)}条")
-            all_history.extend(filtered_list)
-
-            # 检查是否已经超出时间范围 - 如果本页最后一条记录时间早于一周前，不再继续
-            if history_list and history_list[-1].get("view_at", 0) < one_week_ago:
-                logger.debug("已到达时间范围边界，停止获取")
-                break
-
-            # 检查是否有下一页 - 获取游标
-            cursor = data["data"].get("cursor")
-            if not cursor:
-                logger.debug("没有游标信息，结束获取")
-                break
-
-            # 检查获取页数是否过多，防止无限循环
-            if total_pages >= 20:  # 设置合理的上限，通常一周的记录不会超过20页
-                logger.warning("达到最大页数限制，停止获取")
-                break
-
-            # 更新参数用于获取下一页
-            params = {
-                "type": "all",
-                "ps": page_size
-            }
-
-            # 添加游标参数
-            if cursor.get("max"):
-                params["max"] = cursor.get("max")
-            if cursor.get("view_at"):
-                params["view_at"] = cursor.get("view_at")
-            if cursor.get("business"):
-                params["business"] = cursor.get("business")
+    Args:
+        cookies: 用户登录的cookies
+        days: 获取最近几天的记录，默认7天
+        page_size: 每页返回的记录数，默认30条(API最大允许值)
+        iter_pages: 替代 :func:`iter_watch_history` 的分页函数，例如用于统计页数
 
+    Returns:
+        历史记录列表；中途出错时返回已获取的部分
+    """
+    all_history: List[Dict[str, Any]] = []
+    total_pages = 0
+    try:
+        for page in (iter_pages or iter_watch_history)(cookies, days=days, page_size=page_size):
+            total_pages += 1
+            all_history.extend(page)
+    except HistoryFetchError as e:
+        logger.error(str(e))
     except Exception as e:
         logger.exception(f"获取完整观看历史时发生错误: {e}")
 
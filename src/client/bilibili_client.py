@@ -1,15 +1,51 @@
+import logging
+import os
 import threading
 import time
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Callable, Dict, List, Optional, Any, Tuple
 
 import flet as ft
 
+from client.account_manager import SYNC_OK, AccountManager
 from client.api import (
+    QR_CODE_SIZE,
     get_qr_code,
     check_login_status,
+    get_nav_info,
     get_user_info,
     get_watch_history
 )
+from client.history_refresher import (
+    DEFAULT_REFRESH_INTERVAL,
+    HISTORY_WINDOW_DAYS,
+    HistoryRefresher,
+    PageCounter,
+    fetch_history_since,
+    merge_history,
+    record_key,
+    rollup_retain_since,
+)
+from client.login_poller import (
+    STATUS_EXPIRED,
+    STATUS_SUCCESS,
+    STATUS_TIMEOUT,
+    LoginPoller,
+)
+from client.storage import HistoryStore, SessionStore, SettingsStore
+from utils.cache import LRUCache
+from utils.history_model import HistoryIndex
+from utils.rollups import HistoryRollups
+
+logger = logging.getLogger("biliinsight.client.bilibili_client")
+
+# 缓存的历史卡片数量上限，约等于一次 7 天全量同步的最大记录数（20 页 × 30 条）
+CARD_CACHE_SIZE = 600
+# 缓存的图表图片数量上限（按历史版本和主题区分）
+CHART_CACHE_SIZE = 16
+# 缓存的词云图片数量上限（按历史版本和背景色区分）
+WORDCLOUD_CACHE_SIZE = 4
+
+HistoryListener = Callable[[Dict[str, Any]], Optional[bool]]
 
 
 class BilibiliClient:
@@ -26,71 +62,98 @@ class BilibiliClient:
     # Common colors
     THEME_PRIMARY = "#FB7299"  # Bilibili Pink
     THEME_SECONDARY = "#505050"  # Secondary elements
-    LOGIN_POLL_INTERVAL_SECONDS = 2
-    LOGIN_POLL_MAX_RETRIES = 180
 
-    def __init__(self):
+    def __init__(self, session_store: Optional[SessionStore] = None):
         self.login_cookies = None
+        self.user_info: Optional[Dict[str, Any]] = None
+        self.session_store = session_store or SessionStore()
         self.tag_names = []
         self.history: List[Dict[str, Any]] = []
-        self.is_dark_theme = True  # 默认为深色主题
+        # 每次 history 内容变化时递增，视图据此判断缓存是否过期
+        self.history_version = 0
+        self._history_lock = threading.Lock()
+        self._history_listeners: List[HistoryListener] = []
+        self._history_index: Optional[HistoryIndex] = None
+        # 历史卡片缓存，键为 (记录键, view_at)
+        self.card_cache = LRUCache(CARD_CACHE_SIZE)
+        # 渲染好的图表图片（透明背景），键为 (图表名, 历史版本, ...)
+        self.chart_cache = LRUCache(CHART_CACHE_SIZE)
+        # 词云图片（透明背景，与主题无关），键为历史版本
+        self.wordcloud_cache = LRUCache(WORDCLOUD_CACHE_SIZE)
+        # 主界面各页面的控件树，由侧边栏创建（见 ui.view_cache）
+        self.view_cache = None
+        # 最近一次拉取观看历史的耗时、页数和记录数，供设置页的诊断信息显示
+        self.last_sync: Optional[Dict[str, Any]] = None
         self.login_session_id = 0
+        self.login_poller = LoginPoller(check_login_status)
+        self.account_manager = AccountManager(self.session_store, on_synced=self._on_account_synced)
+        # 当前账号按天预聚合的统计表，按需从本地加载
+        self._rollups: Optional[HistoryRollups] = None
+        self._rollups_mid: Optional[str] = None
+        self._rollups_lock = threading.Lock()
+        self.settings = SettingsStore(self.session_store.root)
+        # 定时刷新不做性能分析，以免每次刷新写一个文件，挤掉界面操作的分析结果
+        self.history_refresher = HistoryRefresher(
+            self.refresh_history,
+            interval=self.settings.get("refresh_interval", DEFAULT_REFRESH_INTERVAL),
+        )
+        # 时间范围变化后，下一次刷新需要按新范围重新拉取全部记录
+        self._window_changed = False
+        # 性能分析开关：环境变量优先，否则沿用设置页保存的选项；未开启时不导入 utils.profiling
+        saved_profile_mode = self.profile_mode
+        if saved_profile_mode:
+            from utils.profiling import PROFILE_ENV, set_profile_mode
+
+            if not os.environ.get(PROFILE_ENV):
+                set_profile_mode(saved_profile_mode)
 
     def get_current_theme_colors(self):
-        """获取当前主题对应的颜色方案"""
-        if self.is_dark_theme:
-            return {
-                "bg": self.THEME_DARK,
-                "card": self.THEME_CARD_DARK,
-                "text": self.THEME_TEXT_DARK
-            }
-        else:
-            return {
-                "bg": self.THEME_LIGHT,
-                "card": self.THEME_CARD_LIGHT,
-                "text": self.THEME_TEXT_LIGHT
-            }
-
-    def get_qr_code(self) -> Tuple[Optional[str], Optional[str]]:
-        """Get Bilibili login QR code and return the QR code key."""
-        return get_qr_code()
-
-    def check_login_status(self, qrcode_key: str, qr_file_path: str, page: ft.Page, session_id: Optional[int] = None) -> None:
-        """Check QR code login status periodically."""
-        retries = 0
-        while retries < self.LOGIN_POLL_MAX_RETRIES:
-            # A new login screen has been rendered; stop polling the stale QR code.
-            if session_id is not None and session_id != self.login_session_id:
-                break
-
-            status, cookies = check_login_status(qrcode_key)
-
-            if status == 0:  # Login successful
+        """获取界面使用的颜色。
+
+        返回配色方案中的颜色名而不是具体色值，深浅色的实际颜色由页面的
+        theme / dark_theme 决定（见 ui.theme），切换主题时控件无需重建。
+        """
+        return {
+            "bg": ft.Colors.SURFACE,
+            "card": ft.Colors.SURFACE_CONTAINER_HIGHEST,
+            "text": ft.Colors.ON_SURFACE,
+        }
+
+    @property
+    def is_dark_theme(self) -> bool:
+        """Whether the dark theme is selected; saved in the settings, dark by default."""
+        return bool(self.settings.get("dark_theme", True))
+
+    def set_dark_theme(self, dark: bool) -> None:
+        self.settings.set("dark_theme", bool(dark))
+
+    def get_qr_code(self, size: int = QR_CODE_SIZE) -> Optional[Tuple[str, str]]:
+        """Get Bilibili login QR code and return the QR code key with a base64 PNG."""
+        return get_qr_code(size)
+
+    def start_login_polling(self, qrcode_key: str, page: ft.Page,
+                            on_status: Optional[Callable[[int], None]] = None) -> None:
+        """Poll the QR code login status on the shared poller, replacing any previous QR code."""
+
+        def on_result(status: int, cookies: Any) -> None:
+            if status == STATUS_SUCCESS:
                 self.login_cookies = cookies
                 self._handle_successful_login(page)
-                break
-            elif status == 86038:  # QR code expired
+            elif status == STATUS_EXPIRED:
                 self._handle_expired_qr_code(page)
-                break
-            elif status < 0:
+            elif status == STATUS_TIMEOUT:
+                self._show_error_page(page, "登录状态轮询超时，请刷新二维码后重试")
+            else:
                 self._show_error_page(page, "网络异常，请稍后重试")
-                break
 
-            retries += 1
-            time.sleep(self.LOGIN_POLL_INTERVAL_SECONDS)
-        else:
-            self._show_error_page(page, "登录状态轮询超时，请刷新二维码后重试")
+        self.login_poller.start(qrcode_key, on_result, on_status)
 
-        # 删除图片
-        import os
-        if os.path.exists(qr_file_path):
-            os.remove(qr_file_path)
+    def cancel_login_polling(self) -> None:
+        """Stop polling the current QR code, e.g. when a new login screen is rendered."""
+        self.login_poller.cancel()
 
     def _handle_successful_login(self, page: ft.Page) -> None:
         """Handle successful login by setting up the main UI."""
-        from ui.main_layout import create_app_layout
-        from ui.history_view import show_watch_history
-
         # Clear all existing content
         page.clean()
 
@@ -100,34 +163,316 @@ class BilibiliClient:
             self._show_error_page(page, "获取用户信息失败，请重试")
             return
 
-        # Render main layout first, then load history in background.
+        self.user_info = user_info
+        try:
+            self.session_store.save(self.login_cookies, user_info)
+        except OSError as exc:
+            logger.warning("保存登录状态失败: %s", exc)
+
+        self._show_dashboard(page, user_info)
+
+    def resume_session(self, page: ft.Page) -> bool:
+        """Warm start from the persisted session, skipping the QR login entirely.
+
+        The cached dashboard is rendered immediately; the cookies are then
+        validated via ``/nav`` in the background. If they turn out to be
+        invalid the login screen is shown instead.
+
+        Returns:
+            False if there is no usable stored session.
+        """
+        session = self.session_store.load()
+        if not session:
+            return False
+
+        self.login_cookies = session["cookies"]
+        self.user_info = session["user_info"]
+        cached_history = self._history_store().load()
+        self._show_dashboard(page, self.user_info, cached_history, revalidate=True)
+        return True
+
+    def clear_session(self) -> None:
+        """Forget the login cookies, both in memory and on disk."""
+        self.history_refresher.stop()
+        self.clear_caches()
+        if self.user_info:
+            self.session_store.clear(self.user_info["mid"])
+        self.login_cookies = None
+        self.user_info = None
+
+    def list_accounts(self) -> List[Dict[str, Any]]:
+        """Return the cached user info of every account with a stored session."""
+        return [account.user_info for account in self.account_manager.load_accounts()]
+
+    def switch_account(self, page: ft.Page, mid: Any) -> bool:
+        """Show the dashboard of another stored account without logging out of this one."""
+        self.cancel_login_polling()
+        self.clear_caches()
+        previous = self.session_store.active_account()
+        self.session_store.set_active(mid)
+        if self.resume_session(page):
+            return True
+        if previous is not None:
+            self.session_store.set_active(previous)
+        return False
+
+    def add_account(self, page: ft.Page) -> None:
+        """Show the QR login for another account; the current session stays stored."""
+        self.history_refresher.stop()
+        self.clear_caches()
+        self.login_cookies = None
+        self.user_info = None
         self.history.clear()
+        self._reload_app(page)
+
+    def clear_caches(self) -> None:
+        """Drop cached views, cards, chart images and word clouds; they are rebuilt on demand."""
+        if self.view_cache is not None:
+            self.view_cache.clear()
+        self.card_cache.clear()
+        self.chart_cache.clear()
+        self.wordcloud_cache.clear()
+
+    def sync_all_accounts(self, on_progress=None) -> List[Dict[str, Any]]:
+        """Sync every stored account; the in-memory history follows the current account's result."""
+        from utils.profiling import profiled
+
+        with profiled("sync.all_accounts"):
+            results = self.account_manager.sync_all(days=self.history_window_days, on_progress=on_progress)
+        if self.user_info and any(r["mid"] == str(self.user_info["mid"]) and r["status"] == SYNC_OK
+                                  for r in results):
+            self.set_history(self._history_store().load())
+        return results
+
+    def add_history_listener(self, listener: HistoryListener) -> None:
+        """Register ``listener(delta)``; it is dropped once it returns False.
+
+        ``delta`` has the ``added``/``updated`` records, the ``removed`` keys
+        and the new ``version``. Listeners run on the refresher thread.
+        """
+        with self._history_lock:
+            self._history_listeners.append(listener)
+
+    def get_history_index(self) -> HistoryIndex:
+        """Return the sort/filter index of the current ``history``, rebuilt once per version."""
+        with self._history_lock:
+            index = self._history_index
+            if index is None or index.version != self.history_version:
+                index = HistoryIndex(self.history, self.history_version)
+                self._history_index = index
+            return index
+
+    def set_history(self, records: List[Dict[str, Any]]) -> None:
+        """Replace the history in place and bump ``history_version``."""
+        # 原地替换，侧边栏和各视图持有的是同一个列表对象
+        with self._history_lock:
+            self.history[:] = records
+            self.history_version += 1
+
+    @property
+    def history_window_days(self) -> int:
+        """How many days of history are fetched and kept (7, 30 or 365)."""
+        return int(self.settings.get("history_window_days", HISTORY_WINDOW_DAYS))
+
+    def set_history_window(self, days: int) -> None:
+        """Change and persist the history window; the next refresh refetches it."""
+        if days == self.history_window_days:
+            return
+        self.settings.set("history_window_days", days)
+        self._window_changed = True
+        self.history_refresher.trigger()
+
+    def refresh_history(self) -> Optional[Dict[str, Any]]:
+        """Fetch records newer than the newest known one and merge them into ``history``.
+
+        After the history window changed, the whole window is fetched again
+        instead. Returns the applied delta, or None if nothing changed.
+        """
+        cookies = self.login_cookies
+        if not cookies:
+            return None
+        days = self.history_window_days
+        full, self._window_changed = self._window_changed, False
+        since = 0 if full else max((int(item.get("view_at", 0) or 0) for item in self.history), default=0)
+        counter = PageCounter(rate_limiter=self.account_manager.rate_limiter)
+        started = time.perf_counter()
+        try:
+            incoming = fetch_history_since(cookies, since, days=days, iter_pages=counter)
+        except Exception as exc:
+            logger.warning("增量刷新观看历史失败: %s", exc)
+            self._record_sync("全量" if full else "增量", started, counter.pages, 0, ok=False)
+            self._window_changed = self._window_changed or full
+            return None
+        self._record_sync("全量" if full else "增量", started, counter.pages, len(incoming))
+
+        min_view_at = int(time.time()) - days * 24 * 3600
+        with self._history_lock:
+            if cookies is not self.login_cookies:
+                return None  # 刷新期间切换了账号
+            merged, delta = merge_history(self.history, incoming, min_view_at=min_view_at)
+            if not (delta["added"] or delta["updated"] or delta["removed"]):
+                return None
+            self.history[:] = merged
+            self.history_version += 1
+            delta["version"] = self.history_version
+            listeners = list(self._history_listeners)
+
+        logger.info("增量刷新观看历史: 新增 %s 条，更新 %s 条，移除 %s 条",
+                    len(delta["added"]), len(delta["updated"]), len(delta["removed"]))
+        self.update_rollups(delta["added"] + delta["updated"])
+        try:
+            self._history_store().save(self.history)
+        except OSError as exc:
+            logger.warning("缓存观看历史失败: %s", exc)
+
+        for listener in listeners:
+            try:
+                keep = listener(delta)
+            except Exception as exc:
+                logger.exception("观看历史监听器出错: %s", exc)
+                keep = True
+            if keep is False:
+                with self._history_lock:
+                    if listener in self._history_listeners:
+                        self._history_listeners.remove(listener)
+        return delta
+
+    def get_rollups(self) -> HistoryRollups:
+        """Rollup tables of the current account (see ``utils.rollups``)."""
+        with self._rollups_lock:
+            return self._load_rollups(str(self.user_info["mid"]) if self.user_info else "")
+
+    def update_rollups(self, records: List[Dict[str, Any]], mid: Any = None) -> None:
+        """Count ``records`` into the rollup tables of ``mid`` (default: current account) and save them."""
+        mid = str(mid if mid is not None else self.user_info["mid"])
+        retain_since = rollup_retain_since(self.history_window_days)
+        with self._rollups_lock:
+            rollups = self._load_rollups(mid)
+            if not rollups.apply(records, record_key, retain_since=retain_since):
+                return
+            try:
+                self.session_store.rollup_store(mid).save(rollups.to_dict())
+            except OSError as exc:
+                logger.warning("保存统计表失败: %s", exc)
+
+    def _load_rollups(self, mid: str) -> HistoryRollups:
+        if self._rollups is None or self._rollups_mid != mid:
+            data = self.session_store.rollup_store(mid).load() if mid else None
+            self._rollups = HistoryRollups.from_dict(data)
+            self._rollups_mid = mid
+        return self._rollups
+
+    def _on_account_synced(self, account, records: List[Dict[str, Any]]) -> None:
+        self.update_rollups(records, account.mid)
+
+    def set_refresh_interval(self, seconds: int) -> None:
+        """Change and persist the auto-refresh interval; 0 turns it off."""
+        self.settings.set("refresh_interval", seconds)
+        self.history_refresher.set_interval(seconds)
+
+    @property
+    def profile_mode(self) -> str:
+        """Saved profiler mode of the developer setting: ``""``, ``"cprofile"`` or ``"sample"``."""
+        mode = self.settings.get("profile_mode", "")
+        if not mode:
+            return ""
+        from utils.profiling import PROFILE_MODES
+
+        return mode if mode in PROFILE_MODES else ""
+
+    def set_profile_mode(self, mode: str) -> None:
+        """Turn the profiler on or off for the following UI actions and persist the choice."""
+        from utils.profiling import set_profile_mode
+
+        set_profile_mode(mode)
+        self.settings.set("profile_mode", mode)
+
+    def _history_store(self) -> HistoryStore:
+        return self.session_store.history_store(self.user_info["mid"])
+
+    def _show_dashboard(self, page: ft.Page, user_info: Dict[str, Any],
+                        cached_history: Optional[List[Dict[str, Any]]] = None,
+                        revalidate: bool = False) -> None:
+        """Render the main layout, show cached history at once and refresh it in the background."""
+        from ui.main_layout import create_app_layout
+        from ui.history_view import show_watch_history
+
+        page.clean()
+
+        # Render main layout first, then load history in background.
+        self.set_history(cached_history or [])
         content_area = create_app_layout(self, page, user_info, self.history)
-        content_area.content = ft.Container(
-            expand=True,
-            alignment=ft.Alignment.CENTER,
-            content=ft.Column(
-                [
-                    ft.ProgressRing(width=42, height=42, stroke_width=3),
-                    ft.Text("正在加载观看历史...", size=15, color=ft.Colors.GREY_400),
-                ],
-                alignment=ft.MainAxisAlignment.CENTER,
-                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                spacing=14,
-            ),
-        )
-        content_area.update()
+        views = self.view_cache
+
+        def show_history() -> None:
+            views.show("history", self.history_version,
+                       lambda: show_watch_history(self, self.history, content_area))
+
+        if self.history:
+            show_history()
+        else:
+            content_area.content = ft.Container(
+                expand=True,
+                alignment=ft.Alignment.CENTER,
+                content=ft.Column(
+                    [
+                        ft.ProgressRing(width=42, height=42, stroke_width=3),
+                        ft.Text("正在加载观看历史...", size=15, color=ft.Colors.GREY_400),
+                    ],
+                    alignment=ft.MainAxisAlignment.CENTER,
+                    horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+                    spacing=14,
+                ),
+            )
+            content_area.update()
 
         def load_history() -> None:
+            from utils.profiling import profiled
+
+            try:
+                with profiled("sync.history"):
+                    fetch_history()
+            finally:
+                # 网络异常时也启动，稍后自动重试；会话已失效时 login_cookies 为空
+                if self.login_cookies:
+                    self.history_refresher.start()
+
+        def fetch_history() -> None:
+            if revalidate and not self._revalidate_session(page):
+                return
             history = self.get_watch_history() or []
-            self.history.clear()
-            self.history.extend(history)
-            if content_area.page is None:
+            if not history and self.history:
+                # 拉取失败或暂无新数据时保留缓存，避免把已显示的内容清空。
+                self.update_rollups(self.history)
+                return
+            self.set_history(history)
+            self.update_rollups(history)
+            try:
+                self._history_store().save(self.history)
+            except OSError as exc:
+                logger.warning("缓存观看历史失败: %s", exc)
+            # 用户已切到其他页面时不打断，回到历史页时按新版本刷新
+            if content_area.page is None or views.current not in (None, "history"):
                 return
-            show_watch_history(self, self.history, content_area)
+            show_history()
 
         page.run_thread(load_history)
 
+    def _revalidate_session(self, page: ft.Page) -> bool:
+        """Check the restored cookies via ``/nav``; fall back to the QR login if they expired."""
+        nav = get_nav_info(self.login_cookies)
+        if nav is None:
+            # 网络异常：继续展示缓存数据，下次启动再校验。
+            return False
+        if not nav.get("isLogin"):
+            self.clear_session()
+            self._reload_app(page)
+            return False
+
+        self.user_info = {"uname": nav["uname"], "mid": nav["mid"], "face": nav["face"]}
+        self.session_store.touch(self.user_info["mid"], self.user_info)
+        return True
+
     def _handle_expired_qr_code(self, page: ft.Page) -> None:
         """Handle expired QR code by regenerating a new one."""
         self._reload_app(page)
@@ -142,7 +487,7 @@ class BilibiliClient:
                 content=ft.Column([
                     ft.Icon(ft.icons.ERROR_OUTLINE, size=64,
                             color=self.THEME_PRIMARY),
-                    ft.Text(message, size=18, color=self.THEME_TEXT_DARK, weight="bold",
+                    ft.Text(message, size=18, color=ft.Colors.ON_SURFACE, weight="bold",
                             text_align=ft.TextAlign.CENTER),
                     ft.ElevatedButton(
                         "重试",
@@ -168,7 +513,7 @@ class BilibiliClient:
         from ui.login_screen import setup_login_screen
 
         page.clean()
-        page.bgcolor = self.THEME_DARK  # 确保背景色正确
+        page.bgcolor = ft.Colors.SURFACE  # 确保背景色正确
 
         setup_login_screen(page, self)
 
@@ -184,4 +529,18 @@ class BilibiliClient:
         if not self.login_cookies:
             return None
 
-        return get_watch_history(self.login_cookies)
+        counter = PageCounter(rate_limiter=self.account_manager.rate_limiter)
+        started = time.perf_counter()
+        history = get_watch_history(self.login_cookies, days=self.history_window_days, iter_pages=counter)
+        self._record_sync("全量", started, counter.pages, len(history or []))
+        return history
+
+    def _record_sync(self, kind: str, started: float, pages: int, records: int, ok: bool = True) -> None:
+        self.last_sync = {
+            "at": time.time(),
+            "kind": kind,
+            "seconds": time.perf_counter() - started,
+            "pages": pages,
+            "records": records,
+            "ok": ok,
+        }
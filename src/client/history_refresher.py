@@ -0,0 +1,207 @@
+"""Periodic, incremental refresh of the watch history in the background."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from client.api import iter_watch_history
+from client.rate_limit import TokenBucket
+
+logger = logging.getLogger("biliinsight.client.history_refresher")
+
+# 历史记录保留的时间范围（天），与首次全量拉取保持一致；可在设置中切换
+HISTORY_WINDOW_DAYS = 7
+HISTORY_WINDOW_OPTIONS = (7, 30, 365)
+MAX_HISTORY_WINDOW_DAYS = max(HISTORY_WINDOW_OPTIONS)
+# 默认自动刷新间隔（秒），0 表示关闭
+DEFAULT_REFRESH_INTERVAL = 300
+REFRESH_INTERVAL_OPTIONS = (0, 60, 300, 900, 1800)
+
+
+def record_key(item: Dict[str, Any]) -> str:
+    """Stable identity of a history record: ``kid``, falling back to business/oid or bvid."""
+    kid = item.get("kid")
+    if kid:
+        return str(kid)
+    history = item.get("history") or {}
+    if history.get("oid"):
+        return f"{history.get('business', '')}:{history['oid']}"
+    return str(item.get("bvid") or history.get("bvid") or item.get("uri") or id(item))
+
+
+def rollup_retain_since(days: int, now: Optional[float] = None) -> int:
+    """Oldest ``view_at`` whose dedup keys the rollup tables keep (see ``HistoryRollups.apply``).
+
+    Measured against the largest selectable window rather than the current
+    one: after the window grows, a full refetch brings older views back, and
+    without their keys they would be counted twice.
+    """
+    now = time.time() if now is None else now
+    return int(now) - max(days, MAX_HISTORY_WINDOW_DAYS) * 24 * 3600
+
+
+def fetch_history_since(cookies, since: int, days: int = HISTORY_WINDOW_DAYS,
+                        iter_pages: Callable[..., Iterable[List[Dict[str, Any]]]] = iter_watch_history,
+                        ) -> List[Dict[str, Any]]:
+    """Return the records viewed after ``since``, newest first.
+
+    Pages are requested newest first, and paging stops at the first page that
+    reaches records already known (``view_at <= since``). A refresh with no
+    new activity therefore costs a single request.
+    """
+    fresh: List[Dict[str, Any]] = []
+    for page in iter_pages(cookies, days=days):
+        newer = [item for item in page if int(item.get("view_at", 0) or 0) > since]
+        fresh.extend(newer)
+        if len(newer) < len(page):
+            break
+    return fresh
+
+
+class PageCounter:
+    """Wrap an ``iter_pages`` function and count the pages it yields (for sync diagnostics).
+
+    A ``rate_limiter`` is passed on to ``iter_pages``, which takes a token
+    before each request it actually sends, so the GUI's fetches share the
+    request budget of ``AccountManager``.
+    """
+
+    def __init__(self, iter_pages: Callable[..., Iterable[List[Dict[str, Any]]]] = iter_watch_history,
+                 rate_limiter: Optional[TokenBucket] = None):
+        self.iter_pages = iter_pages
+        self.rate_limiter = rate_limiter
+        self.pages = 0
+
+    def __call__(self, *args, **kwargs) -> Iterable[List[Dict[str, Any]]]:
+        if self.rate_limiter is not None:
+            kwargs["rate_limiter"] = self.rate_limiter
+        for page in self.iter_pages(*args, **kwargs):
+            self.pages += 1
+            yield page
+
+
+def merge_history(existing: List[Dict[str, Any]], incoming: List[Dict[str, Any]],
+                  min_view_at: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Dict[str, list]]:
+    """Merge ``incoming`` records into ``existing`` by :func:`record_key`.
+
+    A video watched again comes back with the same key and a newer
+    ``view_at`` and replaces the old record. Records older than
+    ``min_view_at`` are dropped.
+
+    Returns:
+        ``(merged, delta)`` where ``merged`` is sorted newest first and
+        ``delta`` has the ``added``/``updated`` records and ``removed`` keys.
+    """
+    by_key = {record_key(item): item for item in existing}
+    added: List[Dict[str, Any]] = []
+    updated: List[Dict[str, Any]] = []
+    seen = set()
+    for item in incoming:
+        key = record_key(item)
+        if key in seen:
+            continue
+        seen.add(key)
+        previous = by_key.get(key)
+        if previous is None:
+            added.append(item)
+        elif previous != item:
+            updated.append(item)
+        else:
+            continue
+        by_key[key] = item
+
+    removed: List[str] = []
+    if min_view_at is not None:
+        for key, item in list(by_key.items()):
+            if int(item.get("view_at", 0) or 0) < min_view_at:
+                removed.append(key)
+                del by_key[key]
+
+    merged = sorted(by_key.values(), key=lambda x: x.get("view_at", 0), reverse=True)
+    return merged, {"added": added, "updated": updated, "removed": removed}
+
+
+class HistoryRefresher:
+    """Call ``refresh()`` every ``interval`` seconds on one daemon thread.
+
+    ``set_interval`` takes effect immediately; an interval of 0 disables the
+    periodic refresh while ``trigger`` still runs one on demand.
+    """
+
+    def __init__(self, refresh: Callable[[], Any], interval: float = DEFAULT_REFRESH_INTERVAL,
+                 clock: Callable[[], float] = time.monotonic):
+        self._refresh = refresh
+        self._interval = interval
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._running = False
+        self._wake = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def interval(self) -> float:
+        return self._interval
+
+    @property
+    def running(self) -> bool:
+        with self._cond:
+            return self._running
+
+    def start(self) -> None:
+        with self._cond:
+            self._running = True
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="biliinsight-history-refresher", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    def set_interval(self, interval: float) -> None:
+        with self._cond:
+            self._interval = max(interval, 0)
+            self._cond.notify_all()
+
+    def trigger(self) -> None:
+        """Refresh as soon as possible, regardless of the interval."""
+        with self._cond:
+            self._wake = True
+            self._cond.notify_all()
+
+    def _next_run(self, start: float) -> float:
+        return start + self._interval if self._interval > 0 else float("inf")
+
+    def _run(self) -> None:
+        next_run = self._next_run(self._clock())
+        while True:
+            with self._cond:
+                while True:
+                    if not self._running:
+                        self._thread = None
+                        return
+                    if self._wake:
+                        break
+                    if self._interval > 0:
+                        # 间隔被缩短或重新开启时，不必等到按旧间隔计算的时间
+                        next_run = min(next_run, self._clock() + self._interval)
+                        remaining = next_run - self._clock()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    else:
+                        self._cond.wait()
+                self._wake = False
+
+            started = self._clock()
+            try:
+                self._refresh()
+            except Exception as exc:  # pragma: no cover - keep the thread alive
+                logger.exception("后台刷新观看历史失败: %s", exc)
+            next_run = self._next_run(started)
@@ -0,0 +1,157 @@
+"""Single-threaded, adaptive polling of the QR code login status."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Optional, Tuple
+
+logger = logging.getLogger("biliinsight.client.login_poller")
+
+# 扫码登录轮询接口返回的状态码
+STATUS_SUCCESS = 0
+STATUS_EXPIRED = 86038
+STATUS_SCANNED = 86090
+STATUS_NOT_SCANNED = 86101
+# 本地定义：超过总时长仍未完成登录
+STATUS_TIMEOUT = -2
+
+StatusCallback = Callable[[int, Any], None]
+
+
+class _PollJob:
+    def __init__(self, qrcode_key: str, on_result: StatusCallback,
+                 on_status: Optional[Callable[[int], None]], deadline: float):
+        self.qrcode_key = qrcode_key
+        self.on_result = on_result
+        self.on_status = on_status
+        self.deadline = deadline
+        self.idle_polls = 0
+        self.last_status: Optional[int] = None
+
+
+class LoginPoller:
+    """Poll one QR code at a time on a single worker thread.
+
+    Starting a new session replaces the current one and wakes the worker
+    immediately, so stale QR codes are never polled again. Right after the
+    code has been scanned (86090) the poller switches to ``fast_interval`` to
+    pick up the confirmation quickly; while nobody has scanned it, the delay
+    grows from ``idle_interval`` up to ``max_idle_interval``.
+
+    Args:
+        check_status: ``qrcode_key -> (status, cookies)``, e.g. ``client.api.check_login_status``.
+        fast_interval: Delay after a "scanned" answer, in seconds.
+        idle_interval: First delay while the code has not been scanned.
+        max_idle_interval: Upper bound for the idle back-off.
+        backoff: Growth factor of the idle delay.
+        timeout: Total time a QR code is polled before giving up.
+    """
+
+    def __init__(
+        self,
+        check_status: Callable[[str], Tuple[int, Any]],
+        fast_interval: float = 0.5,
+        idle_interval: float = 1.0,
+        max_idle_interval: float = 3.0,
+        backoff: float = 1.5,
+        timeout: float = 360.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._check_status = check_status
+        self.fast_interval = fast_interval
+        self.idle_interval = idle_interval
+        self.max_idle_interval = max_idle_interval
+        self.backoff = backoff
+        self.timeout = timeout
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._job: Optional[_PollJob] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def active(self) -> bool:
+        with self._cond:
+            return self._job is not None
+
+    def start(self, qrcode_key: str, on_result: StatusCallback,
+              on_status: Optional[Callable[[int], None]] = None) -> None:
+        """Poll ``qrcode_key`` instead of whatever was being polled before.
+
+        ``on_result(status, cookies)`` is called once from the worker thread
+        when the login succeeds, the code expires, the request fails or the
+        overall timeout is hit. ``on_status(status)`` is called whenever an
+        intermediate status changes (e.g. the code has been scanned).
+        """
+        with self._cond:
+            self._job = _PollJob(qrcode_key, on_result, on_status,
+                                 self._clock() + self.timeout)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="biliinsight-login-poller", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def cancel(self) -> None:
+        """Stop polling without reporting a result."""
+        with self._cond:
+            self._job = None
+            self._cond.notify_all()
+
+    def next_delay(self, job: _PollJob, status: int) -> float:
+        if status == STATUS_SCANNED:
+            job.idle_polls = 0
+            return self.fast_interval
+        delay = self.idle_interval * (self.backoff ** job.idle_polls)
+        job.idle_polls += 1
+        return min(delay, self.max_idle_interval)
+
+    def _run(self) -> None:
+        try:
+            while True:
+                with self._cond:
+                    job = self._job
+                    if job is None:
+                        self._thread = None
+                        return
+                try:
+                    self._poll_once(job)
+                except Exception:
+                    # 界面回调出错不能让轮询线程退出，否则之后的二维码都不会再被轮询
+                    logger.exception("登录轮询回调出错")
+        finally:
+            with self._cond:
+                if self._thread is threading.current_thread():
+                    self._thread = None
+
+    def _poll_once(self, job: _PollJob) -> None:
+        try:
+            status, cookies = self._check_status(job.qrcode_key)
+        except Exception:
+            logger.exception("查询扫码登录状态失败")
+            status, cookies = -1, None
+
+        with self._cond:
+            if self._job is not job:
+                # 请求期间已切换到新的二维码或被取消，丢弃旧结果。
+                return
+            finished = status == STATUS_SUCCESS or status == STATUS_EXPIRED or status < 0
+            if not finished and self._clock() >= job.deadline:
+                status, cookies, finished = STATUS_TIMEOUT, None, True
+            if finished:
+                self._job = None
+
+        if finished:
+            logger.debug("登录轮询结束，状态码: %s", status)
+            job.on_result(status, cookies)
+            return
+
+        if status != job.last_status:
+            job.last_status = status
+            if job.on_status:
+                job.on_status(status)
+
+        delay = min(self.next_delay(job, status), max(job.deadline - self._clock(), 0))
+        with self._cond:
+            self._cond.wait_for(lambda: self._job is not job, timeout=delay)
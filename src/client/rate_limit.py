@@ -0,0 +1,55 @@
+"""Token bucket shared by everything that sends requests to Bilibili concurrently."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Optional
+
+
+class TokenBucket:
+    """Allow ``rate`` requests per second on average with bursts of up to ``capacity``.
+
+    Args:
+        rate: Tokens added per second.
+        capacity: Bucket size, i.e. how many requests may be sent back to back.
+            Defaults to ``max(rate, 1)``.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Take ``tokens`` if available and return 0, otherwise return the seconds to wait."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until ``tokens`` are available; return the total time spent waiting."""
+        waited = 0.0
+        while True:
+            delay = self.try_acquire(tokens)
+            if delay <= 0:
+                return waited
+            self._sleep(delay)
+            waited += delay
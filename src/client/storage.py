@@ -0,0 +1,220 @@
+"""Local persistence of login sessions and watch history, one directory per account."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+logger = logging.getLogger("biliinsight.client.storage")
+
+# Cookie 未携带过期时间时，本地会话的默认有效期（秒）
+DEFAULT_SESSION_TTL = 30 * 24 * 3600
+# 用于判断会话过期时间的关键 Cookie
+AUTH_COOKIE = "SESSDATA"
+
+
+def default_data_dir() -> Path:
+    """Return ``$BILIINSIGHT_HOME`` or ``~/.biliinsight``."""
+    return Path(os.environ.get("BILIINSIGHT_HOME") or Path.home() / ".biliinsight")
+
+
+def _write_json(path: Path, data: Any) -> None:
+    """Atomically write ``data`` to ``path``, readable by the current user only."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.chmod(path.parent, 0o700)
+    except OSError:  # pragma: no cover - e.g. filesystems without permissions
+        pass
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fp:
+            json.dump(data, fp, ensure_ascii=False, separators=(",", ":"))
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _read_json(path: Path) -> Optional[Any]:
+    try:
+        with path.open(encoding="utf-8") as fp:
+            return json.load(fp)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as exc:
+        logger.warning("读取本地数据失败 %s: %s", path, exc)
+        return None
+
+
+def cookies_to_dict(cookies: Any) -> Dict[str, str]:
+    """Flatten a ``RequestsCookieJar`` or mapping into ``{name: value}``."""
+    if cookies is None:
+        return {}
+    if isinstance(cookies, Mapping):
+        return {str(k): str(v) for k, v in cookies.items()}
+    return {cookie.name: cookie.value for cookie in cookies}
+
+
+def _cookie_expiry(cookies: Any) -> Optional[int]:
+    if cookies is None or isinstance(cookies, Mapping):
+        return None
+    for cookie in cookies:
+        if cookie.name == AUTH_COOKIE and cookie.expires:
+            return int(cookie.expires)
+    return None
+
+
+class SessionStore:
+    """Persist login cookies and the last user info for each account.
+
+    Layout under ``root``::
+
+        active_account          mid of the account used last
+        accounts/<mid>/session.json
+        accounts/<mid>/history.json
+    """
+
+    def __init__(self, root: Optional[os.PathLike[str] | str] = None):
+        self.root = Path(root) if root is not None else default_data_dir()
+
+    def account_dir(self, mid: Any) -> Path:
+        return self.root / "accounts" / str(mid)
+
+    def list_accounts(self) -> List[str]:
+        accounts_dir = self.root / "accounts"
+        if not accounts_dir.is_dir():
+            return []
+        return sorted(p.name for p in accounts_dir.iterdir()
+                      if (p / "session.json").is_file())
+
+    def active_account(self) -> Optional[str]:
+        try:
+            mid = (self.root / "active_account").read_text(encoding="utf-8").strip()
+        except OSError:
+            return None
+        return mid or None
+
+    def save(self, cookies: Any, user_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Store ``cookies`` for ``user_info['mid']`` and mark it as the active account."""
+        now = int(time.time())
+        session = {
+            "cookies": cookies_to_dict(cookies),
+            "user_info": dict(user_info),
+            "saved_at": now,
+            "validated_at": now,
+            "expires_at": _cookie_expiry(cookies) or now + DEFAULT_SESSION_TTL,
+        }
+        mid = str(user_info["mid"])
+        _write_json(self.account_dir(mid) / "session.json", session)
+        self.set_active(mid)
+        return session
+
+    def set_active(self, mid: Any) -> None:
+        """Make ``mid`` the account that is resumed on the next start."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        (self.root / "active_account").write_text(str(mid), encoding="utf-8")
+
+    def load(self, mid: Any = None) -> Optional[Dict[str, Any]]:
+        """Return the stored session of ``mid`` (default: active account) unless it expired."""
+        mid = mid if mid is not None else self.active_account()
+        if mid is None:
+            return None
+        session = _read_json(self.account_dir(mid) / "session.json")
+        if not isinstance(session, dict) or not session.get("cookies"):
+            return None
+        if int(session.get("expires_at", 0)) <= time.time():
+            logger.info("本地登录会话已过期: %s", mid)
+            self.clear(mid)
+            return None
+        return session
+
+    def touch(self, mid: Any, user_info: Optional[Dict[str, Any]] = None) -> None:
+        """Record a successful validation and optionally refresh the cached user info."""
+        session = self.load(mid)
+        if session is None:
+            return
+        session["validated_at"] = int(time.time())
+        if user_info:
+            session["user_info"] = dict(user_info)
+        _write_json(self.account_dir(mid) / "session.json", session)
+
+    def clear(self, mid: Any = None) -> None:
+        """Forget the cookies of ``mid`` (default: active account); cached history is kept."""
+        mid = mid if mid is not None else self.active_account()
+        if mid is None:
+            return
+        session_path = self.account_dir(mid) / "session.json"
+        if session_path.exists():
+            session_path.unlink()
+        if self.active_account() == str(mid):
+            (self.root / "active_account").unlink()
+
+    def history_store(self, mid: Any) -> "HistoryStore":
+        return HistoryStore(self.account_dir(mid) / "history.json")
+
+    def rollup_store(self, mid: Any) -> "RollupStore":
+        return RollupStore(self.account_dir(mid) / "rollups.json")
+
+
+class HistoryStore:
+    """JSON file holding the last synced watch history records of one account."""
+
+    def __init__(self, path: os.PathLike[str] | str):
+        self.path = Path(path)
+
+    def load(self) -> List[Dict[str, Any]]:
+        data = _read_json(self.path)
+        if not isinstance(data, dict):
+            return []
+        records = data.get("records")
+        return records if isinstance(records, list) else []
+
+    def save(self, records: Iterable[Dict[str, Any]]) -> None:
+        _write_json(self.path, {"saved_at": int(time.time()), "records": list(records)})
+
+
+class RollupStore:
+    """JSON file holding the pre-aggregated statistics tables of one account."""
+
+    def __init__(self, path: os.PathLike[str] | str):
+        self.path = Path(path)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        data = _read_json(self.path)
+        return data if isinstance(data, dict) else None
+
+    def save(self, data: Dict[str, Any]) -> None:
+        _write_json(self.path, data)
+
+
+class SettingsStore:
+    """Small JSON file of user preferences shared by all accounts.
+
+    The file is read once and kept in memory; ``set`` updates the cached copy
+    and writes it back, so ``get`` on UI paths never touches the disk.
+    """
+
+    def __init__(self, root: Optional[os.PathLike[str] | str] = None):
+        self.path = (Path(root) if root is not None else default_data_dir()) / "settings.json"
+        self._data: Optional[Dict[str, Any]] = None
+
+    def _load(self) -> Dict[str, Any]:
+        if self._data is None:
+            data = _read_json(self.path)
+            self._data = data if isinstance(data, dict) else {}
+        return self._data
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._load().get(key, default)
+
+    def set(self, key: str, value: Any) -> None:
+        data = self._load()
+        data[key] = value
+        _write_json(self.path, data)
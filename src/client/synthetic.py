@@ -0,0 +1,120 @@
+"""Deterministic synthetic watch histories shaped like the ``history/cursor`` API."""
+
+from __future__ import annotations
+
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+from client.transport import ReplayTransport
+
+__all__ = ["generate_history", "history_cassette", "history_cursor_page", "synthetic_transport"]
+
+CATEGORIES = (
+    "游戏", "知识", "科技", "生活", "美食", "动画", "音乐", "影视",
+    "运动", "汽车", "时尚", "娱乐", "鬼畜", "舞蹈", "纪录片", "资讯",
+)
+_TITLE_WORDS = (
+    "新手向", "一口气看完", "深度解析", "保姆级教程", "年度总结", "实测", "挑战",
+    "纪录片", "合集", "为什么", "终于", "第一次", "全流程", "从零开始",
+)
+
+
+def generate_history(count: int, days: int = 7, now: Optional[int] = None, seed: int = 0,
+                     authors: Optional[int] = None) -> List[Dict[str, Any]]:
+    """``count`` records viewed within the last ``days`` days, newest first.
+
+    Authors and categories follow a long-tailed distribution like a real
+    account: a few UP主 account for most views. The same arguments always
+    give the same records.
+
+    Args:
+        authors: Number of distinct authors, default ``max(20, count // 20)``.
+    """
+    rng = random.Random(seed)
+    now = int(time.time()) if now is None else now
+    authors = authors or max(20, count // 20)
+    window = days * 86400
+    # 观看时间在窗口内均匀分布，按接口的顺序从新到旧排列
+    view_times = sorted((now - rng.randrange(window) for _ in range(count)), reverse=True)
+    records: List[Dict[str, Any]] = []
+    for i, view_at in enumerate(view_times):
+        author = min(int(rng.paretovariate(1.2)) - 1, authors - 1)
+        category = CATEGORIES[min(int(rng.expovariate(0.35)), len(CATEGORIES) - 1)]
+        duration = int(rng.lognormvariate(6.2, 0.9)) + 15
+        progress = -1 if rng.random() < 0.35 else rng.randint(1, duration)
+        oid = 100_000_000 + i * 7919 % 900_000_000
+        bvid = f"BV1{oid:09d}x"
+        title = f"{rng.choice(_TITLE_WORDS)}{category}{rng.choice(_TITLE_WORDS)} #{i}"
+        records.append({
+            "title": title,
+            "long_title": "",
+            "cover": f"http://i0.hdslb.com/bfs/archive/{oid:x}.jpg",
+            "covers": None,
+            "uri": "",
+            "history": {
+                "oid": oid,
+                "epid": 0,
+                "bvid": bvid,
+                "page": 1,
+                "cid": oid + 7,
+                "part": title,
+                "business": "archive",
+                "dt": 2,
+            },
+            "videos": 1,
+            "author_name": f"UP主{author:05d}",
+            "author_face": "http://i0.hdslb.com/bfs/face/member/noface.jpg",
+            "author_mid": 1000 + author,
+            "view_at": view_at,
+            "progress": progress,
+            "badge": "",
+            "show_title": "",
+            "duration": duration,
+            "current": "",
+            "total": 0,
+            "new_desc": "",
+            "is_finish": int(progress == -1),
+            "is_fav": int(rng.random() < 0.05),
+            "kid": oid,
+            "tag_name": category,
+            "live_status": 0,
+        })
+    return records
+
+
+def history_cursor_page(records: List[Dict[str, Any]], page_size: int = 30) -> Dict[str, Any]:
+    """The ``history/cursor`` response whose ``list`` is ``records[:page_size]``."""
+    page = records[:page_size]
+    cursor = {"max": 0, "view_at": 0, "business": "", "ps": page_size}
+    if page:
+        last = page[-1]
+        cursor.update(max=last["kid"], view_at=last["view_at"], business="archive")
+    return {"code": 0, "message": "0", "ttl": 1,
+            "data": {"cursor": cursor, "tab": [], "list": page}}
+
+
+def history_cassette(records: List[Dict[str, Any]], page_size: int = 30) -> List[Dict[str, Any]]:
+    """Replay entries for paging through ``records`` the way ``iter_watch_history`` requests them."""
+    entries = []
+    params: Dict[str, Any] = {"ps": page_size, "type": "all"}
+    start = 0
+    while True:
+        body = history_cursor_page(records[start:start + page_size], page_size)
+        entries.append({"method": "GET", "path": "/x/web-interface/history/cursor",
+                        "params": dict(params), "status": 200, "body": body})
+        cursor = body["data"]["cursor"]
+        if not body["data"]["list"]:
+            # 最后一页是空列表，与接口翻到末尾时一致
+            break
+        start += page_size
+        params = {"type": "all", "ps": page_size,
+                  "max": cursor["max"], "view_at": cursor["view_at"], "business": cursor["business"]}
+    return entries
+
+
+def synthetic_transport(count: int, days: int = 7, page_size: int = 30, seed: int = 0,
+                        **replay_options: Any) -> ReplayTransport:
+    """A :class:`ReplayTransport` serving ``count`` synthetic records (see :func:`generate_history`)."""
+    records = generate_history(count, days=days, seed=seed)
+    return ReplayTransport(history_cassette(records, page_size), shift_time=False, **replay_options)
@@ -0,0 +1,280 @@
+"""Pluggable HTTP transport for the API layer: live, record to disk, or replay from disk.
+
+``api._get_session()`` returns the active transport instead of a requests
+session when one is set, so every endpoint works unchanged. Select one
+with :func:`set_transport` or through the environment:
+
+- ``BILIINSIGHT_TRANSPORT=record:<file>`` talks to the real endpoints
+  and appends every request/response pair to ``<file>`` (JSON lines).
+- ``BILIINSIGHT_TRANSPORT=replay:<file>`` answers from ``<file>``
+  without network; ``BILIINSIGHT_REPLAY_LATENCY_MS`` and
+  ``BILIINSIGHT_REPLAY_ERROR_RATE`` inject delay and connection errors.
+
+Request cookies are never written. Values of cookies set by a response,
+and the login URL and refresh token returned by the passport endpoints
+(the URL of a finished QR login carries SESSDATA and bili_jct), are
+replaced by a placeholder.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+logger = logging.getLogger("biliinsight.client.transport")
+
+__all__ = [
+    "RecordingTransport", "ReplayResponse", "ReplayTransport", "get_transport",
+    "load_cassette", "set_transport", "write_cassette",
+]
+
+TRANSPORT_ENV = "BILIINSIGHT_TRANSPORT"
+LATENCY_ENV = "BILIINSIGHT_REPLAY_LATENCY_MS"
+ERROR_RATE_ENV = "BILIINSIGHT_REPLAY_ERROR_RATE"
+REDACTED = "recorded"
+# 登录接口响应中携带凭据的字段，录制时替换为占位符
+_PASSPORT_PATH = "/x/passport-login/"
+_SECRET_FIELDS = ("url", "refresh_token")
+# 回放时平移此接口中的观看时间，让最新记录落在“现在”
+_HISTORY_PATH = "/x/web-interface/history/cursor"
+
+_transport: Any = None
+_env_checked = False
+_lock = threading.Lock()
+
+
+def set_transport(transport: Any) -> None:
+    """Route all API requests through ``transport`` (None restores live sessions)."""
+    global _transport, _env_checked
+    with _lock:
+        _transport = transport
+        _env_checked = True
+
+
+def get_transport() -> Any:
+    """The active transport, created from ``BILIINSIGHT_TRANSPORT`` on first use; None means live."""
+    global _transport, _env_checked
+    if _env_checked:
+        return _transport
+    with _lock:
+        if not _env_checked:
+            _transport = _transport_from_env()
+            _env_checked = True
+    return _transport
+
+
+def _transport_from_env() -> Any:
+    value = os.environ.get(TRANSPORT_ENV, "").strip()
+    if not value or value == "live":
+        return None
+    mode, _, path = value.partition(":")
+    if mode == "record" and path:
+        logger.info("录制接口请求到 %s", path)
+        return RecordingTransport(path)
+    if mode == "replay" and path:
+        logger.info("从 %s 回放接口响应", path)
+        return ReplayTransport.load(
+            path,
+            latency_ms=float(os.environ.get(LATENCY_ENV, 0) or 0),
+            error_rate=float(os.environ.get(ERROR_RATE_ENV, 0) or 0),
+        )
+    raise ValueError(f"{TRANSPORT_ENV} must be live, record:<file> or replay:<file>, got {value!r}")
+
+
+def _request_key(url: str, params: Optional[Dict[str, Any]]) -> Tuple[str, Tuple[Tuple[str, str], ...]]:
+    """``(path, sorted params)``, ignoring scheme and host so a cassette works against any base URL."""
+    parts = urlsplit(url)
+    merged = dict(parse_qsl(parts.query))
+    merged.update({key: str(value) for key, value in (params or {}).items()})
+    return parts.path, tuple(sorted(merged.items()))
+
+
+def _redact(body: Any) -> Any:
+    """Copy of a passport response ``body`` with the :data:`_SECRET_FIELDS` replaced, at any depth."""
+    if isinstance(body, dict):
+        return {key: REDACTED if key in _SECRET_FIELDS and value else _redact(value)
+                for key, value in body.items()}
+    if isinstance(body, list):
+        return [_redact(value) for value in body]
+    return body
+
+
+def load_cassette(path: str) -> List[Dict[str, Any]]:
+    """Read the entries written by :class:`RecordingTransport` or :func:`write_cassette`."""
+    with open(path, encoding="utf-8") as fp:
+        return [json.loads(line) for line in fp if line.strip()]
+
+
+def write_cassette(path: str, entries: Iterable[Dict[str, Any]]) -> None:
+    with open(path, "w", encoding="utf-8") as fp:
+        for entry in entries:
+            fp.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+class RecordingTransport:
+    """Send requests with a real session and append each exchange to ``path``."""
+
+    def __init__(self, path: str, session: Any = None):
+        self.path = path
+        self._session = session
+        self._lock = threading.Lock()
+
+    def _get_session(self) -> Any:
+        if self._session is None:
+            import requests
+
+            from client.api import HEADERS
+
+            self._session = requests.Session()
+            self._session.headers.update(HEADERS)
+        return self._session
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs: Any) -> Any:
+        response = self._get_session().get(url, params=params, **kwargs)
+        path, query = _request_key(url, params)
+        try:
+            body: Any = response.json()
+        except ValueError:
+            body = response.text
+        if path.startswith(_PASSPORT_PATH):
+            body = _redact(body) if not isinstance(body, str) else REDACTED
+        entry = {
+            "method": "GET",
+            "path": path,
+            "params": dict(query),
+            "status": response.status_code,
+            "body": body,
+            "cookies": {name: REDACTED for name in response.cookies.keys()},
+        }
+        with self._lock, open(self.path, "a", encoding="utf-8") as fp:
+            fp.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return response
+
+
+class ReplayResponse:
+    """The parts of ``requests.Response`` the API layer uses."""
+
+    def __init__(self, status_code: int, body: Any, cookies: Optional[Dict[str, str]] = None):
+        import requests
+
+        self.status_code = status_code
+        self._body = body
+        self.content = (body if isinstance(body, str) else json.dumps(body, ensure_ascii=False)).encode("utf-8")
+        self.cookies = requests.cookies.cookiejar_from_dict(cookies or {})
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8")
+
+    def json(self) -> Any:
+        if isinstance(self._body, str):
+            return json.loads(self._body)
+        return self._body
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            import requests
+
+            raise requests.HTTPError(f"{self.status_code} from replay transport", response=self)
+
+
+class ReplayTransport:
+    """Answer requests from recorded entries, optionally slower or failing.
+
+    Requests are matched by path and query parameters. Several entries for
+    the same request are served in turn, the last one repeating; unknown
+    requests get a 404.
+
+    Args:
+        entries: Cassette entries (see :func:`load_cassette`).
+        latency_ms: Delay added to every request.
+        jitter_ms: Extra random delay of up to this much.
+        error_rate: Probability that a request raises ``requests.ConnectionError``.
+        seed: Seed for jitter and errors, for repeatable runs.
+        shift_time: Move history timestamps so the newest recorded view is
+            "now"; otherwise old recordings fall outside the history window.
+    """
+
+    def __init__(self, entries: Iterable[Dict[str, Any]], latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 error_rate: float = 0.0, seed: Optional[int] = None, shift_time: bool = True):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        entries = list(entries)
+        self.shift = _history_shift(entries) if shift_time else 0
+        self._entries: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], List[Dict[str, Any]]] = {}
+        self._served: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], int] = {}
+        for entry in entries:
+            key = (entry["path"], tuple(sorted((k, str(v)) for k, v in entry.get("params", {}).items())))
+            self._entries.setdefault(key, []).append(entry)
+
+    @classmethod
+    def load(cls, path: str, **kwargs: Any) -> "ReplayTransport":
+        return cls(load_cassette(path), **kwargs)
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs: Any) -> ReplayResponse:
+        path, query = _request_key(url, params)
+        if self.shift and path == _HISTORY_PATH:
+            # 请求中的游标是平移后的时间，换算回录制时的值再匹配
+            query = tuple((k, str(int(v) - self.shift) if k == "view_at" and v.isdigit() and int(v) else v)
+                          for k, v in query)
+        key = (path, query)
+        with self._lock:
+            self.requests += 1
+            fail = self.error_rate > 0 and self._random.random() < self.error_rate
+            delay = self.latency_ms + (self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+            candidates = self._entries.get(key)
+            entry = None
+            if candidates and not fail:
+                served = self._served.get(key, 0)
+                entry = candidates[min(served, len(candidates) - 1)]
+                self._served[key] = served + 1
+            if fail:
+                self.errors += 1
+        if delay:
+            time.sleep(delay / 1000)
+        if fail:
+            import requests
+
+            raise requests.ConnectionError(f"injected error for {path}")
+        if entry is None:
+            return ReplayResponse(404, {"code": -404, "message": "not recorded"})
+        body = entry["body"]
+        if self.shift and path == _HISTORY_PATH:
+            body = _shift_history(body, self.shift)
+        return ReplayResponse(entry.get("status", 200), body, entry.get("cookies"))
+
+
+def _history_shift(entries: List[Dict[str, Any]]) -> int:
+    newest = 0
+    for entry in entries:
+        if entry["path"] == _HISTORY_PATH and isinstance(entry.get("body"), dict):
+            for item in (entry["body"].get("data") or {}).get("list") or ():
+                newest = max(newest, int(item.get("view_at") or 0))
+    return int(time.time()) - newest if newest else 0
+
+
+def _shift_history(body: Dict[str, Any], shift: int) -> Dict[str, Any]:
+    data = body.get("data")
+    if not isinstance(data, dict):
+        return body
+    records = [dict(item, view_at=item["view_at"] + shift) if item.get("view_at") else item
+               for item in data.get("list") or ()]
+    cursor = dict(data.get("cursor") or {})
+    if cursor.get("view_at"):
+        cursor["view_at"] += shift
+    return dict(body, data=dict(data, list=records, cursor=cursor))
@@ -1,15 +1,24 @@
+import atexit
 import os
 import flet as ft
 
 from client.bilibili_client import BilibiliClient
 from ui.login_screen import setup_login_screen
+from ui.theme import apply_theme
 from utils.logging_config import setup_logging
 
 logger = setup_logging()
 logger.info("应用启动")
 
+# 设置 BILIINSIGHT_METRICS=文件路径 时，退出前写入耗时统计（.prom 为 Prometheus 文本，其余为 JSON）
+_metrics_path = os.environ.get("BILIINSIGHT_METRICS")
+if _metrics_path:
+    from utils.metrics import REGISTRY
 
-def set_page_attribute(page: ft.Page):
+    atexit.register(REGISTRY.dump, _metrics_path)
+
+
+def set_page_attribute(page: ft.Page, dark: bool = True):
     """配置Flet页面"""
     # 使用相对路径，但基于脚本所在目录
     current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -22,16 +31,13 @@ def set_page_attribute(page: ft.Page):
         page.fonts = {
             "pingfang": font_path,
         }
-        page.theme = ft.Theme(
-            font_family="pingfang",
-            visual_density=ft.VisualDensity.COMFORTABLE,
-        )
+        font_family = "pingfang"
     else:
         logger.warning(f"找不到字体: {font_path}，使用系统字体")
-        page.theme = ft.Theme(
-            font_family="微软雅黑",  # 默认中文字体
-            visual_density=ft.VisualDensity.COMFORTABLE,
-        )
+        font_family = "微软雅黑"  # 默认中文字体
+
+    # 深浅两套配色同时设置，切换主题只需修改 theme_mode
+    apply_theme(page, dark, font_family)
 
     # 修改图标设置 - 使用完整的本地文件路径
     icon_path = os.path.join(static_dir, "bilibili.ico")
@@ -46,8 +52,6 @@ def set_page_attribute(page: ft.Page):
 
     # 设置页面属性
     page.title = "Bilibili Insight"
-    page.theme_mode = ft.ThemeMode.DARK
-    page.bgcolor = BilibiliClient.THEME_DARK
     page.padding = 0
     page.window_width = 1100
     page.window_height = 700
@@ -58,11 +62,16 @@ def set_page_attribute(page: ft.Page):
 def main(page: ft.Page):
 
     logger.info("初始化应用界面")
-    set_page_attribute(page)
 
-    # 创建客户端实例
+    # 创建客户端实例，页面按其保存的主题设置
     client = BilibiliClient()
     logger.debug("客户端实例已创建")
+    set_page_attribute(page, client.is_dark_theme)
+
+    # 有未过期的本地会话时直接进入主界面，否则走扫码登录。
+    if client.resume_session(page):
+        logger.info("已恢复本地登录会话")
+        return
 
     setup_login_screen(page, client)
 
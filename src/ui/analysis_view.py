@@ -1,22 +1,87 @@
 """Comprehensive analysis dashboard for watch history."""
 from __future__ import annotations
 
-from datetime import datetime, timedelta
 from typing import Any, Dict, List
 
 import flet as ft
 
 import logging
 
-logger = logging.getLogger("biliinsight.ui.analysis_view")
+from utils.analysis import generate_personality_report, generate_rollup_analysis
+from utils.chart_image import heatmap_size, render_bar_series, render_heatmap
+from utils.time_buckets import DayBuckets
+from utils.topk import most_common
 
+logger = logging.getLogger("biliinsight.ui.analysis_view")
 
-def show_analysis_overview(client, history: List[Dict[str, Any]], content_area: ft.Container) -> None:
-    """显示数据分析概览页面，包含统计卡片、趋势图和报告。"""
+# 热力图的行标签（星期一在第一行，与 HistoryRollups.hour_of_week 一致）
+_WEEKDAY_LABELS = ("周一", "周二", "周三", "周四", "周五", "周六", "周日")
+# 热力图格子边长和间距（逻辑像素）
+_HEATMAP_CELL = 22
+_HEATMAP_GAP = 3
+
+# 每日观看时长超过这个天数时画成图片，而不是每天一根柱子
+_DAILY_BAR_CHART_MAX_DAYS = 31
+# 每日观看图片的逻辑尺寸，显示时横向拉伸填满卡片
+_DAILY_IMAGE_WIDTH = 730
+_DAILY_IMAGE_HEIGHT = 200
+
+# 分区饼图的边长和扇区颜色，最后一种颜色用于“其他”
+_PIE_SIZE = 200
+_CATEGORY_COLORS = (
+    "#FB7299", "#23ADE5", "#FFB027", "#7BC67E", "#A178DF", "#FF7F50", "#4DD0C4", "#9E9E9E",
+)
+
+# 后台构建中的区块占位的 key，基准测试据此等待页面完整显示
+ANALYSIS_PLACEHOLDER_KEY = "analysis_loading"
+# 各区块占位的高度（逻辑像素），接近构建完成后的高度
+_SECTION_HEIGHTS = {
+    "highlight": 160,
+    "daily": 300,
+    "charts": 320,
+    "heatmap": 280,
+    "report": 240,
+}
+
+# 分析页可选的统计范围（天）
+_ANALYSIS_RANGES = {
+    7: "最近一周",
+    30: "最近一月",
+    90: "最近一季",
+    365: "最近一年",
+}
+
+
+def show_analysis_overview(client, history: List[Dict[str, Any]], content_area: ft.Container,
+                           days: int | None = None) -> None:
+    """显示数据分析概览页面，包含统计卡片、趋势图和报告。
+
+    统计直接读取同步时增量维护的按天预聚合表，切换到月、季、年范围也不会扫描原始记录。
+    标题和统计卡片在第一帧显示，亮点、图表、热力图和报告各自带占位，随后在后台线程中构建。
+    """
     theme = client.get_current_theme_colors()
-    analysis_data = generate_analysis_data(history)
+    days = days or client.history_window_days
+    analysis_data = generate_rollup_analysis(client.get_rollups(), days=days)
+
+    def on_range_change(e):
+        show_analysis_overview(client, history, content_area, days=int(e.control.value))
 
-    title = ft.Text("数据分析概览", size=24, weight="bold", color=theme["text"])
+    range_options = dict(_ANALYSIS_RANGES)
+    range_options.setdefault(days, f"最近 {days} 天")
+    title = ft.Row(
+        [
+            ft.Text("数据分析概览", size=24, weight="bold", color=theme["text"]),
+            ft.Dropdown(
+                options=[ft.dropdown.Option(key=str(key), text=text)
+                         for key, text in sorted(range_options.items())],
+                value=str(days),
+                dense=True,
+                width=140,
+                on_change=on_range_change,
+            ),
+        ],
+        alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+    )
 
     stats_wrap = ft.Wrap(
         controls=[
@@ -31,38 +96,86 @@ def show_analysis_overview(client, history: List[Dict[str, Any]], content_area:
         run_spacing=15,
     )
 
-    highlight_section = _create_highlight_section(client, analysis_data)
+    # 统计卡片直接显示；其余区块先放占位，页面出现后再在后台线程中逐个构建
+    sections = [
+        (_SECTION_HEIGHTS["highlight"], lambda: _create_highlight_section(client, analysis_data)),
+        (_SECTION_HEIGHTS["daily"], lambda: _section_card(client, [
+            ft.Text("每日观看时长变化", size=16, weight="bold", color=theme["text"]),
+            ft.Container(height=10),
+            create_daily_progress_chart(client, analysis_data),
+        ])),
+        (_SECTION_HEIGHTS["charts"], lambda: _section_card(client, [_create_charts_row(client, analysis_data)])),
+        (_SECTION_HEIGHTS["heatmap"], lambda: _section_card(client, [
+            ft.Text("观看时段热力图", size=16, weight="bold", color=theme["text"]),
+            ft.Container(height=10),
+            create_heatmap_chart(client, days),
+        ])),
+        (_SECTION_HEIGHTS["report"], lambda: _create_report_section(client, analysis_data)),
+    ]
+    slots = [_placeholder(client, height) for height, _ in sections]
 
-    daily_progress_chart = create_daily_progress_chart(client, analysis_data)
-    category_chart = create_category_chart(client, analysis_data)
-    time_chart = create_time_chart(client, analysis_data)
+    body: List[ft.Control] = [title, ft.Container(height=20), stats_wrap]
+    for slot in slots:
+        body.extend([ft.Container(height=20), slot])
+    content = ft.Column(
+        body,
+        spacing=10,
+        expand=True,
+        scroll=ft.ScrollMode.AUTO,
+    )
 
-    personality_report = generate_personality_report(analysis_data)
-    personality_report_container = ft.Container(
-        content=ft.Column(
-            [
-                ft.Text("分析报告", size=16, weight="bold", color=theme["text"]),
-                ft.Container(height=10),
-                ft.Markdown(
-                    personality_report,
-                    selectable=True,
-                    extension_set=ft.MarkdownExtensionSet.GITHUB_WEB,
-                    code_theme="atom-one-dark",
-                ),
-            ]
-        ),
-        bgcolor=theme["card"],
+    def build_sections() -> None:
+        for slot, (_, build) in zip(slots, sections):
+            try:
+                slot.content = build()
+            except Exception as exc:
+                logger.exception("构建分析区块失败: %s", exc)
+                slot.content = ft.Text(f"加载失败: {exc}", color=ft.Colors.GREY_400)
+            slot.height = None
+            slot.key = None
+            # 切换了统计范围或页面已被隐藏时只保留结果，挂回页面时一并显示
+            if slot.page is not None:
+                slot.update()
+
+    content_area.content = content
+    content_area.update()
+    page = content_area.page
+    if page is None:
+        build_sections()
+    else:
+        page.run_thread(build_sections)
+
+
+def _placeholder(client, height: int) -> ft.Container:
+    """区块构建完成前的占位，高度接近最终内容，避免加载后页面跳动。"""
+    return ft.Container(
+        key=ANALYSIS_PLACEHOLDER_KEY,
+        height=height,
+        bgcolor=client.get_current_theme_colors()["card"],
+        border_radius=10,
+        alignment=ft.Alignment.CENTER,
+        content=ft.ProgressRing(width=24, height=24, stroke_width=2, color=client.THEME_PRIMARY),
+    )
+
+
+def _section_card(client, controls: List[ft.Control]) -> ft.Container:
+    return ft.Container(
+        content=ft.Column(controls),
+        bgcolor=client.get_current_theme_colors()["card"],
         border_radius=10,
         padding=15,
     )
 
-    charts_row = ft.ResponsiveRow(
+
+def _create_charts_row(client, data: Dict[str, Any]) -> ft.ResponsiveRow:
+    theme = client.get_current_theme_colors()
+    return ft.ResponsiveRow(
         controls=[
             ft.Column(
                 [
                     ft.Text("分区分布", size=16, weight="bold", color=theme["text"]),
                     ft.Container(height=10),
-                    category_chart,
+                    create_category_chart(client, data),
                 ],
                 col=6,
             ),
@@ -70,7 +183,7 @@ def show_analysis_overview(client, history: List[Dict[str, Any]], content_area:
                 [
                     ft.Text("时段分布", size=16, weight="bold", color=theme["text"]),
                     ft.Container(height=10),
-                    time_chart,
+                    create_time_chart(client, data),
                 ],
                 col=6,
             ),
@@ -79,140 +192,28 @@ def show_analysis_overview(client, history: List[Dict[str, Any]], content_area:
         run_spacing=20,
     )
 
-    content = ft.Column(
-        [
-            title,
-            ft.Container(height=20),
-            stats_wrap,
-            ft.Container(height=20),
-            highlight_section,
-            ft.Container(height=20),
-            ft.Container(
-                content=ft.Column(
-                    [
-                        ft.Text("每日观看时长变化", size=16, weight="bold", color=theme["text"]),
-                        ft.Container(height=10),
-                        daily_progress_chart,
-                    ]
+
+def _create_report_section(client, data: Dict[str, Any]) -> ft.Container:
+    theme = client.get_current_theme_colors()
+    personality_report = generate_personality_report(data)
+    return ft.Container(
+        content=ft.Column(
+            [
+                ft.Text("分析报告", size=16, weight="bold", color=theme["text"]),
+                ft.Container(height=10),
+                ft.Markdown(
+                    personality_report,
+                    selectable=True,
+                    extension_set=ft.MarkdownExtensionSet.GITHUB_WEB,
+                    code_theme="atom-one-dark",
                 ),
-                bgcolor=theme["card"],
-                border_radius=10,
-                padding=15,
-            ),
-            ft.Container(height=20),
-            ft.Container(
-                content=charts_row,
-                bgcolor=theme["card"],
-                border_radius=10,
-                padding=15,
-            ),
-            ft.Container(height=20),
-            personality_report_container,
-        ],
-        spacing=10,
-        expand=True,
-        scroll=ft.ScrollMode.AUTO,
+            ]
+        ),
+        bgcolor=theme["card"],
+        border_radius=10,
+        padding=15,
     )
 
-    content_area.content = content
-    content_area.update()
-
-
-def generate_analysis_data(history: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """从历史记录中提取统计信息。"""
-    logger.debug("开始生成分析数据，历史记录数量: %s", len(history))
-
-    result: Dict[str, Any] = {
-        "total_videos": len(history),
-        "total_hours": 0,
-        "avg_daily": 0,
-        "top_category": "暂无数据",
-        "categories": {},
-        "daily_stats": {},
-        "time_distribution": {
-            "0-6点": 0,
-            "6-12点": 0,
-            "12-18点": 0,
-            "18-24点": 0,
-        },
-        "top_up_name": "暂无数据",
-        "up_counter": {},
-        "active_days": 0,
-        "viewing_streak": 0,
-    }
-
-    category_counter: Dict[str, int] = {}
-    up_counter: Dict[str, int] = {}
-    total_progress = 0
-
-    today = datetime.now().date()
-    daily_stats: Dict[str, Dict[str, Any]] = {}
-    for i in range(6, -1, -1):
-        date = today - timedelta(days=i)
-        date_str = date.strftime("%m-%d")
-        daily_stats[date_str] = {"count": 0, "progress": 0, "date": date_str}
-
-    for item in history:
-        progress = _get_watch_seconds(item)
-        total_progress += progress
-
-        category = (item.get("tag_name") or "").strip()
-        if category:
-            category_counter[category] = category_counter.get(category, 0) + 1
-
-        author = item.get("author_name") or item.get("author")
-        if author:
-            up_counter[author] = up_counter.get(author, 0) + 1
-
-        view_at = item.get("view_at")
-        if view_at:
-            try:
-                view_time = datetime.fromtimestamp(int(view_at))
-            except (TypeError, ValueError):
-                view_time = None
-            if view_time:
-                hour = view_time.hour
-                if 0 <= hour < 6:
-                    result["time_distribution"]["0-6点"] += 1
-                elif 6 <= hour < 12:
-                    result["time_distribution"]["6-12点"] += 1
-                elif 12 <= hour < 18:
-                    result["time_distribution"]["12-18点"] += 1
-                else:
-                    result["time_distribution"]["18-24点"] += 1
-
-                date_key = view_time.strftime("%m-%d")
-                if date_key in daily_stats:
-                    daily_stats[date_key]["count"] += 1
-                    daily_stats[date_key]["progress"] += progress
-
-    result["total_hours"] = round(total_progress / 3600, 1)
-    result["avg_daily"] = round(len(history) / 7, 1) if history else 0
-
-    if category_counter:
-        result["top_category"] = max(category_counter.items(), key=lambda x: x[1])[0]
-    result["categories"] = category_counter
-
-    if up_counter:
-        result["top_up_name"] = max(up_counter.items(), key=lambda x: x[1])[0]
-    result["up_counter"] = up_counter
-
-    result["daily_stats"] = [
-        {
-            "date": date,
-            "count": stats["count"],
-            "progress": round(stats["progress"] / 60, 1),
-        }
-        for date, stats in daily_stats.items()
-    ]
-
-    active_days = sum(1 for stats in daily_stats.values() if stats["count"] > 0)
-    result["active_days"] = active_days
-    result["viewing_streak"] = _calculate_viewing_streak(daily_stats)
-
-    logger.debug("分析数据生成完成: %s", result)
-    return result
-
 
 def create_stat_card(client, title: str, value: str, icon: str) -> ft.Container:
     theme = client.get_current_theme_colors()
@@ -237,190 +238,256 @@ def create_stat_card(client, title: str, value: str, icon: str) -> ft.Container:
     )
 
 
-def create_category_chart(client, data: Dict[str, Any]) -> ft.Column:
+def create_category_chart(client, data: Dict[str, Any]) -> ft.Control:
+    """前 7 个分区的饼图，其余合并为“其他”，右侧为图例（颜色取自 _CATEGORY_COLORS，最后一种留给“其他”）。"""
     theme = client.get_current_theme_colors()
-    chart_content = ft.Column(spacing=8)
 
     valid_categories = {k: v for k, v in data["categories"].items() if k}
-    categories = sorted(valid_categories.items(), key=lambda x: x[1], reverse=True)
+    categories = most_common(valid_categories, len(_CATEGORY_COLORS) - 1)
 
     if not categories:
         return ft.Column([
             ft.Text("暂无分区数据", color=theme["text"]),
         ])
 
-    total_value = sum(value for _, value in categories)
-    max_bar_width = 400
+    total_value = sum(valid_categories.values())
+    rest = total_value - sum(value for _, value in categories)
+    if rest:
+        categories.append(("其他", rest))
 
-    for category, value in categories[:8]:
+    sections = []
+    legend = []
+    for (category, value), color in zip(categories, _CATEGORY_COLORS):
         percent = value / total_value if total_value else 0
-        bar_width = int(max_bar_width * percent)
-        chart_content.controls.append(
-            ft.Column(
+        sections.append(
+            ft.PieChartSection(
+                value,
+                color=color,
+                radius=70,
+                # 太小的扇区放不下文字，只在图例中显示
+                title=f"{percent * 100:.0f}%" if percent >= 0.06 else "",
+                title_style=ft.TextStyle(size=11, color=ft.Colors.WHITE, weight=ft.FontWeight.BOLD),
+            )
+        )
+        legend.append(
+            ft.Row(
                 [
-                    ft.Row(
-                        [
-                            ft.Text(category, size=13, color=theme["text"]),
-                            ft.Row(
-                                [
-                                    ft.Text(f"{value} 个", size=13, color=theme["text"]),
-                                    ft.Text(f"{int(percent * 100)}%", size=13, color=client.THEME_PRIMARY, weight="bold"),
-                                ],
-                                spacing=5,
-                            ),
-                        ],
-                        alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
-                    ),
-                    ft.Stack(
-                        [
-                            ft.Container(
-                                bgcolor="#303030",
-                                height=8,
-                                width=max_bar_width,
-                                border_radius=4,
-                            ),
-                            ft.Container(
-                                bgcolor=client.THEME_PRIMARY,
-                                height=8,
-                                width=bar_width,
-                                border_radius=4,
-                            ),
-                        ]
-                    ),
+                    ft.Container(width=10, height=10, bgcolor=color, border_radius=5),
+                    ft.Text(f"{category} · {value} 个", size=13, color=theme["text"]),
                 ],
-                spacing=4,
+                spacing=8,
             )
         )
 
-    return chart_content
+    return ft.Row(
+        [
+            ft.PieChart(sections=sections, sections_space=1, center_space_radius=36,
+                        width=_PIE_SIZE, height=_PIE_SIZE),
+            ft.Column(legend, spacing=6),
+        ],
+        spacing=24,
+        wrap=True,
+        vertical_alignment=ft.CrossAxisAlignment.CENTER,
+    )
 
 
-def create_time_chart(client, data: Dict[str, Any]) -> ft.Row:
-    theme = client.get_current_theme_colors()
-    chart_bars: List[ft.Control] = []
+def create_time_chart(client, data: Dict[str, Any]) -> ft.Control:
+    """四个时段的柱状图，悬停显示数量和占比。"""
     time_data = data["time_distribution"]
-    max_value = max(time_data.values()) if any(time_data.values()) else 1
+    max_value = max(time_data.values(), default=0) or 1
     total_value = sum(time_data.values()) or 1
 
-    for time_range, value in time_data.items():
-        percent_text = f"{int(value / total_value * 100)}%"
-        height_ratio = value / max_value if max_value else 0
-        bar_height = max(160 * height_ratio, 4) if value else 4
-        chart_bars.append(
-            ft.Column(
-                [
-                    ft.Text(f"{value} 个", size=12, color=theme["text"], text_align=ft.TextAlign.CENTER),
-                    ft.Text(percent_text, size=12, color=client.THEME_PRIMARY, weight="bold", text_align=ft.TextAlign.CENTER),
-                    ft.Container(height=6),
-                    ft.Container(
-                        bgcolor=client.THEME_PRIMARY,
-                        height=bar_height,
-                        width=36,
-                        border_radius=ft.border_radius.only(top_left=6, top_right=6),
-                        tooltip=f"{time_range}: {value} 个视频 ({percent_text})",
-                    ),
-                    ft.Text(time_range, size=12, color=theme["text"], text_align=ft.TextAlign.CENTER),
-                ],
-                alignment=ft.MainAxisAlignment.END,
-                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                spacing=4,
-            )
+    groups = [
+        ft.BarChartGroup(
+            x=i,
+            bar_rods=[
+                ft.BarChartRod(
+                    to_y=value,
+                    width=36,
+                    color=client.THEME_PRIMARY,
+                    border_radius=ft.border_radius.only(top_left=6, top_right=6),
+                    tooltip=f"{time_range}: {value} 个视频 ({value / total_value * 100:.0f}%)",
+                )
+            ],
         )
+        for i, (time_range, value) in enumerate(time_data.items())
+    ]
+    return _bar_chart(client, groups, list(time_data), max_value * 1.1, height=220)
 
-    return ft.Row(chart_bars, alignment=ft.MainAxisAlignment.SPACE_AROUND)
+
+def _bar_chart(client, groups: List[ft.BarChartGroup], labels: List[str], max_y: float,
+               height: int, label_every: int = 1) -> ft.BarChart:
+    """按统一样式创建柱状图：横轴为 ``labels``（每隔 ``label_every`` 个显示一个），纵轴为数值。"""
+    theme = client.get_current_theme_colors()
+    grid = ft.ChartGridLines(color=ft.Colors.with_opacity(0.1, ft.Colors.ON_SURFACE), width=1)
+    return ft.BarChart(
+        bar_groups=groups,
+        max_y=max_y,
+        height=height,
+        interactive=True,
+        horizontal_grid_lines=grid,
+        tooltip_bgcolor=ft.Colors.with_opacity(0.9, ft.Colors.INVERSE_SURFACE),
+        left_axis=ft.ChartAxis(labels_size=40),
+        bottom_axis=ft.ChartAxis(
+            labels=[
+                ft.ChartAxisLabel(value=i, label=ft.Text(label, size=12, color=theme["text"]))
+                for i, label in enumerate(labels)
+                if i % label_every == 0
+            ],
+            labels_size=28,
+        ),
+    )
 
 
-def create_daily_progress_chart(client, data: Dict[str, Any]) -> ft.Container:
+def create_heatmap_chart(client, days: int) -> ft.Control:
+    """星期 × 小时的观看热力图。
+
+    与页面其他区块一样汇总所选范围内的按天预聚合表，整张图渲染成一张 PNG，
+    避免为 168 个格子各创建一个 Flet 控件。
+    """
     theme = client.get_current_theme_colors()
-    daily_data = data["daily_stats"]
-    reference_max = 240
-    actual_max = max((item["progress"] for item in daily_data), default=0)
-    if actual_max > reference_max:
-        reference_max = actual_max * 1.1
+    rollups = client.get_rollups()
+    first_day = DayBuckets(days, utc_offset=rollups.utc_offset).first_day
+    table = rollups.hour_of_week(first_day, days)
+    matrix = [table[weekday * 24:(weekday + 1) * 24] for weekday in range(7)]
+
+    def render() -> str:
+        # 透明底色，深浅主题共用同一张图
+        return render_heatmap(matrix, color=client.THEME_PRIMARY, background=None,
+                              cell=_HEATMAP_CELL, gap=_HEATMAP_GAP)
+
+    try:
+        image = client.chart_cache.get_or_create(
+            ("heatmap", client.history_version, rollups.utc_offset, first_day, days), render)
+    except ImportError:
+        logger.warning("未安装 Pillow，无法绘制热力图")
+        return ft.Text("需要安装 Pillow 才能显示热力图", color=ft.Colors.GREY_400)
+
+    width, height = heatmap_size(7, 24, _HEATMAP_CELL, _HEATMAP_GAP)
+    step = _HEATMAP_CELL + _HEATMAP_GAP
+    weekday_labels = ft.Column(
+        [
+            ft.Container(
+                content=ft.Text(label, size=11, color=theme["text"]),
+                height=_HEATMAP_CELL,
+                alignment=ft.Alignment.CENTER_RIGHT,
+            )
+            for label in _WEEKDAY_LABELS
+        ],
+        spacing=_HEATMAP_GAP,
+    )
+    hour_labels = ft.Row(
+        [
+            ft.Container(
+                content=ft.Text(str(hour), size=11, color=theme["text"]),
+                width=step * 3,
+            )
+            for hour in range(0, 24, 3)
+        ],
+        spacing=0,
+    )
+    peak = max(max(row) for row in matrix)
 
-    bars = []
-    for day_data in daily_data:
-        progress = day_data["progress"]
-        height_ratio = progress / reference_max if reference_max else 0
-        bar_height = max(200 * height_ratio, 4) if progress else 4
-        bars.append(
-            ft.Column(
+    return ft.Column(
+        [
+            ft.Row(
                 [
-                    ft.Text(f"{progress} 分钟", size=12, color=theme["text"], text_align=ft.TextAlign.CENTER),
-                    ft.Container(
-                        bgcolor=client.THEME_PRIMARY,
-                        height=bar_height,
-                        width=36,
-                        border_radius=ft.border_radius.only(top_left=6, top_right=6),
-                        tooltip=f"{day_data['date']}: {day_data['count']} 个视频，{progress} 分钟",
+                    weekday_labels,
+                    ft.Column(
+                        [
+                            ft.Image(src="", src_base64=image, width=width, height=height, fit="fill"),
+                            hour_labels,
+                        ],
+                        spacing=4,
                     ),
-                    ft.Text(day_data["date"], size=12, color=theme["text"], text_align=ft.TextAlign.CENTER),
                 ],
-                alignment=ft.MainAxisAlignment.END,
-                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                spacing=6,
-            )
-        )
-
-    return ft.Container(content=ft.Row(bars, spacing=10, alignment=ft.MainAxisAlignment.SPACE_BETWEEN))
-
-
-def generate_personality_report(data: Dict[str, Any]) -> str:
-    total_videos = data["total_videos"]
-    total_hours = data["total_hours"]
-    top_category = data["top_category"]
-    top_up = data["top_up_name"]
-    time_distribution = data["time_distribution"]
-    daily_stats = data["daily_stats"]
-    viewing_streak = data["viewing_streak"]
-    active_days = data["active_days"]
-
-    prime_time = max(time_distribution.items(), key=lambda x: x[1])[0]
-    daily_progress = [day["progress"] for day in daily_stats]
-    avg_progress = sum(daily_progress) / len(daily_progress) if daily_progress else 0
-    variance = sum((p - avg_progress) ** 2 for p in daily_progress) / len(daily_progress) if daily_progress else 0
-    viewing_regularity = "规律" if daily_progress and variance < (avg_progress * 0.6 if avg_progress else 1) else "不规律"
-
-    report_lines = ["📊 **B站观看习惯分析**\n"]
-
-    if total_hours > 14:
-        report_lines.append(f"过去 7 天你观看了 {total_hours} 小时的内容，是位重度B站用户！")
-    elif total_hours > 7:
-        report_lines.append(f"过去 7 天你观看了 {total_hours} 小时的内容，属于中度活跃用户。")
-    elif total_hours > 0:
-        report_lines.append(f"过去 7 天你观看了 {total_hours} 小时的内容，偏向轻度休闲。")
-    else:
-        report_lines.append("最近几天几乎没有观看记录，或许可以找时间补补番。")
+                spacing=8,
+                vertical_alignment=ft.CrossAxisAlignment.START,
+                scroll=ft.ScrollMode.AUTO,
+            ),
+            ft.Text(
+                f"按本地时间统计最近 {days} 天的历史记录，颜色越深观看越多"
+                f"（单格最多 {peak} 个）",
+                size=12,
+                color=ft.Colors.GREY_400,
+            ),
+        ],
+        spacing=10,
+    )
 
-    if total_videos:
-        report_lines.append(f"\n你最常关注的分区是「{top_category}」，常看的UP主是「{top_up}」。")
-        report_lines.append(f"\n主要观看时间集中在 {prime_time} 时段，最近 7 天里有 {active_days} 天打开过B站。")
-    else:
-        report_lines.append("\n暂无足够数据生成更详细的偏好分析。")
 
-    report_lines.append(f"\n观看连击为 {viewing_streak} 天，你的观看节奏整体{viewing_regularity}。")
+def create_daily_progress_chart(client, data: Dict[str, Any]) -> ft.Control:
+    """每天观看分钟数。
 
-    report_lines.append("\n**个性化建议：**")
-    if viewing_regularity == "不规律" and total_hours > 7:
-        report_lines.append("- 尝试规划固定的观影时间，避免过度刷视频")
-    if prime_time == "0-6点":
-        report_lines.append("- 深夜观看较多，注意保证充足睡眠")
-    if total_videos and top_category:
-        report_lines.append("- 可以多探索不同的分区，丰富观影类型")
+    一个月以内每天一根柱子（BarChart）；更长的范围画成一张图片，
+    年视图也只需一个 Image 控件。
+    """
+    theme = client.get_current_theme_colors()
+    daily_data = data["daily_stats"]
+    if not daily_data:
+        return ft.Text("暂无观看数据", color=theme["text"])
+    reference_max = 240
+    actual_max = max(item["progress"] for item in daily_data)
+    if actual_max > reference_max:
+        reference_max = actual_max * 1.1
 
-    return "\n".join(report_lines)
+    if len(daily_data) > _DAILY_BAR_CHART_MAX_DAYS:
+        return _daily_progress_image(client, daily_data, reference_max)
+
+    groups = [
+        ft.BarChartGroup(
+            x=i,
+            bar_rods=[
+                ft.BarChartRod(
+                    to_y=day_data["progress"],
+                    width=16 if len(daily_data) > 14 else 28,
+                    color=client.THEME_PRIMARY,
+                    border_radius=ft.border_radius.only(top_left=4, top_right=4),
+                    tooltip=f"{day_data['date']}: {day_data['count']} 个视频，{day_data['progress']} 分钟",
+                )
+            ],
+        )
+        for i, day_data in enumerate(daily_data)
+    ]
+    return _bar_chart(client, groups, [day["date"] for day in daily_data], reference_max,
+                      height=260, label_every=max(1, len(daily_data) // 7))
 
 
-def _calculate_viewing_streak(daily_stats: Dict[str, Dict[str, Any]]) -> int:
-    streak = 0
-    max_streak = 0
-    for stats in daily_stats.values():
-        if stats["count"] > 0:
-            streak += 1
-            max_streak = max(max_streak, streak)
-        else:
-            streak = 0
-    return max_streak
+def _daily_progress_image(client, daily_data: List[Dict[str, Any]], reference_max: float) -> ft.Control:
+    """长时间范围的每日观看分钟数：渲染成一张柱状图图片，下方标注起止日期。"""
+    theme = client.get_current_theme_colors()
+    values = [day["progress"] for day in daily_data]
+    first, last = daily_data[0]["date"], daily_data[-1]["date"]
+
+    def render() -> str:
+        return render_bar_series(values, client.THEME_PRIMARY, _DAILY_IMAGE_WIDTH, _DAILY_IMAGE_HEIGHT,
+                                 max_value=reference_max)
+
+    try:
+        # 日期范围和历史版本相同时数据相同
+        image = client.chart_cache.get_or_create(
+            ("daily_progress", client.history_version, first, last), render)
+    except ImportError:
+        logger.warning("未安装 Pillow，无法绘制每日观看图")
+        return ft.Text("需要安装 Pillow 才能显示每日观看图", color=ft.Colors.GREY_400)
+
+    peak = max(daily_data, key=lambda day: day["progress"])
+    return ft.Column(
+        [
+            ft.Image(src="", src_base64=image, height=_DAILY_IMAGE_HEIGHT, fit=ft.ImageFit.FILL),
+            ft.Row(
+                [ft.Text(first, size=12, color=theme["text"]), ft.Text(last, size=12, color=theme["text"])],
+                alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+            ),
+            ft.Text(
+                f"共 {len(daily_data)} 天，最多的一天是 {peak['date']}（{peak['progress']} 分钟）",
+                size=12,
+                color=ft.Colors.GREY_400,
+            ),
+        ],
+        spacing=6,
+        horizontal_alignment=ft.CrossAxisAlignment.STRETCH,
+    )
 
 
 def _create_highlight_section(client, data: Dict[str, Any]) -> ft.Container:
@@ -436,7 +503,7 @@ def _create_highlight_section(client, data: Dict[str, Any]) -> ft.Container:
     if summary_text:
         highlight_controls.append(ft.Text(summary_text, size=14, color=theme["text"]))
     if up_counter:
-        top_items = sorted(up_counter.items(), key=lambda x: x[1], reverse=True)[:5]
+        top_items = most_common(up_counter, 5)
         highlight_controls.append(
             ft.Column(
                 [
@@ -459,7 +526,7 @@ def _create_highlight_section(client, data: Dict[str, Any]) -> ft.Container:
         )
 
     if data.get("categories"):
-        top_categories = sorted(data["categories"].items(), key=lambda x: x[1], reverse=True)[:5]
+        top_categories = most_common(data["categories"], 5)
         highlight_controls.append(
             ft.Column(
                 [
@@ -490,10 +557,3 @@ def _create_highlight_section(client, data: Dict[str, Any]) -> ft.Container:
         border_radius=10,
         padding=15,
     )
-
-
-def _get_watch_seconds(item: Dict[str, Any]) -> int:
-    progress = int(item.get("progress", 0) or 0)
-    if progress < 0:
-        progress = int(item.get("duration", 0) or 0)
-    return max(progress, 0)
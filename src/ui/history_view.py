@@ -1,18 +1,48 @@
 """Watch history view with advanced filtering and insights."""
 from __future__ import annotations
 
-from datetime import datetime, timedelta
-from typing import Any, Dict, Iterable, List
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
 
 import flet as ft
 
-from utils.history_exporter import export_history_to_csv
-
-
-def show_watch_history(client, history: List[Dict[str, Any]], content_area: ft.Container) -> None:
-    """Render the watch history view with filtering, summary and export tools."""
+from client.history_refresher import record_key
+from utils.history_model import (
+    SORT_DURATION_ASC,
+    SORT_DURATION_DESC,
+    SORT_NEWEST,
+    HistoryIndex,
+    SelectionSummary,
+    watch_seconds,
+)
+from utils.metrics import Span, span
+from utils.profiling import profile_action
+
+_TIMEFRAME_DAYS = {
+    "最近24小时": 1,
+    "最近3天": 3,
+    "最近7天": 7,
+    "最近30天": 30,
+}
+
+_SORT_MODES = {
+    "最新观看": SORT_NEWEST,
+    "观看时长（高→低）": SORT_DURATION_DESC,
+    "观看时长（低→高）": SORT_DURATION_ASC,
+}
+
+
+def show_watch_history(client, history: List[Dict[str, Any]], content_area: ft.Container):
+    """Render the watch history view with filtering, summary and export tools.
+
+    Returns the function that re-applies the filters to the current history,
+    which ``ui.view_cache`` calls instead of rebuilding the view.
+    """
     # 缓存最新历史数据以便其他视图复用
-    client.history = history
+    if history is not client.history:
+        client.set_history(history)
 
     theme = client.get_current_theme_colors()
     page = content_area.page
@@ -22,9 +52,25 @@ def show_watch_history(client, history: List[Dict[str, Any]], content_area: ft.C
     subtitle = ft.Text("快速筛选、排序并导出你的观看足迹", size=14, color=ft.Colors.GREY_400)
 
     filtered_records: List[Dict[str, Any]] = []
-
-    # 摘要信息容器
-    summary_wrap = ft.Wrap(spacing=12, run_spacing=12)
+    # 卡片按记录缓存在客户端上，筛选、排序和后台刷新时复用
+    card_cache = client.card_cache
+    render_lock = threading.Lock()
+
+    # 摘要信息容器：卡片只创建一次，刷新时只更新数值文本
+    summary_values = {
+        name: ft.Text("", size=16, weight="w600", color=theme["text"])
+        for name in ("count", "duration", "creator", "category")
+    }
+    summary_wrap = ft.Wrap(
+        controls=[
+            _create_summary_chip(client, ft.Icons.VIDEO_COLLECTION, "视频数量", summary_values["count"]),
+            _create_summary_chip(client, ft.Icons.ACCESS_TIME, "累计观看", summary_values["duration"]),
+            _create_summary_chip(client, ft.Icons.GROUP, "常看的UP", summary_values["creator"]),
+            _create_summary_chip(client, ft.Icons.CATEGORY, "热门分区", summary_values["category"]),
+        ],
+        spacing=12,
+        run_spacing=12,
+    )
 
     # 历史记录展示容器
     history_grid = ft.GridView(
@@ -36,7 +82,26 @@ def show_watch_history(client, history: List[Dict[str, Any]], content_area: ft.C
         run_spacing=20,
         padding=20,
     )
-    history_container = ft.Container(expand=True, content=history_grid)
+    empty_state = ft.Container(
+        content=ft.Column(
+            [
+                ft.Icon(ft.Icons.HISTORY_TOGGLE_OFF,
+                        size=64, color=client.THEME_PRIMARY),
+                ft.Text("没有符合条件的观看记录", size=18, color=theme["text"]),
+            ],
+            alignment=ft.MainAxisAlignment.CENTER,
+            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+            spacing=16,
+        ),
+        alignment=ft.Alignment.CENTER,
+        expand=True,
+        visible=False,
+    )
+    # 网格和空状态同时挂载，切换时只修改 visible，避免整个网格被重新发送
+    history_container = ft.Container(
+        expand=True,
+        content=ft.Column([history_grid, empty_state], expand=True, spacing=0),
+    )
 
     # 过滤器控件
     search_field = ft.TextField(
@@ -79,84 +144,100 @@ def show_watch_history(client, history: List[Dict[str, Any]], content_area: ft.C
         width=170,
     )
 
-    def update_summary(records: Iterable[Dict[str, Any]]) -> None:
-        """Rebuild summary chips using the filtered records."""
-        record_list = list(records)
-        total_seconds = sum(_get_watch_seconds(item) for item in record_list)
-        total_minutes = int(total_seconds // 60)
-
-        top_category = _most_common(
-            record_list, key=lambda x: x.get("tag_name") or "") or "暂无数据"
-        top_creator = _most_common(record_list, key=lambda x: x.get(
-            "author_name") or x.get("author") or "") or "暂无数据"
-
-        summary_wrap.controls = [
-            _create_summary_chip(
-                client, ft.Icons.VIDEO_COLLECTION, "视频数量", f"{len(record_list)} 条"),
-            _create_summary_chip(client, ft.Icons.ACCESS_TIME,
-                                 "累计观看", _format_minutes(total_minutes)),
-            _create_summary_chip(client, ft.Icons.GROUP, "常看的UP", top_creator),
-            _create_summary_chip(client, ft.Icons.CATEGORY,
-                                 "热门分区", top_category),
-        ]
-        summary_wrap.update()
+    # 摘要随筛选结果增量更新，只计算进入或离开结果的记录
+    summary = SelectionSummary()
+
+    def update_summary(index: HistoryIndex, selected: List[int]) -> None:
+        """Refresh the summary chip values from the filtered positions."""
+        summary.update(index, selected)
+        values = {
+            "count": f"{len(summary)} 条",
+            "duration": _format_minutes(int(summary.seconds // 60)),
+            "creator": summary.authors.top() or "暂无数据",
+            "category": summary.categories.top() or "暂无数据",
+        }
+        for name, value in values.items():
+            text = summary_values[name]
+            if text.value != value:
+                text.value = value
+                if text.page is not None:
+                    text.update()
+
+    def filter_records() -> Tuple[HistoryIndex, List[int]]:
+        """Return ``(index, selected)``: the positions matching the filters, in sort order."""
+        query = search_field.value or ""
+        timeframe = timeframe_filter.value or "全部时间"
+        sort_mode = _SORT_MODES.get(sort_filter.value or "最新观看", SORT_NEWEST)
+
+        # 排序结果按历史版本预先计算，时间范围用二分查找截断，这里只做一次顺序过滤
+        index = client.get_history_index()
+        days = _TIMEFRAME_DAYS.get(timeframe)
+        since = int(time.time()) - days * 24 * 3600 if days else None
+
+        return index, index.select(sort_mode, query=query, since=since)
+
+    def card_for(item: Dict[str, Any], batch: Span) -> ft.Card:
+        # 记录键 + 观看时间决定卡片内容；配色用主题颜色名，切换主题不需要新卡片
+        key = (record_key(item), item.get("view_at"))
+
+        def create() -> ft.Card:
+            batch.count += 1
+            return create_history_card(client, item, page)
+
+        return card_cache.get_or_create(key, create)
+
+    def render(index: HistoryIndex, selected: List[int]) -> None:
+        """Show the ``selected`` records in the grid, reusing cached cards.
 
+        Only the selected records get a card, taken from ``card_cache`` when
+        possible. The control list is swapped as a whole and Flet diffs it
+        against the previous children, so narrowing a search, a new order or
+        a background refresh sends only the moved, inserted or removed cards.
+        """
+        records = index.records
+        filtered_records.clear()
+        filtered_records.extend(records[i] for i in selected)
+
+        # count 为本批新建的卡片数，其余来自缓存
+        with span("history_view.card_batch") as batch:
+            cards: List[ft.Control] = [card_for(records[i], batch) for i in selected]
+        history_grid.controls = cards
+        history_grid.visible = bool(selected)
+        empty_state.visible = not selected
+        if history_container.page is not None:
+            history_container.update()
+
+        update_summary(index, selected)
+
+    def rerender(metric: str) -> None:
+        with render_lock, span(metric) as grid_span:
+            index, selected = filter_records()
+            grid_span.count = len(selected)
+            render(index, selected)
+
+    @profile_action("history_view.update_grid")
     def update_history_grid() -> None:
         """Apply filters, refresh the grid and update summary chips."""
-        query = (search_field.value or "").strip().lower()
-        timeframe = timeframe_filter.value or "全部时间"
-        sort_mode = sort_filter.value or "最新观看"
-
-        filtered = []
-        for item in history:
-            if query:
-                title_text = (item.get("title") or "").lower()
-                author_text = (item.get("author_name")
-                               or item.get("author") or "").lower()
-                if query not in title_text and query not in author_text:
-                    continue
-
-            if timeframe != "全部时间" and not _within_timeframe(item, timeframe):
-                continue
-
-            filtered.append(item)
-
-        # 排序
-        if sort_mode == "最新观看":
-            filtered.sort(key=lambda x: x.get("view_at", 0), reverse=True)
-        elif sort_mode == "观看时长（高→低）":
-            filtered.sort(key=_get_watch_seconds, reverse=True)
-        else:
-            filtered.sort(key=_get_watch_seconds)
+        rerender("history_view.update_grid")
 
-        filtered_records.clear()
-        filtered_records.extend(filtered)
+    listening = False
 
-        history_grid.controls.clear()
-        if not filtered:
-            history_container.content = ft.Container(
-                content=ft.Column(
-                    [
-                        ft.Icon(ft.Icons.HISTORY_TOGGLE_OFF,
-                                size=64, color=client.THEME_PRIMARY),
-                        ft.Text("没有符合条件的观看记录", size=18, color=theme["text"]),
-                    ],
-                    alignment=ft.MainAxisAlignment.CENTER,
-                    horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                    spacing=16,
-                ),
-                alignment=ft.Alignment.CENTER,
-                expand=True,
-            )
-        else:
-            for item in filtered:
-                history_grid.controls.append(
-                    create_history_card(client, item, page)
-                )
-            history_container.content = history_grid
+    def on_history_changed(delta: Dict[str, Any]) -> bool:
+        """Apply a background refresh; returns False once this view is no longer shown."""
+        nonlocal listening
+        if content.page is None:
+            listening = False
+            return False
+        rerender("history_view.refresh")
+        return True
 
-        history_container.update()
-        update_summary(filtered)
+    def refresh() -> None:
+        """Re-apply the filters to the current history when the view cache shows this view again."""
+        nonlocal listening
+        update_history_grid()
+        if not listening:
+            listening = True
+            client.add_history_listener(on_history_changed)
 
     def handle_export(_: ft.ControlEvent) -> None:
         """Export filtered history to CSV and show feedback."""
@@ -166,6 +247,8 @@ def show_watch_history(client, history: List[Dict[str, Any]], content_area: ft.C
             return
 
         try:
+            from utils.history_exporter import export_history_to_csv
+
             file_path = export_history_to_csv(export_source)
             _show_snackbar(page, f"已导出到 {file_path}", client.THEME_PRIMARY)
         except Exception as exc:  # pragma: no cover - UI feedback
@@ -210,7 +293,8 @@ def show_watch_history(client, history: List[Dict[str, Any]], content_area: ft.C
 
     content_area.content = content
     content_area.update()
-    update_history_grid()
+    refresh()
+    return refresh
 
 
 def create_history_card(client, item: Dict[str, Any], page: ft.Page) -> ft.Card:
@@ -221,7 +305,7 @@ def create_history_card(client, item: Dict[str, Any], page: ft.Page) -> ft.Card:
     title = item.get("title", "无标题")
     author = item.get("author_name") or item.get("author") or "未知作者"
     view_time = _format_timestamp(item.get("view_at"))
-    progress_seconds = _get_watch_seconds(item)
+    progress_seconds = watch_seconds(item)
     duration_seconds = max(int(item.get("duration", 0) or 0), progress_seconds)
     progress_ratio = min(progress_seconds / duration_seconds,
                          1) if duration_seconds else 0
@@ -339,33 +423,6 @@ def create_history_card(client, item: Dict[str, Any], page: ft.Page) -> ft.Card:
     )
 
 
-def _within_timeframe(item: Dict[str, Any], timeframe_label: str) -> bool:
-    days_mapping = {
-        "最近24小时": 1,
-        "最近3天": 3,
-        "最近7天": 7,
-        "最近30天": 30,
-    }
-    days = days_mapping.get(timeframe_label)
-    if not days:
-        return True
-
-    try:
-        view_at = int(item.get("view_at", 0))
-    except (TypeError, ValueError):
-        return False
-
-    view_time = datetime.fromtimestamp(view_at)
-    return datetime.now() - view_time <= timedelta(days=days)
-
-
-def _get_watch_seconds(item: Dict[str, Any]) -> int:
-    progress = int(item.get("progress", 0) or 0)
-    if progress < 0:
-        progress = int(item.get("duration", 0) or 0)
-    return max(progress, 0)
-
-
 def _resolve_video_url(item: Dict[str, Any]) -> str | None:
     bvid = item.get("bvid") or item.get("history", {}).get("bvid")
     if bvid:
@@ -407,20 +464,10 @@ def _format_minutes(minutes: int) -> str:
     return f"{mins}分钟"
 
 
-def _most_common(records: Iterable[Dict[str, Any]], key) -> str | None:
-    counter: Dict[str, int] = {}
-    for item in records:
-        value = key(item)
-        if not value:
-            continue
-        counter[value] = counter.get(value, 0) + 1
-    if not counter:
-        return None
-    return max(counter.items(), key=lambda kv: kv[1])[0]
-
-
-def _create_summary_chip(client, icon: str, label: str, value: str) -> ft.Container:
+def _create_summary_chip(client, icon: str, label: str, value: str | ft.Text) -> ft.Container:
     theme = client.get_current_theme_colors()
+    if not isinstance(value, ft.Text):
+        value = ft.Text(value, size=16, weight="w600", color=theme["text"])
     return ft.Container(
         bgcolor=theme["card"],
         border_radius=12,
@@ -431,8 +478,7 @@ def _create_summary_chip(client, icon: str, label: str, value: str) -> ft.Contai
                 ft.Column(
                     [
                         ft.Text(label, size=12, color=ft.Colors.GREY_500),
-                        ft.Text(value, size=16, weight="w600",
-                                color=theme["text"]),
+                        value,
                     ],
                     spacing=4,
                     alignment=ft.MainAxisAlignment.CENTER,
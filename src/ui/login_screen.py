@@ -1,21 +1,28 @@
 import flet as ft
 import threading
 
+from client.api import QR_CODE_SIZE
+from client.login_poller import STATUS_SCANNED
+from utils.startup import start_warmup
+
 
 def setup_login_screen(page: ft.Page, client) -> None:
     """渲染登录页面并在后台异步获取二维码。"""
     page.clean()
 
-    # 每次重绘登录页都创建一个新的会话标识，旧线程会自动失效。
+    # 每次重绘登录页都创建一个新的会话标识，并立即停止轮询旧二维码。
     client.login_session_id += 1
     session_id = client.login_session_id
+    client.cancel_login_polling()
 
     qr_image = ft.Image(
         src="",
         key="qr_code",
-        width=220,
-        height=220,
-        fit="contain",
+        width=QR_CODE_SIZE,
+        height=QR_CODE_SIZE,
+        # 二维码已按显示尺寸原样生成，不做缩放以免模糊。
+        fit="none",
+        gapless_playback=True,
         visible=False,
     )
     status_text = ft.Text(
@@ -35,6 +42,13 @@ def setup_login_screen(page: ft.Page, client) -> None:
         status_text.value = message
         status_text.color = color
 
+    def on_poll_status(status: int) -> None:
+        if session_id != client.login_session_id:
+            return
+        if status == STATUS_SCANNED:
+            set_status("已扫码，请在手机上确认登录", client.THEME_PRIMARY)
+            page.update()
+
     def fetch_qr_async() -> None:
         set_status("正在获取二维码...")
         loading_ring.visible = True
@@ -43,7 +57,7 @@ def setup_login_screen(page: ft.Page, client) -> None:
         page.update()
 
         def worker() -> None:
-            qr_data = client.get_qr_code()
+            qr_data = client.get_qr_code(QR_CODE_SIZE)
             if session_id != client.login_session_id:
                 return
 
@@ -54,19 +68,15 @@ def setup_login_screen(page: ft.Page, client) -> None:
                 page.update()
                 return
 
-            qrcode_key, qrcode_path = qr_data
-            qr_image.src = qrcode_path
+            qrcode_key, qrcode_base64 = qr_data
+            qr_image.src_base64 = qrcode_base64
             qr_image.visible = True
             loading_ring.visible = False
             refresh_button.disabled = False
             set_status("二维码已生成，请在手机端扫码登录", ft.Colors.GREEN_300)
             page.update()
 
-            threading.Thread(
-                target=client.check_login_status,
-                args=(qrcode_key, qrcode_path, page, session_id),
-                daemon=True,
-            ).start()
+            client.start_login_polling(qrcode_key, page, on_status=on_poll_status)
 
         threading.Thread(target=worker, daemon=True).start()
 
@@ -177,3 +187,5 @@ def setup_login_screen(page: ft.Page, client) -> None:
     page.add(root)
     page.update()
     fetch_qr_async()
+    # 首帧已绘制，在后台预加载主界面依赖，扫码期间即可完成。
+    start_warmup()
@@ -1,5 +1,19 @@
+import time
+
 import flet as ft
 
+from client.account_manager import SYNC_OK
+from client.history_refresher import HISTORY_WINDOW_OPTIONS, REFRESH_INTERVAL_OPTIONS
+from utils.diagnostics import estimate_records_bytes, format_bytes, format_rate
+from utils.metrics import REGISTRY
+from utils.profiling import (
+    PROFILE_CPROFILE,
+    PROFILE_MODES,
+    PROFILE_OFF,
+    PROFILE_SAMPLE,
+    profile_mode,
+)
+
 
 def show_settings(client, content_area: ft.Container) -> None:
     """Display settings page with working functionality."""
@@ -27,6 +41,7 @@ def show_settings(client, content_area: ft.Container) -> None:
                     color=theme["text"],
                 ),
                 ft.Divider(height=1, color=client.THEME_SECONDARY),
+                *_account_tiles(client, content_area),
                 ft.Container(  # 添加容器提供更好的间距
                     content=ft.ListTile(
                         leading=ft.Icon(ft.Icons.LOGOUT,
@@ -47,7 +62,119 @@ def show_settings(client, content_area: ft.Container) -> None:
                     margin=ft.margin.symmetric(vertical=5),  # 添加垂直间距
                 ),
 
-                # 移除外观部分
+                ft.Container(height=20),  # Spacer
+
+                # Appearance section
+                ft.Text(
+                    "外观",
+                    size=18,
+                    weight="w500",
+                    color=theme["text"],
+                ),
+                ft.Divider(height=1, color=client.THEME_SECONDARY),
+                ft.Container(
+                    content=ft.ListTile(
+                        leading=ft.Icon(
+                            ft.Icons.DARK_MODE,
+                            color=client.THEME_PRIMARY,
+                            size=22),
+                        title=ft.Text(
+                            "深色模式",
+                            color=theme["text"],
+                            size=15,
+                        ),
+                        trailing=ft.Switch(
+                            value=client.is_dark_theme,
+                            active_color=client.THEME_PRIMARY,
+                            on_change=lambda e: toggle_theme(e, client, content_area.page),
+                        ),
+                    ),
+                    margin=ft.margin.symmetric(vertical=5),
+                ),
+
+                ft.Container(height=20),  # Spacer
+
+                # Data section
+                ft.Text(
+                    "数据",
+                    size=18,
+                    weight="w500",
+                    color=theme["text"],
+                ),
+                ft.Divider(height=1, color=client.THEME_SECONDARY),
+                ft.Container(
+                    content=ft.ListTile(
+                        leading=ft.Icon(
+                            ft.Icons.UPDATE,
+                            color=client.THEME_PRIMARY,
+                            size=22),
+                        title=ft.Text(
+                            "自动刷新观看历史",
+                            color=theme["text"],
+                            size=15,
+                        ),
+                        trailing=_refresh_interval_dropdown(client),
+                    ),
+                    margin=ft.margin.symmetric(vertical=5),
+                ),
+                ft.Container(
+                    content=ft.ListTile(
+                        leading=ft.Icon(
+                            ft.Icons.DATE_RANGE,
+                            color=client.THEME_PRIMARY,
+                            size=22),
+                        title=ft.Text(
+                            "历史记录范围",
+                            color=theme["text"],
+                            size=15,
+                        ),
+                        trailing=_history_window_dropdown(client),
+                    ),
+                    margin=ft.margin.symmetric(vertical=5),
+                ),
+
+                ft.Container(height=20),  # Spacer
+
+                # Diagnostics section
+                ft.Text(
+                    "诊断",
+                    size=18,
+                    weight="w500",
+                    color=theme["text"],
+                ),
+                ft.Divider(height=1, color=client.THEME_SECONDARY),
+                *_diagnostics_tiles(client),
+
+                ft.Container(height=20),  # Spacer
+
+                # Developer section
+                ft.Text(
+                    "开发者",
+                    size=18,
+                    weight="w500",
+                    color=theme["text"],
+                ),
+                ft.Divider(height=1, color=client.THEME_SECONDARY),
+                ft.Container(
+                    content=ft.ListTile(
+                        leading=ft.Icon(
+                            ft.Icons.SPEED,
+                            color=client.THEME_PRIMARY,
+                            size=22),
+                        title=ft.Text(
+                            "性能分析",
+                            color=theme["text"],
+                            size=15,
+                        ),
+                        subtitle=ft.Text(
+                            "切换页面、筛选和同步时记录耗时，保存到 Log/profiles",
+                            color=ft.Colors.GREY_500,
+                            size=12,
+                        ),
+                        trailing=_profile_mode_dropdown(client),
+                    ),
+                    margin=ft.margin.symmetric(vertical=5),
+                ),
 
                 ft.Container(height=20),  # Spacer
 
@@ -117,6 +244,183 @@ def show_settings(client, content_area: ft.Container) -> None:
     content_area.update()
 
 
+def _account_tiles(client, content_area: ft.Container) -> list:
+    """多账号相关的设置项：切换到其他已保存账号、添加账号、同步全部账号。"""
+    theme = client.get_current_theme_colors()
+    current_mid = str(client.user_info["mid"]) if client.user_info else None
+
+    def tile(icon, text, on_click, trailing=None):
+        return ft.Container(
+            content=ft.ListTile(
+                leading=ft.Icon(icon, color=client.THEME_PRIMARY, size=22),
+                title=ft.Text(text, color=theme["text"], size=15),
+                trailing=trailing or ft.Icon(ft.Icons.ARROW_FORWARD_IOS, color=theme["text"], size=15),
+                on_click=on_click,
+            ),
+            margin=ft.margin.symmetric(vertical=5),
+        )
+
+    tiles = [
+        tile(ft.Icons.SWITCH_ACCOUNT, f"切换到 {info.get('uname') or info.get('mid')}",
+             lambda _, mid=info.get("mid"): client.switch_account(content_area.page, mid))
+        for info in client.list_accounts()
+        if str(info.get("mid")) != current_mid
+    ]
+    tiles.append(tile(ft.Icons.PERSON_ADD, "添加账号", lambda _: client.add_account(content_area.page)))
+
+    sync_status = ft.Text("", color=ft.Colors.GREY_400, size=14)
+
+    def sync_all(_):
+        page = content_area.page
+        if page is None or sync_status.value == "同步中...":
+            return
+        sync_status.value = "同步中..."
+        sync_status.update()
+
+        def run():
+            results = client.sync_all_accounts()
+            ok = [r for r in results if r["status"] == SYNC_OK]
+            failed = len(results) - len(ok)
+            summary = f"{len(ok)} 个账号，共 {sum(r['records'] for r in ok)} 条"
+            sync_status.value = summary + (f"，{failed} 个失败" if failed else "")
+            if sync_status.page is not None:
+                sync_status.update()
+
+        page.run_thread(run)
+
+    tiles.append(tile(ft.Icons.SYNC, "同步全部账号", sync_all, trailing=sync_status))
+    return tiles
+
+
+def _refresh_interval_dropdown(client) -> ft.Dropdown:
+    """后台自动刷新间隔，修改后立即生效并保存。"""
+
+    def label(seconds: int) -> str:
+        return "关闭" if not seconds else f"每 {seconds // 60} 分钟"
+
+    def on_change(e):
+        client.set_refresh_interval(int(e.control.value))
+
+    return ft.Dropdown(
+        options=[ft.dropdown.Option(key=str(seconds), text=label(seconds))
+                 for seconds in REFRESH_INTERVAL_OPTIONS],
+        value=str(int(client.history_refresher.interval)),
+        dense=True,
+        width=140,
+        on_change=on_change,
+    )
+
+
+def _history_window_dropdown(client) -> ft.Dropdown:
+    """拉取和分析的历史记录时间范围，修改后在后台按新范围重新同步。"""
+
+    def on_change(e):
+        client.set_history_window(int(e.control.value))
+
+    return ft.Dropdown(
+        options=[ft.dropdown.Option(key=str(days), text=f"最近 {days} 天")
+                 for days in HISTORY_WINDOW_OPTIONS],
+        value=str(client.history_window_days),
+        dense=True,
+        width=140,
+        on_change=on_change,
+    )
+
+
+def _diagnostics_tiles(client) -> list:
+    """运行状态：内存中的记录、各缓存命中率、最近一次同步和接口延迟，可单独清除缓存。"""
+    theme = client.get_current_theme_colors()
+    caches = (
+        ("历史卡片（封面）", ft.Icons.IMAGE, client.card_cache),
+        ("词云图片", ft.Icons.CLOUD, client.wordcloud_cache),
+        ("分析图表", ft.Icons.INSERT_CHART, client.chart_cache),
+    )
+    if client.view_cache is not None:
+        caches += (("页面", ft.Icons.TAB, client.view_cache),)
+    values = {name: ft.Text("", color=ft.Colors.GREY_500, size=12)
+              for name in ("memory", "sync", "api", *(label for label, _, _ in caches))}
+
+    def refresh(_=None):
+        history = client.history
+        values["memory"].value = (f"{len(history)} 条记录，"
+                                  f"约 {format_bytes(estimate_records_bytes(history))}")
+
+        sync = client.last_sync
+        if sync is None:
+            values["sync"].value = "本次启动尚未同步"
+        else:
+            values["sync"].value = (
+                f"{time.strftime('%H:%M:%S', time.localtime(sync['at']))} {sync['kind']}"
+                f"{'' if sync['ok'] else '（失败）'}，用时 {sync['seconds']:.1f} 秒，"
+                f"{sync['pages']} 页 {sync['records']} 条"
+            )
+
+        api = REGISTRY.snapshot().get("api.history_page")
+        if api is None:
+            values["api"].value = "暂无请求"
+        else:
+            values["api"].value = (
+                f"p50 {api['p50'] * 1000:.0f} ms · p90 {api['p90'] * 1000:.0f} ms · "
+                f"p99 {api['p99'] * 1000:.0f} ms，共 {api['calls']} 次"
+                + (f"，{api['errors']} 次失败" if api["errors"] else "")
+            )
+
+        for label, _, cache in caches:
+            stats = cache.stats()
+            values[label].value = (f"命中率 {format_rate(stats['hit_rate'])}，"
+                                   f"{stats['size']}/{stats['maxsize']} 项"
+                                   + (f"，{stats['controls']} 个控件" if "controls" in stats else ""))
+
+        if any(text.page is not None for text in values.values()):
+            for text in values.values():
+                text.update()
+
+    def clear(cache):
+        def on_click(_):
+            cache.clear()
+            refresh()
+        return on_click
+
+    def tile(icon, title, key, trailing=None):
+        return ft.Container(
+            content=ft.ListTile(
+                leading=ft.Icon(icon, color=client.THEME_PRIMARY, size=22),
+                title=ft.Text(title, color=theme["text"], size=15),
+                subtitle=values[key],
+                trailing=trailing,
+            ),
+            margin=ft.margin.symmetric(vertical=5),
+        )
+
+    refresh()
+    return [
+        tile(ft.Icons.MEMORY, "内存中的观看历史", "memory",
+             ft.IconButton(ft.Icons.REFRESH, icon_color=theme["text"], tooltip="刷新", on_click=refresh)),
+        tile(ft.Icons.SYNC, "最近一次同步", "sync"),
+        tile(ft.Icons.NETWORK_CHECK, "历史接口延迟", "api"),
+        *(tile(icon, label, label,
+               ft.TextButton("清除", style=ft.ButtonStyle(color=client.THEME_PRIMARY), on_click=clear(cache)))
+          for label, icon, cache in caches),
+    ]
+
+
+def _profile_mode_dropdown(client) -> ft.Dropdown:
+    """性能分析方式：cProfile 输出 .prof，采样输出可直接生成火焰图的折叠栈。"""
+    labels = {PROFILE_OFF: "关闭", PROFILE_CPROFILE: "cProfile", PROFILE_SAMPLE: "采样"}
+
+    def on_change(e):
+        client.set_profile_mode(PROFILE_OFF if e.control.value == "off" else e.control.value)
+
+    return ft.Dropdown(
+        # 下拉框的选项键不能为空字符串，关闭时用 "off" 表示
+        options=[ft.dropdown.Option(key=mode or "off", text=labels[mode]) for mode in PROFILE_MODES],
+        value=profile_mode() or "off",
+        dense=True,
+        width=140,
+        on_change=on_change,
+    )
+
+
 def logout(client, page: ft.Page) -> None:
     """处理用户退出登录功能，通过重启应用来完全重置状态"""
 
@@ -132,8 +436,8 @@ def logout(client, page: ft.Page) -> None:
             return
 
         try:
-            # 清除登录凭证
-            client.login_cookies = None
+            # 清除登录凭证（包括本地保存的会话）
+            client.clear_session()
 
             # 显示加载状态
             page.clean()
@@ -250,81 +554,15 @@ def logout(client, page: ft.Page) -> None:
     print("显示退出登录确认对话框")
 
 
-def toggle_theme(e, client, page: ft.Page, content_area: ft.Container) -> None:
-    """Toggle between light and dark theme for the entire application."""
-    is_dark = e.control.value
-    client.is_dark_theme = is_dark
-
-    # 设置全局主题
-    if is_dark:
-        page.theme_mode = ft.ThemeMode.DARK
-        page.bgcolor = client.THEME_DARK
-    else:
-        page.theme_mode = ft.ThemeMode.LIGHT
-        page.bgcolor = client.THEME_LIGHT
-
-    # 找到主布局中的侧边栏和内容区
-    if page.controls and len(page.controls) > 0:
-        main_row = page.controls[0]
-        if hasattr(main_row, 'controls') and len(main_row.controls) >= 3:
-            # 更新侧边栏
-            sidebar = main_row.controls[0]
-            update_container_theme(sidebar, client, is_dark)
-
-            # 获取当前视图类型并重新渲染
-            current_view = content_area.content
-            if current_view:
-                # 重新渲染对应视图
-                from ui.history_view import show_watch_history
-                from ui.wordcloud_view import show_wordcloud
-                from ui.settings_view import show_settings
-
-                # 获取历史数据
-                history = getattr(client, 'history', [])
-
-                # 根据当前视图类型重新渲染
-                if hasattr(current_view, 'key') and current_view.key == "history_view":
-                    show_watch_history(client, history, content_area)
-                elif hasattr(current_view, 'key') and current_view.key == "wordcloud_view":
-                    show_wordcloud(client, history, content_area)
-                else:
-                    # 默认重新渲染设置页面
-                    show_settings(client, content_area)
-
-    page.update()
-
+def toggle_theme(e, client, page: ft.Page) -> None:
+    """Switch between the light and dark theme.
 
-def update_container_theme(container, client, is_dark):
-    """递归更新容器及其子控件的主题颜色"""
-    theme = client.get_current_theme_colors()
-
-    # 更新容器背景色，特别处理侧边栏
-    if hasattr(container, 'bgcolor'):
-        if container.width == 220:  # 这是侧边栏的宽度
-            container.bgcolor = theme["bg"]
-        elif is_dark and container.bgcolor == client.THEME_CARD_LIGHT:
-            container.bgcolor = client.THEME_CARD_DARK
-        elif not is_dark and container.bgcolor == client.THEME_CARD_DARK:
-            container.bgcolor = client.THEME_CARD_LIGHT
-
-    # 更新文本颜色
-    if hasattr(container, 'color'):
-        if is_dark and container.color == client.THEME_TEXT_LIGHT:
-            container.color = client.THEME_TEXT_DARK
-        elif not is_dark and container.color == client.THEME_TEXT_DARK:
-            container.color = client.THEME_TEXT_LIGHT
-
-    # 递归更新子控件
-    if hasattr(container, 'content') and container.content:
-        if hasattr(container.content, 'controls'):
-            for control in container.content.controls:
-                update_container_theme(control, client, is_dark)
-        else:
-            update_container_theme(container.content, client, is_dark)
+    Controls use color-scheme tokens, so only ``page.theme_mode`` changes:
+    no view is rebuilt and no chart or word cloud is regenerated.
+    """
+    from ui.theme import set_dark_theme
 
-    if hasattr(container, 'controls'):
-        for control in container.controls:
-            update_container_theme(control, client, is_dark)
+    set_dark_theme(page, client, bool(e.control.value))
 
 
 def show_about_dialog(page: ft.Page, client) -> None:
@@ -1,10 +1,8 @@
 import flet as ft
 from typing import Dict, List, Any
 
-from ui.history_view import show_watch_history
-from ui.wordcloud_view import show_wordcloud
-from ui.settings_view import show_settings
-from ui.analysis_view import show_analysis_overview
+from ui.view_cache import ViewCache
+from utils.profiling import profile_action
 
 
 def create_sidebar(client, user_info: Dict[str, Any], content_area: ft.Container,
@@ -61,13 +59,47 @@ def create_sidebar(client, user_info: Dict[str, Any], content_area: ft.Container
         alignment=ft.Alignment.CENTER,
     )
 
+    # 视图模块在首次点击时才导入，避免拖慢登录页和主界面的首帧。
+    # 历史版本未变时直接换回保留的控件树；设置页内容随时变化，每次重建。
+    # 页面缓存属于这个内容区，重新创建主界面时随之重建。
+    if client.view_cache is None or client.view_cache.content_area is not content_area:
+        client.view_cache = ViewCache(content_area)
+    views = client.view_cache
+
+    @profile_action("nav.history")
+    def open_history(_) -> None:
+        from ui.history_view import show_watch_history
+        views.show("history", client.history_version,
+                   lambda: show_watch_history(client, history, content_area))
+        update_active_nav("history")
+
+    @profile_action("nav.analysis")
+    def open_analysis(_) -> None:
+        from ui.analysis_view import show_analysis_overview
+        views.show("analysis", client.history_version,
+                   lambda: show_analysis_overview(client, history, content_area))
+        update_active_nav("analysis")
+
+    @profile_action("nav.wordcloud")
+    def open_wordcloud(_) -> None:
+        from ui.wordcloud_view import show_wordcloud
+        views.show("wordcloud", client.history_version,
+                   lambda: show_wordcloud(client, history, content_area))
+        update_active_nav("wordcloud")
+
+    @profile_action("nav.settings")
+    def open_settings(_) -> None:
+        from ui.settings_view import show_settings
+        views.show("settings", client.history_version,
+                   lambda: show_settings(client, content_area), cache=False)
+        update_active_nav("settings")
+
     nav_history = create_nav_item(
         client,
         "历史记录",
         ft.Icons.HISTORY,
         "history",
-        lambda _: [show_watch_history(
-            client, history, content_area), update_active_nav("history")],
+        open_history,
         is_active=True,
     )
 
@@ -76,8 +108,7 @@ def create_sidebar(client, user_info: Dict[str, Any], content_area: ft.Container
         "数据分析",
         ft.Icons.INSERT_CHART,
         "analysis",
-        lambda _: [show_analysis_overview(
-            client, history, content_area), update_active_nav("analysis")],
+        open_analysis,
     )
 
     nav_wordcloud = create_nav_item(
@@ -85,8 +116,7 @@ def create_sidebar(client, user_info: Dict[str, Any], content_area: ft.Container
         "标签词云",
         ft.Icons.CLOUD,
         "wordcloud",
-        lambda _: [show_wordcloud(
-            client, history, content_area), update_active_nav("wordcloud")],
+        open_wordcloud,
     )
 
     nav_settings = create_nav_item(
@@ -94,8 +124,7 @@ def create_sidebar(client, user_info: Dict[str, Any], content_area: ft.Container
         "设置",
         ft.Icons.SETTINGS,
         "settings",
-        lambda _: [show_settings(client, content_area),
-                   update_active_nav("settings")],
+        open_settings,
     )
 
     nav_items = [nav_history, nav_analysis, nav_wordcloud, nav_settings]
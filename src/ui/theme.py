@@ -0,0 +1,51 @@
+"""Light and dark Flet themes built from the client palette.
+
+Views color their controls with color-scheme tokens (``ft.Colors.SURFACE``,
+``ft.Colors.ON_SURFACE`` ...) from ``client.get_current_theme_colors()``
+rather than hex values. Both schemes are installed on the page once, so a
+theme switch only changes ``page.theme_mode``: Flutter re-resolves the
+tokens in a single update without rebuilding any view.
+"""
+from __future__ import annotations
+
+from typing import Optional
+
+import flet as ft
+
+from client.bilibili_client import BilibiliClient
+
+__all__ = ["apply_theme", "build_theme", "set_dark_theme"]
+
+
+def build_theme(dark: bool, font_family: Optional[str] = None) -> ft.Theme:
+    """The page theme for one mode; ``surface_variant`` backs the card token ``SURFACE_CONTAINER_HIGHEST``."""
+    if dark:
+        bg, card, text = BilibiliClient.THEME_DARK, BilibiliClient.THEME_CARD_DARK, BilibiliClient.THEME_TEXT_DARK
+    else:
+        bg, card, text = BilibiliClient.THEME_LIGHT, BilibiliClient.THEME_CARD_LIGHT, BilibiliClient.THEME_TEXT_LIGHT
+    return ft.Theme(
+        font_family=font_family,
+        visual_density=ft.VisualDensity.COMFORTABLE,
+        color_scheme=ft.ColorScheme(
+            primary=BilibiliClient.THEME_PRIMARY,
+            surface=bg,
+            on_surface=text,
+            surface_variant=card,
+            surface_container_high=card,
+        ),
+    )
+
+
+def apply_theme(page: ft.Page, dark: bool, font_family: Optional[str] = None) -> None:
+    """Install both themes on ``page`` and select one; the caller updates the page."""
+    page.theme = build_theme(False, font_family)
+    page.dark_theme = build_theme(True, font_family)
+    page.theme_mode = ft.ThemeMode.DARK if dark else ft.ThemeMode.LIGHT
+    page.bgcolor = ft.Colors.SURFACE
+
+
+def set_dark_theme(page: ft.Page, client, dark: bool) -> None:
+    """Switch between the installed themes with one page update and persist the choice."""
+    client.set_dark_theme(dark)
+    page.theme_mode = ft.ThemeMode.DARK if dark else ft.ThemeMode.LIGHT
+    page.update()
@@ -0,0 +1,154 @@
+"""Keep the main views' control trees alive between sidebar clicks.
+
+Switching back to a view only puts its kept tree back into
+``content_area.content``: no data is recomputed and no control is created.
+A view whose history version is out of date is refreshed in place when it
+provides a refresh function, and rebuilt otherwise. Hidden views are
+evicted least recently used first once their total control count exceeds
+a budget, which bounds the memory they hold.
+"""
+from __future__ import annotations
+
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+import flet as ft
+
+logger = logging.getLogger("biliinsight.ui.view_cache")
+
+__all__ = ["ViewCache", "count_controls"]
+
+# 隐藏页面最多保留的控件总数，约相当于 600 张历史卡片
+VIEW_CACHE_MAX_CONTROLS = 12_000
+VIEW_CACHE_MAX_VIEWS = 4
+
+# build() 把页面渲染到 content_area 中，可返回按最新历史原地刷新该页面的函数
+ViewBuilder = Callable[[], Optional[Callable[[], Any]]]
+
+
+def count_controls(root: ft.Control) -> int:
+    """Number of controls in the tree under ``root``, ``root`` included."""
+    count = 0
+    stack = [root]
+    while stack:
+        control = stack.pop()
+        count += 1
+        stack.extend(child for child in control._get_children() if isinstance(child, ft.Control))
+    return count
+
+
+class _Entry:
+    __slots__ = ("control", "version", "weight", "refresh")
+
+    def __init__(self, control: ft.Control, version: int, refresh: Optional[Callable[[], Any]]):
+        self.control = control
+        self.version = version
+        self.weight = count_controls(control)
+        self.refresh = refresh
+
+
+class ViewCache:
+    """Built views of one content area, keyed by view name.
+
+    Args:
+        content_area: The container whose ``content`` shows the current view.
+        max_controls: Control budget of the views that are not on screen.
+        max_views: Maximum number of kept views, the current one included.
+    """
+
+    def __init__(self, content_area: ft.Container, max_controls: int = VIEW_CACHE_MAX_CONTROLS,
+                 max_views: int = VIEW_CACHE_MAX_VIEWS):
+        self.content_area = content_area
+        self.max_controls = max_controls
+        self.maxsize = max_views
+        self.current: Optional[str] = None
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def show(self, name: str, version: int, build: ViewBuilder, cache: bool = True) -> bool:
+        """Show view ``name`` for history ``version``; returns True if its kept tree was reused.
+
+        Args:
+            build: Renders the view into ``content_area``, e.g.
+                ``lambda: show_wordcloud(client, history, content_area)``.
+            cache: False for views that are rebuilt on every visit, e.g. the
+                settings page whose numbers change all the time.
+        """
+        self._leave()
+        entry = self._entries.get(name)
+        if cache and entry is not None and (entry.version == version or entry.refresh is not None):
+            self._entries.move_to_end(name)
+            self.hits += 1
+            self.current = name
+            if entry.version != version:
+                # 页面尚未挂回，刷新只修改控件，随后与页面一起发送
+                entry.refresh()
+                entry.version = version
+            self.content_area.content = entry.control
+            self.content_area.update()
+            return True
+
+        self.misses += 1
+        self._entries.pop(name, None)
+        refresh = build()
+        self.current = name
+        if cache and self.content_area.content is not None:
+            self._entries[name] = _Entry(self.content_area.content, version, refresh)
+            self._evict()
+        return False
+
+    def _leave(self) -> None:
+        """Keep what the current view shows now, e.g. after it re-rendered itself for another range.
+
+        The control count is taken again because views may have grown since
+        they were built, such as analysis sections filled in the background.
+        """
+        entry = self._entries.get(self.current) if self.current else None
+        control = self.content_area.content
+        if entry is not None and control is not None:
+            entry.control = control
+            entry.weight = count_controls(control)
+
+    def _evict(self) -> None:
+        hidden = sum(entry.weight for name, entry in self._entries.items() if name != self.current)
+        for name in list(self._entries):
+            if hidden <= self.max_controls and len(self._entries) <= self.maxsize:
+                break
+            if name == self.current:
+                continue
+            entry = self._entries.pop(name)
+            hidden -= entry.weight
+            self.evictions += 1
+            logger.debug("页面缓存移除 %s（%s 个控件）", name, entry.weight)
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Drop view ``name`` (every view when None); it is rebuilt on its next ``show``."""
+        if name is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(name, None)
+
+    def clear(self) -> None:
+        self.invalidate()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def stats(self) -> Dict[str, Any]:
+        """Same keys as ``LRUCache.stats()`` plus the control count of the kept views."""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else None,
+            "controls": sum(entry.weight for entry in self._entries.values()),
+        }
@@ -1,8 +1,6 @@
 import flet as ft
 from typing import Dict, List, Any
 
-from utils.wordcloud_gen import generate_wordcloud
-
 
 def show_wordcloud(client, history: List[Dict[str, Any]], content_area: ft.Container) -> None:
     """Generate and display a word cloud from watch history tags."""
@@ -36,12 +34,10 @@ def show_wordcloud(client, history: List[Dict[str, Any]], content_area: ft.Conta
         ], spacing=20, expand=True, key="wordcloud_view")
     else:
         try:
-            # 使用当前主题背景色生成词云
-            bg_color = theme["bg"]
-
-            # Generate word cloud and get base64 image
+            # Generate word cloud and get base64 image; 透明背景，同一版本的历史只生成一次，切换主题也不重画
             from utils.wordcloud_gen import generate_wordcloud
-            img_base64 = generate_wordcloud(tags, bg_color)
+            img_base64 = client.wordcloud_cache.get_or_create(
+                client.history_version, lambda: generate_wordcloud(tags, background_color=None))
 
             # Display word cloud
             wordcloud_image = ft.Image(
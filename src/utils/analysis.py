@@ -0,0 +1,203 @@
+"""Watch history statistics shared by the analysis view and the command line."""
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from utils.history_model import watch_seconds
+from utils.metrics import span, timed
+from utils.rollups import HistoryRollups
+from utils.time_buckets import DayBuckets
+from utils.topk import most_common
+
+logger = logging.getLogger("biliinsight.utils.analysis")
+
+__all__ = ["generate_analysis_data", "generate_rollup_analysis", "generate_personality_report"]
+
+
+# 年度范围内 UP 主可能有上万个，汇总时最多保留这么多计数器；超出时为近似统计，但常看的 UP 主一定会保留
+MAX_UP_COUNTERS = 2000
+
+# 四个观看时段，下标为 小时 // 6
+TIME_RANGES = ("0-6点", "6-12点", "12-18点", "18-24点")
+
+
+@timed("analysis.generate_data")
+def generate_analysis_data(history: List[Dict[str, Any]], days: int = 7,
+                           now: Optional[float] = None,
+                           utc_offset: Optional[int] = None) -> Dict[str, Any]:
+    """从历史记录中提取统计信息。
+
+    Args:
+        history: 观看历史记录
+        days: 每日统计覆盖的天数（含今天），如 7/30/365
+        now: 当前时间戳，默认 ``time.time()``
+        utc_offset: 本地时区相对 UTC 的秒数，默认按 ``now`` 查询一次
+    """
+    logger.debug("开始生成分析数据，历史记录数量: %s", len(history))
+
+    category_counter: Dict[str, int] = {}
+    up_counter: Dict[str, int] = {}
+    total_progress = 0
+
+    # 按本地日期和小时分桶只用整数运算，UTC 偏移只查询一次
+    buckets = DayBuckets(days, now=now, utc_offset=utc_offset)
+    day_counts = [0] * days
+    day_progress = [0] * days
+    range_counts = [0] * len(TIME_RANGES)
+
+    for item in history:
+        progress = watch_seconds(item)
+        total_progress += progress
+
+        category = (item.get("tag_name") or "").strip()
+        if category:
+            category_counter[category] = category_counter.get(category, 0) + 1
+
+        author = item.get("author_name") or item.get("author")
+        if author:
+            up_counter[author] = up_counter.get(author, 0) + 1
+
+        try:
+            view_at = int(item.get("view_at") or 0)
+        except (TypeError, ValueError):
+            view_at = 0
+        if view_at:
+            range_counts[buckets.hour(view_at) // 6] += 1
+            day = buckets.day(view_at)
+            if day >= 0:
+                day_counts[day] += 1
+                day_progress[day] += progress
+
+    return _build_result(
+        total_videos=len(history),
+        total_seconds=total_progress,
+        categories=category_counter,
+        ups=up_counter,
+        labels=buckets.labels(),
+        day_counts=day_counts,
+        day_seconds=day_progress,
+        range_counts=range_counts,
+        days=days,
+    )
+
+
+def generate_rollup_analysis(rollups: HistoryRollups, days: int = 7,
+                             now: Optional[float] = None) -> Dict[str, Any]:
+    """与 :func:`generate_analysis_data` 相同的统计，但直接汇总预聚合的每日表，不扫描原始记录。"""
+    buckets = DayBuckets(days, now=now, utc_offset=rollups.utc_offset)
+    with span("analysis.rollup_window") as window_span:
+        window = rollups.window(buckets.first_day, days, max_ups=MAX_UP_COUNTERS)
+        window_span.count = days
+    range_counts = [0] * len(TIME_RANGES)
+    for hour, count in enumerate(window["hours"]):
+        range_counts[hour // 6] += count
+
+    return _build_result(
+        total_videos=sum(window["day_counts"]),
+        total_seconds=sum(window["day_seconds"]),
+        categories=window["categories"],
+        ups=window["ups"],
+        labels=buckets.labels(),
+        day_counts=window["day_counts"],
+        day_seconds=window["day_seconds"],
+        range_counts=range_counts,
+        days=days,
+    )
+
+
+def _build_result(total_videos: int, total_seconds: int, categories: Dict[str, int],
+                  ups: Dict[str, int], labels: List[str], day_counts: List[int],
+                  day_seconds: List[int], range_counts: List[int], days: int) -> Dict[str, Any]:
+    result: Dict[str, Any] = {
+        "total_videos": total_videos,
+        "total_hours": round(total_seconds / 3600, 1),
+        "avg_daily": round(total_videos / days, 1) if total_videos else 0,
+        "window_days": days,
+        "top_category": "暂无数据",
+        "categories": categories,
+        "daily_stats": [
+            {
+                "date": date,
+                "count": count,
+                "progress": round(seconds / 60, 1),
+            }
+            for date, count, seconds in zip(labels, day_counts, day_seconds)
+        ],
+        "time_distribution": dict(zip(TIME_RANGES, range_counts)),
+        "top_up_name": "暂无数据",
+        "up_counter": ups,
+        "active_days": sum(1 for count in day_counts if count > 0),
+        "viewing_streak": _calculate_viewing_streak(day_counts),
+    }
+    if categories:
+        result["top_category"] = max(categories.items(), key=lambda x: x[1])[0]
+    if ups:
+        result["top_up_name"] = max(ups.items(), key=lambda x: x[1])[0]
+
+    # 完整结果含有上千个 UP 主的计数，只在需要 DEBUG 日志时才整理摘要
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("分析数据生成完成: %s 个视频，%s 天有观看，常看分类 %s",
+                     result["total_videos"], result["active_days"],
+                     ", ".join(name for name, _ in most_common(categories, 5)))
+    return result
+
+
+def generate_personality_report(data: Dict[str, Any]) -> str:
+    total_videos = data["total_videos"]
+    total_hours = data["total_hours"]
+    top_category = data["top_category"]
+    top_up = data["top_up_name"]
+    time_distribution = data["time_distribution"]
+    daily_stats = data["daily_stats"]
+    viewing_streak = data["viewing_streak"]
+    active_days = data["active_days"]
+    days = data.get("window_days", 7)
+    hours_per_day = total_hours / days
+
+    prime_time = max(time_distribution.items(), key=lambda x: x[1])[0]
+    daily_progress = [day["progress"] for day in daily_stats]
+    avg_progress = sum(daily_progress) / len(daily_progress) if daily_progress else 0
+    variance = sum((p - avg_progress) ** 2 for p in daily_progress) / len(daily_progress) if daily_progress else 0
+    viewing_regularity = "规律" if daily_progress and variance < (avg_progress * 0.6 if avg_progress else 1) else "不规律"
+
+    report_lines = ["📊 **B站观看习惯分析**\n"]
+
+    if hours_per_day > 2:
+        report_lines.append(f"过去 {days} 天你观看了 {total_hours} 小时的内容，是位重度B站用户！")
+    elif hours_per_day > 1:
+        report_lines.append(f"过去 {days} 天你观看了 {total_hours} 小时的内容，属于中度活跃用户。")
+    elif total_hours > 0:
+        report_lines.append(f"过去 {days} 天你观看了 {total_hours} 小时的内容，偏向轻度休闲。")
+    else:
+        report_lines.append("最近几天几乎没有观看记录，或许可以找时间补补番。")
+
+    if total_videos:
+        report_lines.append(f"\n你最常关注的分区是「{top_category}」，常看的UP主是「{top_up}」。")
+        report_lines.append(f"\n主要观看时间集中在 {prime_time} 时段，最近 {days} 天里有 {active_days} 天打开过B站。")
+    else:
+        report_lines.append("\n暂无足够数据生成更详细的偏好分析。")
+
+    report_lines.append(f"\n观看连击为 {viewing_streak} 天，你的观看节奏整体{viewing_regularity}。")
+
+    report_lines.append("\n**个性化建议：**")
+    if viewing_regularity == "不规律" and hours_per_day > 1:
+        report_lines.append("- 尝试规划固定的观影时间，避免过度刷视频")
+    if prime_time == "0-6点":
+        report_lines.append("- 深夜观看较多，注意保证充足睡眠")
+    if total_videos and top_category:
+        report_lines.append("- 可以多探索不同的分区，丰富观影类型")
+
+    return "\n".join(report_lines)
+
+
+def _calculate_viewing_streak(day_counts: List[int]) -> int:
+    streak = 0
+    max_streak = 0
+    for count in day_counts:
+        if count > 0:
+            streak += 1
+            max_streak = max(max_streak, streak)
+        else:
+            streak = 0
+    return max_streak
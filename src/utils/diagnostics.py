@@ -0,0 +1,58 @@
+"""Cheap runtime numbers for the diagnostics panel: memory estimates and formatting."""
+from __future__ import annotations
+
+import sys
+from typing import Any, Dict, List, Optional, Sequence
+
+__all__ = ["deep_sizeof", "estimate_records_bytes", "format_bytes", "format_rate"]
+
+# 估算内存时最多抽样的记录数
+MEMORY_SAMPLE_SIZE = 200
+
+
+def deep_sizeof(obj: Any, _seen: Optional[set] = None) -> int:
+    """``sys.getsizeof`` of ``obj`` plus everything reachable through dicts, lists, tuples and sets.
+
+    Objects shared between containers (e.g. interned strings) are counted once.
+    """
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += deep_sizeof(key, seen) + deep_sizeof(value, seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for value in obj:
+            size += deep_sizeof(value, seen)
+    return size
+
+
+def estimate_records_bytes(records: Sequence[Dict[str, Any]], sample: int = MEMORY_SAMPLE_SIZE) -> int:
+    """Approximate memory held by ``records``, measuring at most ``sample`` evenly spaced ones.
+
+    Keeps the panel fast for a year of history; the result is an estimate
+    of the same order as the real footprint, not an exact count.
+    """
+    count = len(records)
+    if not count:
+        return sys.getsizeof(records)
+    step = max(1, count // sample)
+    picked: List[Dict[str, Any]] = [records[i] for i in range(0, count, step)][:sample]
+    seen: set = set()
+    measured = sum(deep_sizeof(item, seen) for item in picked)
+    return sys.getsizeof(records) + measured * count // len(picked)
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def format_rate(rate: Optional[float]) -> str:
+    """Hit rate as a percentage, ``-`` before the first lookup."""
+    return "-" if rate is None else f"{rate * 100:.0f}%"
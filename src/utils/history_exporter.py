@@ -2,12 +2,26 @@
 from __future__ import annotations
 
 import csv
+import json
 import os
 import time
 from pathlib import Path
 from typing import Any, Dict, Iterable
 
-__all__ = ["export_history_to_csv"]
+from utils.history_model import watch_seconds
+
+__all__ = ["export_history_to_csv", "export_history_to_json"]
+
+FIELDNAMES = [
+    "title",
+    "author",
+    "category",
+    "view_time",
+    "watch_duration_seconds",
+    "total_duration_seconds",
+    "bvid",
+    "uri",
+]
 
 
 def export_history_to_csv(history: Iterable[Dict[str, Any]], output_dir: str | os.PathLike[str] = "exports") -> Path:
@@ -30,37 +44,54 @@ def export_history_to_csv(history: Iterable[Dict[str, Any]], output_dir: str | o
     timestamp = time.strftime("%Y%m%d_%H%M%S")
     file_path = export_dir / f"bili_history_{timestamp}.csv"
 
-    fieldnames = [
-        "title",
-        "author",
-        "category",
-        "view_time",
-        "watch_duration_seconds",
-        "total_duration_seconds",
-        "bvid",
-        "uri",
-    ]
-
     with file_path.open("w", newline="", encoding="utf-8-sig") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES)
         writer.writeheader()
         for item in records:
-            writer.writerow(
-                {
-                    "title": item.get("title", ""),
-                    "author": item.get("author_name") or item.get("author", ""),
-                    "category": item.get("tag_name", ""),
-                    "view_time": _format_timestamp(item.get("view_at")),
-                    "watch_duration_seconds": _get_watch_seconds(item),
-                    "total_duration_seconds": _get_total_duration(item),
-                    "bvid": item.get("bvid") or item.get("history", {}).get("bvid", ""),
-                    "uri": item.get("uri") or item.get("short_link", ""),
-                }
-            )
+            writer.writerow(_to_row(item))
+
+    return file_path
+
+
+def export_history_to_json(history: Iterable[Dict[str, Any]], output_dir: str | os.PathLike[str] = "exports") -> Path:
+    """Export watch history to a JSON file with the same columns as the CSV export.
+
+    Args:
+        history: Iterable of history records.
+        output_dir: Directory to store exported JSON files.
+
+    Returns:
+        Path to the exported JSON file.
+    """
+    records = list(history)
+    if not records:
+        raise ValueError("history is empty")
+
+    export_dir = Path(output_dir)
+    export_dir.mkdir(parents=True, exist_ok=True)
+
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
+    file_path = export_dir / f"bili_history_{timestamp}.json"
+
+    with file_path.open("w", encoding="utf-8") as jsonfile:
+        json.dump([_to_row(item) for item in records], jsonfile, ensure_ascii=False, indent=2)
 
     return file_path
 
 
+def _to_row(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "title": item.get("title", ""),
+        "author": item.get("author_name") or item.get("author", ""),
+        "category": item.get("tag_name", ""),
+        "view_time": _format_timestamp(item.get("view_at")),
+        "watch_duration_seconds": watch_seconds(item),
+        "total_duration_seconds": _get_total_duration(item),
+        "bvid": item.get("bvid") or item.get("history", {}).get("bvid", ""),
+        "uri": item.get("uri") or item.get("short_link", ""),
+    }
+
+
 def _format_timestamp(timestamp: Any) -> str:
     if not timestamp:
         return ""
@@ -70,16 +101,9 @@ def _format_timestamp(timestamp: Any) -> str:
         return ""
 
 
-def _get_watch_seconds(item: Dict[str, Any]) -> int:
-    progress = int(item.get("progress", 0) or 0)
-    if progress < 0:
-        progress = int(item.get("duration", 0) or 0)
-    return max(progress, 0)
-
-
 def _get_total_duration(item: Dict[str, Any]) -> int:
     try:
         duration = int(item.get("duration", 0) or 0)
     except (TypeError, ValueError):
         duration = 0
-    return max(duration, _get_watch_seconds(item))
+    return max(duration, watch_seconds(item))
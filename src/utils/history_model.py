@@ -0,0 +1,205 @@
+"""Precomputed sort keys and orderings of a watch history snapshot."""
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from utils.topk import TopK
+
+__all__ = [
+    "SORT_NEWEST",
+    "SORT_DURATION_DESC",
+    "SORT_DURATION_ASC",
+    "HistoryIndex",
+    "SelectionSummary",
+    "watch_seconds",
+]
+
+SORT_NEWEST = "newest"
+SORT_DURATION_DESC = "duration_desc"
+SORT_DURATION_ASC = "duration_asc"
+
+
+def watch_seconds(item: Dict[str, Any]) -> int:
+    """Watched seconds of a record; ``progress == -1`` means it was watched to the end."""
+    progress = int(item.get("progress", 0) or 0)
+    if progress < 0:
+        progress = int(item.get("duration", 0) or 0)
+    return max(progress, 0)
+
+
+def _view_at(item: Dict[str, Any]) -> int:
+    try:
+        return int(item.get("view_at", 0) or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class HistoryIndex:
+    """Immutable index over one version of the history list.
+
+    Sort keys are parsed once when the index is built. The permutation for
+    each sort mode is computed on first use and kept for the lifetime of the
+    index, so switching sort order is a lookup and filtering is a single
+    pass over an already sorted permutation.
+
+    Args:
+        records: The history records; the index keeps its own copy of the list.
+        version: ``client.history_version`` the snapshot belongs to.
+    """
+
+    def __init__(self, records: Iterable[Dict[str, Any]], version: Optional[int] = None):
+        self.records: List[Dict[str, Any]] = list(records)
+        self.version = version
+        self.view_at: List[int] = [_view_at(item) for item in self.records]
+        self.watch_seconds: List[int] = [watch_seconds(item) for item in self.records]
+        self._search_text: Optional[List[str]] = None
+        self._categories: Optional[List[str]] = None
+        self._authors: Optional[List[str]] = None
+        self._sorted_view_at: Optional[List[int]] = None
+        self._orders: Dict[str, List[int]] = {}
+        self._ordered: Dict[str, List[Dict[str, Any]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def search_text(self) -> List[str]:
+        """Lower-cased ``title`` and author of every record, joined by a newline."""
+        if self._search_text is None:
+            self._search_text = [
+                f"{(item.get('title') or '').lower()}\n"
+                f"{(item.get('author_name') or item.get('author') or '').lower()}"
+                for item in self.records
+            ]
+        return self._search_text
+
+    @property
+    def categories(self) -> List[str]:
+        """``tag_name`` of every record ("" if unknown)."""
+        if self._categories is None:
+            self._categories = [(item.get("tag_name") or "").strip() for item in self.records]
+        return self._categories
+
+    @property
+    def authors(self) -> List[str]:
+        """Author name of every record ("" if unknown)."""
+        if self._authors is None:
+            self._authors = [item.get("author_name") or item.get("author") or "" for item in self.records]
+        return self._authors
+
+    def count_since(self, since: int) -> int:
+        """Number of records with ``view_at >= since``, by binary search."""
+        if self._sorted_view_at is None:
+            self._sorted_view_at = sorted(self.view_at)
+        return len(self._sorted_view_at) - bisect_left(self._sorted_view_at, since)
+
+    def since(self, since: int) -> List[int]:
+        """Positions of the records viewed at or after ``since``, newest first."""
+        return self.order(SORT_NEWEST)[:self.count_since(since)]
+
+    def order(self, mode: str = SORT_NEWEST) -> List[int]:
+        """Record positions sorted by ``mode``; ties keep their original order."""
+        order = self._orders.get(mode)
+        if order is None:
+            positions = range(len(self.records))
+            if mode == SORT_NEWEST:
+                order = sorted(positions, key=self.view_at.__getitem__, reverse=True)
+            elif mode == SORT_DURATION_DESC:
+                order = sorted(positions, key=self.watch_seconds.__getitem__, reverse=True)
+            elif mode == SORT_DURATION_ASC:
+                order = sorted(positions, key=self.watch_seconds.__getitem__)
+            else:
+                raise ValueError(f"unknown sort mode: {mode}")
+            self._orders[mode] = order
+        return order
+
+    def ordered(self, mode: str = SORT_NEWEST) -> List[Dict[str, Any]]:
+        """The records themselves in ``mode`` order (cached like :meth:`order`)."""
+        ordered = self._ordered.get(mode)
+        if ordered is None:
+            records = self.records
+            ordered = [records[i] for i in self.order(mode)]
+            self._ordered[mode] = ordered
+        return ordered
+
+    def select(self, mode: str = SORT_NEWEST, query: str = "", since: Optional[int] = None,
+               positions: Optional[Sequence[int]] = None,
+               predicate: Optional[Callable[[int], bool]] = None) -> List[int]:
+        """Positions in ``mode`` order that match every given filter.
+
+        Args:
+            query: Case-insensitive substring of the title or author.
+            since: Only records with ``view_at >= since``. The cutoff is found
+                by binary search; in newest-first order the matches are a prefix.
+            positions: Candidate positions, e.g. the result of another filter.
+            predicate: Extra test on a record position.
+        """
+        order = self.order(mode)
+        allowed = set(positions) if positions is not None and len(positions) < len(order) else None
+        if since is not None:
+            count = self.count_since(since)
+            if mode == SORT_NEWEST:
+                order = order[:count]
+            elif count < len(order):
+                recent = set(self.order(SORT_NEWEST)[:count])
+                allowed = recent if allowed is None else allowed & recent
+        query = query.strip().lower()
+        search_text = self.search_text if query else None
+
+        if allowed is None and search_text is None and predicate is None:
+            return list(order)
+
+        selected = []
+        for i in order:
+            if allowed is not None and i not in allowed:
+                continue
+            if search_text is not None and query not in search_text[i]:
+                continue
+            if predicate is not None and not predicate(i):
+                continue
+            selected.append(i)
+        return selected
+
+
+class SelectionSummary:
+    """Count, watched seconds and top category/author of a changing selection.
+
+    :meth:`update` only applies the positions that entered or left the
+    selection since the previous call, so narrowing or widening a filter
+    does not recount the whole selection. A new index, or a change larger
+    than the new selection itself, starts over from the new selection.
+    """
+
+    def __init__(self):
+        self.index: Optional[HistoryIndex] = None
+        self.selected: set = set()
+        self.seconds = 0
+        self.categories = TopK()
+        self.authors = TopK()
+
+    def __len__(self) -> int:
+        return len(self.selected)
+
+    def update(self, index: HistoryIndex, positions: Iterable[int]) -> None:
+        positions = set(positions)
+        added = removed = None
+        if index is self.index:
+            added = positions - self.selected
+            removed = self.selected - positions
+        if added is None or len(added) + len(removed) > len(positions):
+            self.index = index
+            self.seconds = 0
+            self.categories.clear()
+            self.authors.clear()
+            added, removed = positions, set()
+
+        seconds, categories, authors = index.watch_seconds, index.categories, index.authors
+        for sign, changed in ((-1, removed), (1, added)):
+            for i in changed:
+                self.seconds += sign * seconds[i]
+                if categories[i]:
+                    self.categories.add(categories[i], sign)
+                if authors[i]:
+                    self.authors.add(authors[i], sign)
+        self.selected = positions
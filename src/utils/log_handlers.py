@@ -0,0 +1,82 @@
+"""Log handlers installed by ``setup_logging``.
+
+Kept apart from ``utils.logging_config`` because ``logging.handlers`` also
+imports socket and pickle; this module is only imported when logging is set up.
+"""
+import glob
+import logging.handlers
+import os
+from datetime import datetime
+
+from utils.logging_config import LOG_BACKUP_COUNT, LOG_KEEP_DAYS, LOG_MAX_BYTES
+
+__all__ = ["DailyRotatingFileHandler", "DeferredQueueHandler"]
+
+# 参数都是这些不可变类型时，消息可以推迟到后台线程再格式化
+_IMMUTABLE_ARGS = (str, int, float, bool, bytes, type(None))
+
+
+class DailyRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Write to ``biliinsight_<date>.log``, switching files at midnight and
+    rolling over to ``.1``, ``.2``... when a file exceeds ``max_bytes``."""
+
+    def __init__(self, log_dir, max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT,
+                 keep_days=LOG_KEEP_DAYS):
+        self.log_dir = log_dir
+        self.keep_days = keep_days
+        self.current_date = self._today()
+        super().__init__(self._path_for(self.current_date), maxBytes=max_bytes,
+                         backupCount=backup_count, encoding="utf-8", delay=True)
+        self._remove_expired()
+
+    def _today(self):
+        return datetime.now().strftime("%Y-%m-%d")
+
+    def _path_for(self, date):
+        return os.path.join(self.log_dir, f"biliinsight_{date}.log")
+
+    def shouldRollover(self, record):
+        if self._today() != self.current_date:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        today = self._today()
+        if today == self.current_date:
+            super().doRollover()
+            return
+        # 跨天：换到新日期的文件，旧文件原样保留
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        self.current_date = today
+        self.baseFilename = os.path.abspath(self._path_for(today))
+        self._remove_expired()
+
+    def _remove_expired(self):
+        if not self.keep_days:
+            return
+        pattern = os.path.join(self.log_dir, "biliinsight_*.log*")
+        dated = sorted({os.path.basename(path)[12:22] for path in glob.glob(pattern)} | {self.current_date})
+        for date in dated[:-self.keep_days]:
+            for path in glob.glob(self._path_for(date) + "*"):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue records without formatting them in the logging thread when it is safe.
+
+    ``QueueHandler`` formats every message before queueing it. Here records
+    whose arguments are immutable are queued as they are and formatted by
+    the listener thread. Mutable arguments such as dicts are still formatted
+    right away, so the log shows their value at the time of the call.
+    """
+
+    def prepare(self, record):
+        args = record.args
+        if not args or (isinstance(args, tuple) and all(isinstance(arg, _IMMUTABLE_ARGS) for arg in args)):
+            return record
+        return super().prepare(record)
@@ -1,50 +1,94 @@
+import atexit
 import logging
 import os
 import sys
-from datetime import datetime
 
+# 单个日志文件的大小上限和同一天保留的分卷数
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+# 按日期命名的日志文件保留天数
+LOG_KEEP_DAYS = 14
 
-def setup_logging():
-    """配置日志系统，将日志存储在项目根目录的Log文件夹中"""
-    # 获取项目根目录
+_LOG_FORMAT = "%(asctime)s - %(levelname)s - %(name)s - %(filename)s:%(lineno)d - %(message)s"
+
+_listener = None
+
+
+def default_log_dir():
+    """项目根目录下的 Log 文件夹"""
     # 假设当前文件位于 src/utils/logging_config.py，需要回退两级找到根目录
     current_dir = os.path.dirname(os.path.abspath(__file__))  # 当前文件所在目录
     project_root = os.path.dirname(os.path.dirname(current_dir))  # 项目根目录
+    return os.path.join(project_root, "Log")
+
+
+def setup_logging(log_dir=None, level=None, max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT):
+    """配置日志系统，将日志存储在项目根目录的Log文件夹中
+
+    记录只进入内存队列，由后台线程写入文件和控制台，界面线程不会因为
+    格式化或磁盘写入而卡顿。文件按日期命名，超过 ``max_bytes`` 时分卷。
+    文件日志级别默认为 DEBUG，可以通过环境变量 BILIINSIGHT_LOG_LEVEL 调整。
+    """
+    global _listener
+
+    # logging.handlers 会连带导入 socket 和 pickle，放到这里以免拖慢登录页的导入
+    import queue
+    from logging.handlers import QueueListener
 
-    # 创建Log文件夹
-    log_dir = os.path.join(project_root, "Log")
+    from utils.log_handlers import DailyRotatingFileHandler, DeferredQueueHandler
+
+    if log_dir is None:
+        log_dir = default_log_dir()
     os.makedirs(log_dir, exist_ok=True)
 
-    # 创建日志文件名（按日期）
-    current_date = datetime.now().strftime("%Y-%m-%d")
-    log_file = os.path.join(log_dir, f"biliinsight_{current_date}.log")
+    if level is None:
+        level = os.environ.get("BILIINSIGHT_LOG_LEVEL", "DEBUG").upper()
+    if isinstance(level, str):
+        level = logging.getLevelName(level)
+        if not isinstance(level, int):
+            level = logging.DEBUG
 
     # 获取根日志记录器
     logger = logging.getLogger("biliinsight")
-    logger.setLevel(logging.DEBUG)
+    # 记录器的级别决定 isEnabledFor，控制台只显示INFO级别以上的消息
+    logger.setLevel(min(level, logging.INFO))
 
-    # 清除已有的处理器
+    # 重复初始化时先停掉旧的后台线程，清除已有的处理器
+    shutdown_logging()
     if logger.handlers:
         logger.handlers.clear()
 
-    # 配置文件处理器
-    file_handler = logging.FileHandler(log_file, encoding="utf-8")
-    file_handler.setLevel(logging.DEBUG)
+    file_handler = DailyRotatingFileHandler(log_dir, max_bytes=max_bytes, backup_count=backup_count)
+    file_handler.setLevel(level)
 
-    # 配置控制台处理器
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)  # 控制台只显示INFO级别以上的消息
+    console_handler.setLevel(logging.INFO)
 
-    # 设置日志格式
-    formatter = logging.Formatter(
-        "%(asctime)s - %(levelname)s - %(name)s - %(filename)s:%(lineno)d - %(message)s"
-    )
+    formatter = logging.Formatter(_LOG_FORMAT)
     file_handler.setFormatter(formatter)
     console_handler.setFormatter(formatter)
 
-    # 添加处理器到日志记录器
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # 调用方只把记录放进队列，由 QueueListener 线程交给真正的处理器
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(DeferredQueueHandler(log_queue))
+    _listener = QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
+    )
+    _listener.start()
 
-    logger.info(f"日志系统初始化完成，日志文件：{log_file}")
+    logger.info("日志系统初始化完成，日志文件：%s", file_handler.baseFilename)
     return logger
+
+
+def shutdown_logging():
+    """等待队列中的日志写完，停止后台线程并关闭文件（退出时自动调用）"""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is None:
+        return
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,165 @@
+"""Lightweight timing spans and counters kept in an in-process registry."""
+from __future__ import annotations
+
+import functools
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+__all__ = ["REGISTRY", "MetricsRegistry", "Span", "span", "timed"]
+
+# 每个指标保留最近多少次耗时，用于计算分位数
+RECENT_SAMPLES = 512
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class Span:
+    """One timed section; set ``count`` and ``bytes`` inside the ``with`` block."""
+
+    __slots__ = ("name", "count", "bytes", "error")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.bytes = 0
+        self.error = False
+
+
+class _Metric:
+    __slots__ = ("calls", "errors", "seconds", "max", "count", "bytes", "recent")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.max = 0.0
+        self.count = 0
+        self.bytes = 0
+        self.recent: Deque[float] = deque(maxlen=RECENT_SAMPLES)
+
+
+class MetricsRegistry:
+    """Thread-safe per-name totals of call counts, durations, items and bytes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+
+    def observe(self, name: str, seconds: float, count: int = 0, nbytes: int = 0,
+                error: bool = False) -> None:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = _Metric()
+            metric.calls += 1
+            metric.errors += int(error)
+            metric.seconds += seconds
+            metric.max = max(metric.max, seconds)
+            metric.count += count
+            metric.bytes += nbytes
+            metric.recent.append(seconds)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[Span]:
+        """Time the ``with`` block; exceptions are counted as errors and re-raised."""
+        current = Span(name)
+        start = time.perf_counter()
+        try:
+            yield current
+        except BaseException:
+            current.error = True
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start, current.count, current.bytes, current.error)
+
+    def timed(self, name: Optional[str] = None) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """Decorator form of :meth:`span`; the name defaults to ``module.function``."""
+
+        def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+            metric_name = name or f"{func.__module__}.{func.__qualname__}"
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(metric_name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def reset(self) -> None:
+        with self._lock:
+            self._metrics.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """``{name: {calls, errors, seconds, mean, max, p50, p90, p99, count, bytes}}`` (seconds)."""
+        with self._lock:
+            items = [(name, metric, sorted(metric.recent)) for name, metric in self._metrics.items()]
+        result: Dict[str, Dict[str, Any]] = {}
+        for name, metric, recent in sorted(items, key=lambda item: item[0]):
+            entry: Dict[str, Any] = {
+                "calls": metric.calls,
+                "errors": metric.errors,
+                "seconds": metric.seconds,
+                "mean": metric.seconds / metric.calls if metric.calls else 0.0,
+                "max": metric.max,
+                "count": metric.count,
+                "bytes": metric.bytes,
+            }
+            for q in QUANTILES:
+                entry[f"p{int(q * 100)}"] = _quantile(recent, q)
+            result[name] = entry
+        return result
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=indent)
+
+    def to_prometheus(self, prefix: str = "biliinsight") -> str:
+        """Prometheus text exposition: one summary plus item/byte/error counters per span."""
+        snapshot = self.snapshot()
+        lines: List[str] = [
+            f"# HELP {prefix}_span_seconds Duration of instrumented sections.",
+            f"# TYPE {prefix}_span_seconds summary",
+        ]
+        for name, entry in snapshot.items():
+            label = _label(name)
+            for q in QUANTILES:
+                lines.append(f'{prefix}_span_seconds{{span="{label}",quantile="{q}"}} '
+                             f'{entry[f"p{int(q * 100)}"]:.6f}')
+            lines.append(f'{prefix}_span_seconds_sum{{span="{label}"}} {entry["seconds"]:.6f}')
+            lines.append(f'{prefix}_span_seconds_count{{span="{label}"}} {entry["calls"]}')
+        for field, key, help_text in (
+            ("items", "count", "Items processed by instrumented sections."),
+            ("bytes", "bytes", "Bytes processed by instrumented sections."),
+            ("errors", "errors", "Instrumented sections that raised."),
+        ):
+            lines.append(f"# HELP {prefix}_span_{field}_total {help_text}")
+            lines.append(f"# TYPE {prefix}_span_{field}_total counter")
+            for name, entry in snapshot.items():
+                lines.append(f'{prefix}_span_{field}_total{{span="{_label(name)}"}} {entry[key]}')
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str) -> None:
+        """Write the registry to ``path``: Prometheus text for ``.prom``/``.txt``, JSON otherwise."""
+        text = self.to_prometheus() if path.endswith((".prom", ".txt")) else self.to_json()
+        with open(path, "w", encoding="utf-8") as fp:
+            fp.write(text)
+
+
+def _quantile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+# 进程内共享的默认注册表
+REGISTRY = MetricsRegistry()
+span = REGISTRY.span
+timed = REGISTRY.timed
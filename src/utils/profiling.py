@@ -0,0 +1,178 @@
+"""Opt-in per-action profiles (cProfile ``.prof`` or sampled collapsed stacks)."""
+from __future__ import annotations
+
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from utils.logging_config import default_log_dir
+
+logger = logging.getLogger("biliinsight.utils.profiling")
+
+__all__ = [
+    "PROFILE_ENV", "PROFILE_MODES", "profile_action", "profile_dir", "profile_mode",
+    "profiled", "set_profile_mode",
+]
+
+# 环境变量优先于设置页中保存的选项：cprofile / sample，留空关闭
+PROFILE_ENV = "BILIINSIGHT_PROFILE"
+PROFILE_OFF, PROFILE_CPROFILE, PROFILE_SAMPLE = "", "cprofile", "sample"
+PROFILE_MODES = (PROFILE_OFF, PROFILE_CPROFILE, PROFILE_SAMPLE)
+# 采样间隔（秒）
+SAMPLE_INTERVAL = 0.002
+# Log/profiles 中最多保留的文件数，超出时删除最旧的
+PROFILE_KEEP = 100
+
+# 环境变量中表示开启（使用 cProfile）和关闭的写法
+_ENV_ON = ("1", "true", "yes", "on")
+_ENV_OFF = ("0", "false", "no", "off")
+
+
+def _mode_from_env(value: str) -> str:
+    value = value.strip().lower()
+    if value in PROFILE_MODES:
+        return value
+    if value in _ENV_ON:
+        return PROFILE_CPROFILE
+    if value not in _ENV_OFF:
+        logger.warning("未知的 %s 取值 %r，性能分析保持关闭（可选 cprofile、sample）", PROFILE_ENV, value)
+    return PROFILE_OFF
+
+
+_mode = _mode_from_env(os.environ.get(PROFILE_ENV, ""))
+# 同一时间只做一次分析：Python 3.12 起第二个 cProfile.Profile().enable() 会抛出 ValueError
+_lock = threading.Lock()
+
+
+def profile_mode() -> str:
+    return _mode
+
+
+def set_profile_mode(mode: str) -> None:
+    """Switch profiling for the following actions: ``"cprofile"``, ``"sample"`` or ``""`` (off)."""
+    global _mode
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"unknown profile mode: {mode!r}")
+    _mode = mode
+
+
+def profile_dir() -> str:
+    return os.path.join(default_log_dir(), "profiles")
+
+
+@contextmanager
+def profiled(name: str) -> Iterator[Optional[str]]:
+    """Profile the ``with`` block if profiling is on and write one file for it.
+
+    cProfile mode writes ``<time>_<name>.prof`` (for snakeviz, ``pstats``...).
+    Sample mode records the stack of the current thread every
+    :data:`SAMPLE_INTERVAL` and writes ``<time>_<name>.folded`` collapsed
+    stacks (for flamegraph.pl, speedscope...); it also sees time spent
+    inside Flet, e.g. serializing controls in ``update()``.
+
+    Yields the path of the file that will be written, or None when off.
+    Only one block is profiled at a time: blocks that start while another
+    one runs, nested or on another thread, run unprofiled.
+    """
+    mode = _mode
+    if not mode or not _lock.acquire(blocking=False):
+        yield None
+        return
+
+    start = time.perf_counter()
+    try:
+        os.makedirs(profile_dir(), exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S") + f"-{int(time.time() * 1000) % 1000:03d}"
+        suffix = ".prof" if mode == PROFILE_CPROFILE else ".folded"
+        path = os.path.join(profile_dir(), f"{stamp}_{name}{suffix}")
+        if mode == PROFILE_CPROFILE:
+            import cProfile
+
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield path
+            finally:
+                profiler.disable()
+                profiler.dump_stats(path)
+        else:
+            sampler = _StackSampler(threading.get_ident())
+            sampler.start()
+            try:
+                yield path
+            finally:
+                sampler.stop()
+                sampler.dump(path)
+    finally:
+        _lock.release()
+    logger.info("性能分析 %s 用时 %.1f ms，已写入 %s", name, (time.perf_counter() - start) * 1000, path)
+    _prune(profile_dir())
+
+
+def profile_action(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator form of :func:`profiled`; costs one check when profiling is off."""
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _mode:
+                return func(*args, **kwargs)
+            with profiled(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class _StackSampler:
+    """Count the stacks of one thread from a background thread."""
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Dict[str, int] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                # 折叠栈格式：从最外层到最内层，用分号连接
+                stack = ";".join(reversed(names))
+                self.stacks[stack] = self.stacks.get(stack, 0) + 1
+
+    def dump(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as fp:
+            for stack, count in sorted(self.stacks.items()):
+                fp.write(f"{stack} {count}\n")
+
+
+def _prune(directory: str) -> None:
+    try:
+        names = sorted(os.listdir(directory))
+    except OSError:
+        return
+    for name in names[:-PROFILE_KEEP]:
+        try:
+            os.remove(os.path.join(directory, name))
+        except OSError:
+            pass
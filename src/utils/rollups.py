@@ -0,0 +1,192 @@
+"""Pre-aggregated per-day tables of the watch history for long-range analysis."""
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from utils.history_model import watch_seconds
+from utils.time_buckets import SECONDS_PER_DAY, local_utc_offset
+from utils.topk import SpaceSaving
+
+__all__ = ["ROLLUP_FORMAT", "HistoryRollups", "update_rollup_store"]
+
+# 持久化格式版本，不兼容时丢弃旧数据重新累计
+ROLLUP_FORMAT = 1
+
+
+class HistoryRollups:
+    """Per-day rollup tables, updated incrementally as records are synced.
+
+    Every view (record key + ``view_at``) is counted once, so applying
+    overlapping syncs is idempotent, and views that later drop out of the
+    retained history window stay counted. Days are local epoch days
+    (``(view_at + utc_offset) // 86400``).
+
+    Tables:
+        day_totals: day -> ``[views, watched seconds]``
+        day_category: day -> ``{category: views}``
+        day_up: day -> ``{author: views}``
+        day_hour: day -> views per local hour (24 ints)
+
+    Args:
+        utc_offset: Seconds east of UTC used for bucketing; defaults to the
+            current local offset and is persisted with the tables.
+    """
+
+    def __init__(self, utc_offset: Optional[int] = None):
+        self.utc_offset = local_utc_offset() if utc_offset is None else utc_offset
+        self.day_totals: Dict[int, List[int]] = {}
+        self.day_category: Dict[int, Dict[str, int]] = {}
+        self.day_up: Dict[int, Dict[str, int]] = {}
+        self.day_hour: Dict[int, List[int]] = {}
+        # 已计入的观看事件 -> [view_at, 观看秒数]，用于去重和修正进度
+        self._events: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def apply(self, records: Iterable[Dict[str, Any]], key: Callable[[Dict[str, Any]], str],
+              retain_since: Optional[int] = None) -> int:
+        """Add the views in ``records`` that are not counted yet.
+
+        A known view whose watched time grew only corrects the seconds.
+        Bookkeeping for views older than ``retain_since`` is dropped while
+        their counts stay, so ``retain_since`` must lie before anything a
+        later sync can return (``client.history_refresher.rollup_retain_since``);
+        a view synced again after its key was dropped is counted twice.
+
+        Returns:
+            Number of added or corrected views.
+        """
+        changed = 0
+        offset = self.utc_offset
+        for item in records:
+            try:
+                view_at = int(item.get("view_at") or 0)
+            except (TypeError, ValueError):
+                continue
+            if not view_at:
+                continue
+            seconds = watch_seconds(item)
+            event = f"{key(item)}@{view_at}"
+            day = (view_at + offset) // SECONDS_PER_DAY
+            previous = self._events.get(event)
+            if previous is not None:
+                if previous[1] != seconds:
+                    self.day_totals[day][1] += seconds - previous[1]
+                    previous[1] = seconds
+                    changed += 1
+                continue
+
+            self._events[event] = [view_at, seconds]
+            totals = self.day_totals.setdefault(day, [0, 0])
+            totals[0] += 1
+            totals[1] += seconds
+            category = (item.get("tag_name") or "").strip()
+            if category:
+                categories = self.day_category.setdefault(day, {})
+                categories[category] = categories.get(category, 0) + 1
+            author = item.get("author_name") or item.get("author")
+            if author:
+                ups = self.day_up.setdefault(day, {})
+                ups[author] = ups.get(author, 0) + 1
+            hours = self.day_hour.get(day)
+            if hours is None:
+                hours = self.day_hour[day] = [0] * 24
+            hours[(view_at + offset) % SECONDS_PER_DAY // 3600] += 1
+            changed += 1
+
+        if retain_since is not None:
+            for event in [e for e, (view_at, _) in self._events.items() if view_at < retain_since]:
+                del self._events[event]
+        return changed
+
+    def window(self, first_day: int, days: int, max_ups: Optional[int] = None) -> Dict[str, Any]:
+        """Sum the tables over ``days`` local days starting at ``first_day``.
+
+        Args:
+            max_ups: Keep at most this many authors, counted with a
+                :class:`~utils.topk.SpaceSaving` sketch. Exact as long as the
+                window has no more distinct authors than that; otherwise
+                the most watched authors are kept with approximate counts.
+
+        Returns:
+            ``day_counts`` and ``day_seconds`` (one entry per day), the
+            ``categories`` and ``ups`` counters, and ``hours`` (24 ints).
+        """
+        day_counts = [0] * days
+        day_seconds = [0] * days
+        categories: Dict[str, int] = {}
+        ups: Dict[str, int] = {}
+        sketch = SpaceSaving(max_ups) if max_ups else None
+        hours = [0] * 24
+        for i in range(days):
+            day = first_day + i
+            totals = self.day_totals.get(day)
+            if totals is None:
+                continue
+            day_counts[i], day_seconds[i] = totals
+            for name, count in self.day_category.get(day, {}).items():
+                categories[name] = categories.get(name, 0) + count
+            if sketch is not None:
+                sketch.update(self.day_up.get(day, {}))
+            else:
+                for name, count in self.day_up.get(day, {}).items():
+                    ups[name] = ups.get(name, 0) + count
+            for hour, count in enumerate(self.day_hour.get(day) or ()):
+                hours[hour] += count
+        if sketch is not None:
+            ups = sketch.counts
+        return {
+            "day_counts": day_counts,
+            "day_seconds": day_seconds,
+            "categories": categories,
+            "ups": ups,
+            "hours": hours,
+        }
+
+    def hour_of_week(self, first_day: int, days: int) -> List[int]:
+        """Views per hour of the week (Monday 0:00 first, 168 ints) over the given days."""
+        table = [0] * (7 * 24)
+        for day in range(first_day, first_day + days):
+            hours = self.day_hour.get(day)
+            if hours:
+                # 1970-01-01 是星期四
+                base = (day + 3) % 7 * 24
+                for hour, count in enumerate(hours):
+                    table[base + hour] += count
+        return table
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "format": ROLLUP_FORMAT,
+            "utc_offset": self.utc_offset,
+            "day_totals": {str(day): value for day, value in self.day_totals.items()},
+            "day_category": {str(day): value for day, value in self.day_category.items()},
+            "day_up": {str(day): value for day, value in self.day_up.items()},
+            "day_hour": {str(day): value for day, value in self.day_hour.items()},
+            "events": self._events,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "HistoryRollups":
+        """Restore tables saved by :meth:`to_dict`; unknown or broken data gives empty tables."""
+        if not isinstance(data, dict) or data.get("format") != ROLLUP_FORMAT:
+            return cls()
+        try:
+            rollups = cls(int(data["utc_offset"]))
+            for name in ("day_totals", "day_category", "day_up", "day_hour"):
+                setattr(rollups, name, {int(day): value for day, value in data[name].items()})
+            rollups._events = dict(data["events"])
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return cls()
+        return rollups
+
+
+def update_rollup_store(store: Any, records: Iterable[Dict[str, Any]],
+                        key: Callable[[Dict[str, Any]], str],
+                        retain_since: Optional[int] = None) -> HistoryRollups:
+    """Load the tables from ``store`` (``load()``/``save(data)``), apply ``records`` and save them back."""
+    rollups = HistoryRollups.from_dict(store.load())
+    rollups.apply(records, key, retain_since=retain_since)
+    store.save(rollups.to_dict())
+    return rollups
@@ -0,0 +1,71 @@
+"""Startup helpers: background module warm-up and the import-time budget."""
+
+from __future__ import annotations
+
+import importlib
+import logging
+import threading
+from typing import Iterable, Tuple
+
+logger = logging.getLogger("biliinsight.utils.startup")
+
+# 首帧（登录页）之后才需要的模块，在后台线程中预先导入，
+# 登录成功时主界面即可直接使用，不必再临时付出导入开销。
+WARMUP_MODULES: Tuple[str, ...] = (
+    "requests",
+    "qrcode",
+    "ui.main_layout",
+    "ui.sidebar",
+    "ui.history_view",
+)
+
+# 登录页首帧之前禁止加载的模块：分析/词云/导出视图与重量级三方库只在首次使用时导入。
+DEFERRED_MODULES: Tuple[str, ...] = (
+    "ui.main_layout",
+    "ui.sidebar",
+    "ui.history_view",
+    "ui.analysis_view",
+    "ui.wordcloud_view",
+    "ui.settings_view",
+    "utils.history_exporter",
+    "utils.wordcloud_gen",
+    # 只在请求、计时或开启性能分析时才需要
+    "client.transport",
+    "utils.metrics",
+    "utils.profiling",
+    "requests",
+    "qrcode",
+    "PIL",
+    "wordcloud",
+    "numpy",
+)
+
+# 登录页依赖（不含 flet 本身）允许占用的导入时间，单位毫秒。
+IMPORT_BUDGET_MS = 50
+
+_warmup_lock = threading.Lock()
+_warmup_thread: threading.Thread | None = None
+
+
+def start_warmup(modules: Iterable[str] = WARMUP_MODULES) -> threading.Thread:
+    """Import ``modules`` on a daemon thread; repeated calls reuse the first thread."""
+    global _warmup_thread
+
+    with _warmup_lock:
+        if _warmup_thread is not None:
+            return _warmup_thread
+
+        module_names = tuple(modules)
+
+        def worker() -> None:
+            for name in module_names:
+                try:
+                    importlib.import_module(name)
+                except Exception as exc:  # pragma: no cover - best effort
+                    logger.debug("预加载模块 %s 失败: %s", name, exc)
+            logger.debug("后台预加载完成: %s", ", ".join(module_names))
+
+        _warmup_thread = threading.Thread(
+            target=worker, name="biliinsight-warmup", daemon=True)
+        _warmup_thread.start()
+        return _warmup_thread
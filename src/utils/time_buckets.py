@@ -0,0 +1,57 @@
+"""Local-day and hour buckets of epoch timestamps using integer arithmetic only."""
+from __future__ import annotations
+
+import time
+from typing import List, Optional
+
+__all__ = ["SECONDS_PER_DAY", "DayBuckets", "local_utc_offset"]
+
+SECONDS_PER_DAY = 24 * 3600
+
+
+def local_utc_offset(at: Optional[float] = None) -> int:
+    """Seconds east of UTC of the local timezone at ``at`` (default: now)."""
+    return time.localtime(at).tm_gmtoff
+
+
+class DayBuckets:
+    """Map ``view_at`` timestamps to the local days of a window ending today.
+
+    The UTC offset is looked up once, so bucketing a record is a few integer
+    operations instead of building a ``datetime``. A DST change inside the
+    window shifts records near midnight by the offset difference, which is
+    acceptable for daily statistics.
+
+    Args:
+        days: Number of days in the window, today included.
+        now: Current epoch seconds; defaults to ``time.time()``.
+        utc_offset: Seconds east of UTC; defaults to the local offset at ``now``.
+    """
+
+    def __init__(self, days: int = 7, now: Optional[float] = None,
+                 utc_offset: Optional[int] = None):
+        if days <= 0:
+            raise ValueError("days must be positive")
+        now = int(time.time() if now is None else now)
+        self.days = days
+        self.utc_offset = local_utc_offset(now) if utc_offset is None else utc_offset
+        self.first_day = (now + self.utc_offset) // SECONDS_PER_DAY - days + 1
+
+    @property
+    def start(self) -> int:
+        """Epoch seconds of local midnight on the first day of the window."""
+        return self.first_day * SECONDS_PER_DAY - self.utc_offset
+
+    def day(self, view_at: int) -> int:
+        """Index of the local day of ``view_at`` in the window, or -1 outside it."""
+        index = (view_at + self.utc_offset) // SECONDS_PER_DAY - self.first_day
+        return index if 0 <= index < self.days else -1
+
+    def hour(self, view_at: int) -> int:
+        """Local hour (0-23) of ``view_at``."""
+        return (view_at + self.utc_offset) % SECONDS_PER_DAY // 3600
+
+    def labels(self, fmt: str = "%m-%d") -> List[str]:
+        """One ``strftime`` label per day of the window, oldest first."""
+        return [time.strftime(fmt, time.gmtime((self.first_day + i) * SECONDS_PER_DAY))
+                for i in range(self.days)]
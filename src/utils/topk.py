@@ -0,0 +1,143 @@
+"""Top-k selection without sorting whole counters."""
+from __future__ import annotations
+
+import heapq
+from itertools import count as _count
+from typing import Dict, Hashable, Iterable, List, Mapping, Optional, Tuple
+
+__all__ = ["SpaceSaving", "TopK", "most_common"]
+
+
+def most_common(counter: Mapping[Hashable, int], k: int) -> List[Tuple[Hashable, int]]:
+    """The ``k`` largest ``(key, count)`` pairs; ties keep the mapping's order.
+
+    Same result as ``sorted(counter.items(), key=count, reverse=True)[:k]`` in
+    O(n log k) instead of sorting the whole mapping.
+    """
+    return heapq.nlargest(k, counter.items(), key=lambda kv: kv[1])
+
+
+class TopK:
+    """Exact counter that answers top-k queries while counts go up and down.
+
+    Every change pushes the new count onto a max-heap; outdated heap entries
+    are skipped when queried and the heap is rebuilt once it holds too many
+    of them. Ties are broken by the order in which keys were first counted.
+    """
+
+    def __init__(self, keys: Iterable[Hashable] = ()):
+        self.counts: Dict[Hashable, int] = {}
+        self._first_seen: Dict[Hashable, int] = {}
+        self._heap: List[Tuple[int, int, Hashable]] = []
+        self._seq = _count()
+        for key in keys:
+            self.add(key)
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def add(self, key: Hashable, n: int = 1) -> None:
+        value = self.counts.get(key, 0) + n
+        if value <= 0:
+            self.counts.pop(key, None)
+            return
+        self.counts[key] = value
+        order = self._first_seen.get(key)
+        if order is None:
+            order = self._first_seen[key] = next(self._seq)
+        heapq.heappush(self._heap, (-value, order, key))
+        if len(self._heap) > 2 * len(self.counts) + 64:
+            self._rebuild()
+
+    def remove(self, key: Hashable, n: int = 1) -> None:
+        self.add(key, -n)
+
+    def clear(self) -> None:
+        self.counts.clear()
+        self._first_seen.clear()
+        self._heap.clear()
+
+    def most_common(self, k: int) -> List[Tuple[Hashable, int]]:
+        """The ``k`` keys with the highest count, as ``(key, count)``."""
+        result: List[Tuple[Hashable, int]] = []
+        valid: List[Tuple[int, int, Hashable]] = []
+        heap = self._heap
+        while heap and len(result) < k:
+            entry = heapq.heappop(heap)
+            negative, _, key = entry
+            if self.counts.get(key) != -negative or any(key == seen for seen, _ in result):
+                continue  # 过期的条目
+            result.append((key, -negative))
+            valid.append(entry)
+        for entry in valid:
+            heapq.heappush(heap, entry)
+        return result
+
+    def top(self) -> Optional[Hashable]:
+        """The most common key, or None when nothing is counted."""
+        best = self.most_common(1)
+        return best[0][0] if best else None
+
+    def _rebuild(self) -> None:
+        self._first_seen = {key: self._first_seen[key] for key in self.counts}
+        self._heap = [(-value, self._first_seen[key], key) for key, value in self.counts.items()]
+        heapq.heapify(self._heap)
+
+
+class SpaceSaving:
+    """Space-Saving sketch: approximate heavy hitters in at most ``capacity`` counters.
+
+    While fewer than ``capacity`` distinct keys were seen the counts are
+    exact. Afterwards a new key replaces the smallest counter and inherits
+    its count, so counts may be overestimated by at most ``error(key)``, but
+    every key whose true count exceeds ``total / capacity`` is kept.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.counts: Dict[Hashable, int] = {}
+        self.errors: Dict[Hashable, int] = {}
+        self._heap: List[Tuple[int, int, Hashable]] = []
+        self._seq = _count()
+        self.total = 0
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def add(self, key: Hashable, n: int = 1) -> None:
+        self.total += n
+        if key in self.counts:
+            self.counts[key] += n
+            heapq.heappush(self._heap, (self.counts[key], next(self._seq), key))
+        elif len(self.counts) < self.capacity:
+            self.counts[key] = n
+            self.errors[key] = 0
+            heapq.heappush(self._heap, (n, next(self._seq), key))
+        else:
+            floor, victim = self._pop_min()
+            del self.counts[victim]
+            del self.errors[victim]
+            self.counts[key] = floor + n
+            self.errors[key] = floor
+            heapq.heappush(self._heap, (floor + n, next(self._seq), key))
+        if len(self._heap) > 2 * self.capacity + 64:
+            self._heap = [(value, next(self._seq), key) for key, value in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def update(self, counter: Mapping[Hashable, int]) -> None:
+        for key, n in counter.items():
+            self.add(key, n)
+
+    def error(self, key: Hashable) -> int:
+        return self.errors.get(key, 0)
+
+    def most_common(self, k: int) -> List[Tuple[Hashable, int]]:
+        return most_common(self.counts, k)
+
+    def _pop_min(self) -> Tuple[int, Hashable]:
+        while True:
+            value, _, key = heapq.heappop(self._heap)
+            if self.counts.get(key) == value:
+                return value, key
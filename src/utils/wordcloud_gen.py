@@ -5,16 +5,23 @@ from __future__ import annotations
 import base64
 import os
 from io import BytesIO
-from typing import Iterable, List
+from typing import Iterable, List, Optional
 
+from utils.metrics import span
 
+# 词云使用的中文字体，与界面字体相同
+FONT_PATH = os.path.join(os.path.dirname(__file__), "..", "static", "PingFang.otf")
+# 透明背景下使用中等亮度的配色，深色和浅色主题上都清晰
+TRANSPARENT_COLORMAP = "tab10"
 
-def generate_wordcloud(tags: Iterable[str], background_color: str = "#18191C") -> str:
+
+def generate_wordcloud(tags: Iterable[str], background_color: Optional[str] = "#18191C") -> str:
     """Generate a word cloud image encoded in base64.
 
     Args:
         tags: Iterable of tag strings.
-        background_color: Hex color string used as the background.
+        background_color: Hex color string used as the background, or None
+            for a transparent image that works with any theme.
 
     Returns:
         Base64-encoded PNG string.
@@ -26,30 +33,36 @@ def generate_wordcloud(tags: Iterable[str], background_color: str = "#18191C") -
     if not cleaned_tags:
         raise ValueError("tags is empty")
 
-    normalized_bg = _normalize_hex_color(background_color)
-
-    # 根据背景色确定词云文字的颜色属性
-    colormap = "viridis" if is_dark_color(normalized_bg) else "plasma"
-
-    font_path = os.path.join(os.path.dirname(__file__), "..", "static", "PingFang.otf")
+    if background_color is None:
+        normalized_bg = None
+        colormap = TRANSPARENT_COLORMAP
+    else:
+        normalized_bg = _normalize_hex_color(background_color)
+        # 根据背景色确定词云文字的颜色属性
+        colormap = "viridis" if is_dark_color(normalized_bg) else "plasma"
 
     from wordcloud import WordCloud
 
-    wordcloud = WordCloud(
-        width=800,
-        height=500,
-        font_path=font_path,
-        background_color=normalized_bg,
-        colormap=colormap,
-        min_font_size=10,
-        max_font_size=120,
-        random_state=42,
-    ).generate(" ".join(cleaned_tags))
-
-    buffer = BytesIO()
-    wordcloud.to_image().save(buffer, format="PNG")
-    buffer.seek(0)
-    return base64.b64encode(buffer.getvalue()).decode("utf-8")
+    with span("wordcloud.generate") as cloud_span:
+        wordcloud = WordCloud(
+            width=800,
+            height=500,
+            font_path=FONT_PATH,
+            background_color=normalized_bg,
+            mode="RGB" if normalized_bg else "RGBA",
+            colormap=colormap,
+            min_font_size=10,
+            max_font_size=120,
+            random_state=42,
+        ).generate(" ".join(cleaned_tags))
+
+        buffer = BytesIO()
+        wordcloud.to_image().save(buffer, format="PNG")
+        buffer.seek(0)
+        encoded = base64.b64encode(buffer.getvalue()).decode("utf-8")
+        cloud_span.count = len(cleaned_tags)
+        cloud_span.bytes = len(encoded)
+    return encoded
 
 
 def _sanitize_tags(tags: Iterable[str]) -> List[str]:
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# 与 src/main.py 一样以 src 为根导入 client、utils 和 ui
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
@@ -0,0 +1,104 @@
+import tempfile
+import threading
+import unittest
+
+from client.account_manager import SYNC_ERROR, SYNC_EXPIRED, SYNC_OK, AccountManager
+from client.api import HistoryFetchError
+from client.rate_limit import TokenBucket
+from client.storage import SessionStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeBilibili:
+    """Serve scripted history pages per account and record the request order."""
+
+    def __init__(self, pages, expired=(), failing=()):
+        self.pages = pages
+        self.expired = set(expired)
+        self.failing = set(failing)
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def _record(self, mid):
+        with self.lock:
+            self.calls.append(mid)
+
+    def get_nav(self, cookies):
+        mid = cookies["SESSDATA"]
+        self._record(mid)
+        if mid in self.expired:
+            return {"isLogin": False}
+        return {"isLogin": True, "mid": int(mid), "uname": f"user{mid}", "face": ""}
+
+    def iter_pages(self, cookies, days=7):
+        mid = cookies["SESSDATA"]
+        for number in range(self.pages.get(mid, 0)):
+            self._record(mid)
+            if mid in self.failing:
+                raise HistoryFetchError("boom")
+            yield [{"kid": f"{mid}-{number}", "view_at": 100 - number}]
+
+
+class TestAccountManager(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = SessionStore(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def add_account(self, mid):
+        self.store.save({"SESSDATA": mid}, {"mid": mid, "uname": f"user{mid}", "face": ""})
+
+    def make_manager(self, fake, workers=1, on_synced=None):
+        return AccountManager(self.store, max_workers=workers, rate_limiter=TokenBucket(1e6),
+                              get_nav=fake.get_nav, iter_pages=fake.iter_pages, on_synced=on_synced)
+
+    def test_pages_are_scheduled_round_robin(self):
+        self.add_account("1")
+        self.add_account("2")
+        fake = FakeBilibili({"1": 4, "2": 1})
+        synced = {}
+        results = self.make_manager(
+            fake, on_synced=lambda account, records: synced.update({account.mid: len(records)})).sync_all()
+        self.assertEqual(fake.calls, ["1", "2", "1", "2", "1", "1", "1"])
+        self.assertEqual({r["mid"]: r["records"] for r in results}, {"1": 4, "2": 1})
+        self.assertEqual(synced, {"1": 4, "2": 1})
+        self.assertEqual(len(self.store.history_store("1").load()), 4)
+
+    def test_expired_and_failed_accounts(self):
+        for mid in ("1", "2", "3"):
+            self.add_account(mid)
+        self.store.history_store("3").save([{"kid": "cached"}])
+        fake = FakeBilibili({"1": 2, "3": 1}, expired={"2"}, failing={"3"})
+        results = {r["mid"]: r for r in self.make_manager(fake, workers=3).sync_all()}
+        self.assertEqual(results["1"]["status"], SYNC_OK)
+        self.assertEqual(results["2"]["status"], SYNC_EXPIRED)
+        self.assertIsNone(self.store.load("2"))
+        self.assertEqual(results["3"]["status"], SYNC_ERROR)
+        self.assertEqual(self.store.history_store("3").load(), [{"kid": "cached"}])
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_then_steady_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, capacity=2, clock=clock, sleep=clock.sleep)
+        self.assertEqual([bucket.acquire() for _ in range(2)], [0, 0])
+        self.assertAlmostEqual(bucket.acquire(), 0.5)
+        self.assertAlmostEqual(bucket.try_acquire(), 0.5)
+        clock.now += 10
+        self.assertEqual([bucket.try_acquire() for _ in range(3)][:2], [0, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+from utils.analysis import generate_analysis_data, generate_personality_report
+from utils.time_buckets import DayBuckets
+
+# 2024-03-10 12:00:00 UTC+8
+NOW = 1710043200
+OFFSET = 8 * 3600
+
+
+class TestDayBuckets(unittest.TestCase):
+    def test_local_day_and_hour(self):
+        buckets = DayBuckets(7, now=NOW, utc_offset=OFFSET)
+        self.assertEqual(buckets.labels()[-1], "03-10")
+        self.assertEqual(buckets.labels()[0], "03-04")
+        self.assertEqual(buckets.start, NOW - 12 * 3600 - 6 * 86400)
+        self.assertEqual(buckets.day(NOW), 6)
+        self.assertEqual(buckets.day(buckets.start), 0)
+        self.assertEqual(buckets.day(buckets.start - 1), -1)
+        self.assertEqual(buckets.hour(NOW), 12)
+        # 本地凌晨 1 点是 UTC 前一天 17 点
+        self.assertEqual(buckets.hour(NOW - 11 * 3600), 1)
+
+
+class TestAnalysisData(unittest.TestCase):
+    def test_window_and_time_ranges(self):
+        history = [
+            {"view_at": NOW, "progress": 600, "tag_name": "知识", "author_name": "甲"},
+            {"view_at": NOW - 11 * 3600, "progress": -1, "duration": 300, "author_name": "甲"},
+            {"view_at": NOW - 20 * 86400, "progress": 60, "tag_name": "音乐"},
+            {"view_at": None, "progress": 0},
+        ]
+        data = generate_analysis_data(history, days=30, now=NOW, utc_offset=OFFSET)
+        self.assertEqual(len(data["daily_stats"]), 30)
+        self.assertEqual(data["daily_stats"][-1], {"date": "03-10", "count": 2, "progress": 15.0})
+        self.assertEqual(data["daily_stats"][9]["count"], 1)
+        self.assertEqual(data["time_distribution"], {"0-6点": 1, "6-12点": 0, "12-18点": 2, "18-24点": 0})
+        self.assertEqual(data["active_days"], 2)
+        self.assertEqual(data["viewing_streak"], 1)
+        self.assertEqual(data["top_up_name"], "甲")
+
+        week = generate_analysis_data(history, days=7, now=NOW, utc_offset=OFFSET)
+        self.assertEqual(sum(day["count"] for day in week["daily_stats"]), 2)
+        self.assertIn("过去 7 天", generate_personality_report(week))
+
+
+if __name__ == "__main__":
+    unittest.main()
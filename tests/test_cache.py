@@ -0,0 +1,47 @@
+import unittest
+
+from utils.cache import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertNotIn("b", cache)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_resize_evicts_when_shrinking(self):
+        cache = LRUCache(3)
+        for key in "abc":
+            cache.put(key, key)
+        cache.get("a")
+        cache.resize(1)
+        self.assertEqual(cache.maxsize, 1)
+        self.assertIn("a", cache)
+        self.assertEqual(cache.evictions, 2)
+        cache.resize(4)
+        cache.put("d", "d")
+        self.assertEqual(len(cache), 2)
+
+    def test_get_or_create_counts_hits_and_misses(self):
+        cache = LRUCache(4)
+        created = []
+        for key in ("x", "x", "y", "x"):
+            cache.get_or_create(key, lambda: created.append(key) or key.upper())
+        self.assertEqual(created, ["x", "y"])
+        self.assertEqual(cache.stats()["hits"], 2)
+        self.assertEqual(cache.stats()["misses"], 2)
+        self.assertEqual(cache.hit_rate, 0.5)
+
+    def test_cached_none_is_a_hit(self):
+        cache = LRUCache(1)
+        cache.put("k", None)
+        self.assertIsNone(cache.get_or_create("k", lambda: self.fail("recreated")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+from client.storage import SessionStore
+
+CLI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "cli.py")
+
+# 在同一进程内执行 CLI，结束后报告是否加载过 flet。
+_PROBE = """
+import json, os, runpy, sys
+sys.path.insert(0, os.path.dirname({cli!r}))
+sys.argv = {argv!r}
+try:
+    runpy.run_path({cli!r}, run_name="__main__")
+except SystemExit as exc:
+    code = exc.code
+print(json.dumps({{"code": code, "flet": "flet" in sys.modules}}))
+"""
+
+
+def make_record(kid, view_at):
+    return {"kid": kid, "title": f"视频{kid}", "author_name": "UP", "tag_name": "知识",
+            "view_at": view_at, "progress": 60, "duration": 120, "bvid": f"BV{kid}"}
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        store = SessionStore(self.tmp.name)
+        store.save({"SESSDATA": "abc"}, {"mid": 7, "uname": "测试", "face": ""})
+        now = int(time.time())
+        store.history_store(7).save([make_record(i, now - i * 600) for i in range(3)])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_cli(self, *args):
+        argv = [CLI, "--home", self.tmp.name, *args]
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(argv=argv, cli=CLI)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        *lines, status = output.strip().splitlines()
+        status = json.loads(status)
+        self.assertFalse(status["flet"])
+        return status["code"], "\n".join(lines)
+
+    def test_stats_json(self):
+        code, output = self.run_cli("stats", "--json")
+        self.assertEqual(code, 0)
+        data = json.loads(output)
+        self.assertEqual(data["total_videos"], 3)
+        self.assertEqual(data["top_category"], "知识")
+
+    def test_export_json(self):
+        out_dir = os.path.join(self.tmp.name, "exports")
+        code, output = self.run_cli("export", "--format", "json", "--output", out_dir)
+        self.assertEqual(code, 0)
+        with open(output.strip(), encoding="utf-8") as fp:
+            rows = json.load(fp)
+        self.assertEqual([row["bvid"] for row in rows], ["BV0", "BV1", "BV2"])
+        self.assertEqual(rows[0]["watch_duration_seconds"], 60)
+
+    def test_unknown_account_fails(self):
+        code, _ = self.run_cli("stats", "--account", "404")
+        self.assertEqual(code, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,27 @@
+import sys
+import unittest
+
+from utils.diagnostics import deep_sizeof, estimate_records_bytes, format_bytes, format_rate
+
+
+class TestDiagnostics(unittest.TestCase):
+    def test_deep_sizeof_counts_nested_and_shared_objects_once(self):
+        shared = "x" * 1000
+        record = {"title": shared, "tags": [shared, shared]}
+        size = deep_sizeof(record)
+        self.assertGreater(size, sys.getsizeof(shared))
+        self.assertLess(size, 2 * sys.getsizeof(shared))
+
+    def test_estimate_scales_with_record_count(self):
+        records = [{"title": f"video {i}" * 10, "view_at": i} for i in range(10_000)]
+        exact = deep_sizeof(records)
+        estimate = estimate_records_bytes(records, sample=100)
+        self.assertAlmostEqual(estimate / exact, 1.0, delta=0.1)
+        self.assertEqual(estimate_records_bytes([]), sys.getsizeof([]))
+
+    def test_formatting(self):
+        self.assertEqual(format_bytes(512), "512 B")
+        self.assertEqual(format_bytes(1536), "1.5 KB")
+        self.assertEqual(format_bytes(3 * 1024 ** 3), "3.0 GB")
+        self.assertEqual(format_rate(None), "-")
+        self.assertEqual(format_rate(0.875), "88%")
@@ -0,0 +1,58 @@
+import base64
+import importlib.util
+import unittest
+
+from utils.chart_image import heatmap_size, render_bar_series, render_heatmap
+
+
+@unittest.skipUnless(importlib.util.find_spec("PIL"), "Pillow is not installed")
+class TestRenderHeatmap(unittest.TestCase):
+    def test_png_size(self):
+        from PIL import Image
+        from io import BytesIO
+
+        matrix = [[(row * 24 + hour) % 5 for hour in range(24)] for row in range(7)]
+        png = base64.b64decode(render_heatmap(matrix, "#FB7299", "#232527", scale=1))
+        width, height = heatmap_size(7, 24)
+        self.assertEqual(Image.open(BytesIO(png)).size, (width, height))
+
+    def test_transparent_background(self):
+        from PIL import Image
+        from io import BytesIO
+
+        png = base64.b64decode(render_heatmap([[0, 1, 4]], "#FB7299", None, gap=3, scale=1))
+        image = Image.open(BytesIO(png))
+        self.assertEqual(image.mode, "RGBA")
+        self.assertEqual(image.getpixel((22 + 1, 11))[3], 0)  # 格子之间透明
+        empty, low, peak = (image.getpixel((x * 25 + 11, 11)) for x in range(3))
+        self.assertEqual(peak, (0xFB, 0x72, 0x99, 255))
+        self.assertLess(empty[3], low[3])
+
+
+@unittest.skipUnless(importlib.util.find_spec("PIL"), "Pillow is not installed")
+class TestRenderBarSeries(unittest.TestCase):
+    def test_bar_heights_follow_values(self):
+        from PIL import Image
+        from io import BytesIO
+
+        png = base64.b64decode(render_bar_series([0, 5, 10], "#FB7299", 30, 20, max_value=10, scale=1))
+        image = Image.open(BytesIO(png))
+        self.assertEqual((image.size, image.mode), ((30, 20), "RGBA"))
+
+        def height(x):
+            return sum(1 for y in range(20) if image.getpixel((x, y))[3])
+
+        self.assertEqual([height(5), height(15), height(25)], [1, 10, 20])
+        self.assertEqual(image.getpixel((9, 19))[3], 0)  # 柱子之间透明
+
+    def test_long_series_drops_gaps(self):
+        from PIL import Image
+        from io import BytesIO
+
+        png = base64.b64decode(render_bar_series([1] * 365, "#FB7299", 365, 10, scale=1))
+        image = Image.open(BytesIO(png))
+        self.assertTrue(all(image.getpixel((x, 9))[3] for x in range(365)))
+
+
+if __name__ == "__main__":
+    unittest.main()
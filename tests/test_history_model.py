@@ -0,0 +1,54 @@
+import unittest
+
+from utils.history_model import (
+    SORT_DURATION_ASC,
+    SORT_DURATION_DESC,
+    SORT_NEWEST,
+    HistoryIndex,
+    watch_seconds,
+)
+
+RECORDS = [
+    {"kid": 0, "title": "Python 教程", "author_name": "甲", "view_at": 300, "progress": 60, "duration": 100},
+    {"kid": 1, "title": "做饭", "author_name": "乙", "view_at": 500, "progress": -1, "duration": 100},
+    {"kid": 2, "title": "旅行", "author_name": "Python 爱好者", "view_at": 100, "progress": 60, "duration": 80},
+    {"kid": 3, "title": "音乐", "author": "丙", "view_at": "400", "progress": None, "duration": 10},
+]
+
+
+class TestHistoryIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = HistoryIndex(RECORDS, version=1)
+
+    def test_orders_match_a_stable_sort(self):
+        expected = {
+            SORT_NEWEST: sorted(RECORDS, key=lambda x: int(x["view_at"]), reverse=True),
+            SORT_DURATION_DESC: sorted(RECORDS, key=watch_seconds, reverse=True),
+            SORT_DURATION_ASC: sorted(RECORDS, key=watch_seconds),
+        }
+        for mode, records in expected.items():
+            self.assertEqual(self.index.ordered(mode), records, mode)
+        self.assertIs(self.index.ordered(SORT_NEWEST), self.index.ordered(SORT_NEWEST))
+
+    def test_select_combines_filters_in_sort_order(self):
+        self.assertEqual(self.index.select(SORT_NEWEST, query="python"), [0, 2])
+        self.assertEqual(self.index.select(SORT_DURATION_ASC, query="PYTHON"), [0, 2])
+        self.assertEqual(self.index.select(SORT_NEWEST, positions=[2, 3, 1]), [1, 3, 2])
+        self.assertEqual(self.index.select(SORT_NEWEST, predicate=lambda i: i != 1), [3, 0, 2])
+
+    def test_since_uses_the_view_at_cutoff(self):
+        self.assertEqual(self.index.count_since(400), 2)
+        self.assertEqual(self.index.since(400), [1, 3])
+        self.assertEqual(self.index.since(0), [1, 3, 0, 2])
+        self.assertEqual(self.index.since(501), [])
+        self.assertEqual(self.index.select(SORT_NEWEST, since=300), [1, 3, 0])
+        self.assertEqual(self.index.select(SORT_DURATION_DESC, since=300), [1, 0, 3])
+        self.assertEqual(self.index.select(SORT_DURATION_ASC, query="python", since=200), [0])
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            self.index.order("random")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from client import api
+
+from client.history_refresher import (
+    HistoryRefresher,
+    PageCounter,
+    fetch_history_since,
+    merge_history,
+    record_key,
+)
+
+
+def make_record(kid, view_at, progress=10):
+    return {"kid": kid, "view_at": view_at, "progress": progress}
+
+
+class TestMergeHistory(unittest.TestCase):
+    def test_added_updated_and_removed(self):
+        existing = [make_record(1, 300), make_record(2, 200), make_record(3, 50)]
+        incoming = [make_record(4, 500), make_record(2, 400, progress=99), make_record(1, 300)]
+        merged, delta = merge_history(existing, incoming, min_view_at=100)
+        self.assertEqual([item["kid"] for item in merged], [4, 2, 1])
+        self.assertEqual([item["kid"] for item in delta["added"]], [4])
+        self.assertEqual([item["kid"] for item in delta["updated"]], [2])
+        self.assertEqual(delta["removed"], ["3"])
+
+    def test_record_key_fallbacks(self):
+        self.assertEqual(record_key({"history": {"oid": 7, "business": "pgc"}}), "pgc:7")
+        self.assertEqual(record_key({"bvid": "BV1"}), "BV1")
+
+
+class TestFetchHistorySince(unittest.TestCase):
+    def test_stops_at_first_known_record(self):
+        pages = [[make_record(i, 1000 - i) for i in range(start, start + 3)] for start in (0, 3, 6)]
+        requested = []
+
+        def iter_pages(cookies, days):
+            for page in pages:
+                requested.append(page)
+                yield page
+
+        counter = PageCounter(iter_pages)
+        fresh = fetch_history_since({}, since=996, iter_pages=counter)
+        self.assertEqual([item["kid"] for item in fresh], [0, 1, 2, 3])
+        self.assertEqual(len(requested), 2)
+        self.assertEqual(counter.pages, 2)
+
+
+class TestPageCounter(unittest.TestCase):
+    def test_takes_a_token_per_request_sent(self):
+        class Bucket:
+            acquired = 0
+
+            def acquire(self):
+                Bucket.acquired += 1
+
+        now = int(time.time())
+        responses = [
+            {"list": [make_record(1, now)], "cursor": {"max": 1, "view_at": now}},
+            {"list": [make_record(2, now - 60)], "cursor": {"max": 2, "view_at": now - 60}},
+            {"list": []},
+        ]
+        with mock.patch.object(api, "fetch_history_page", side_effect=responses):
+            counter = PageCounter(api.iter_watch_history, rate_limiter=Bucket())
+            self.assertEqual(len(list(counter({}, days=7))), 2)
+        self.assertEqual(counter.pages, 2)
+        # 第三次请求返回空列表，同样计入；之后不再请求，也不再取令牌
+        self.assertEqual(Bucket.acquired, 3)
+
+        # 最后一条记录已超出时间范围时只请求一次
+        Bucket.acquired = 0
+        with mock.patch.object(api, "fetch_history_page",
+                               return_value={"list": [make_record(3, now - 30 * 86400)], "cursor": {"max": 3}}):
+            list(PageCounter(api.iter_watch_history, rate_limiter=Bucket())({}, days=7))
+        self.assertEqual(Bucket.acquired, 1)
+
+
+class TestHistoryRefresher(unittest.TestCase):
+    def test_trigger_interval_and_stop(self):
+        calls = threading.Semaphore(0)
+        refresher = HistoryRefresher(calls.release, interval=0)
+        refresher.start()
+        refresher.trigger()
+        self.assertTrue(calls.acquire(timeout=2))
+
+        refresher.set_interval(0.01)
+        self.assertTrue(calls.acquire(timeout=2))
+        self.assertTrue(calls.acquire(timeout=2))
+
+        refresher.stop()
+        thread = refresher._thread
+        if thread is not None:
+            thread.join(2)
+        self.assertFalse(refresher.running)
+
+
+if __name__ == "__main__":
+    unittest.main()
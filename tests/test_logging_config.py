@@ -0,0 +1,92 @@
+import logging
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from utils import logging_config
+from utils.log_handlers import DailyRotatingFileHandler
+from utils.logging_config import setup_logging, shutdown_logging
+
+
+class TestSetupLogging(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(logging.getLogger("biliinsight").handlers.clear)
+        self.addCleanup(shutdown_logging)
+
+    def _read_logs(self):
+        text = ""
+        for name in sorted(os.listdir(self.tmp.name)):
+            with open(os.path.join(self.tmp.name, name), encoding="utf-8") as fp:
+                text += fp.read()
+        return text
+
+    def test_records_are_written_by_the_listener_thread(self):
+        threads = []
+
+        class Recorder(logging.Handler):
+            def emit(self, record):
+                threads.append(threading.current_thread())
+
+        logger = setup_logging(self.tmp.name, level="DEBUG")
+        logging_config._listener.handlers += (Recorder(),)
+        logging.getLogger("biliinsight.test").debug("第%s页，%s", 3, "完成")
+        shutdown_logging()
+
+        self.assertIn("第3页，完成", self._read_logs())
+        self.assertTrue(threads)
+        self.assertNotIn(threading.current_thread(), threads)
+        self.assertEqual(len(logger.handlers), 1)
+
+    def test_mutable_arguments_are_formatted_at_call_time(self):
+        setup_logging(self.tmp.name, level="DEBUG")
+        payload = {"page": 1}
+        logging.getLogger("biliinsight.test").debug("参数：%s", payload)
+        payload["page"] = 2
+        shutdown_logging()
+
+        self.assertIn("参数：{'page': 1}", self._read_logs())
+
+    def test_level_controls_is_enabled_for(self):
+        logger = setup_logging(self.tmp.name, level="WARNING")
+        self.assertFalse(logger.isEnabledFor(logging.DEBUG))
+        logging.getLogger("biliinsight.test").info("只在控制台显示")
+        shutdown_logging()
+
+        self.assertNotIn("只在控制台显示", self._read_logs())
+
+
+class TestDailyRotatingFileHandler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _emit(self, handler, message):
+        handler.handle(logging.makeLogRecord({"msg": message, "levelno": logging.INFO}))
+
+    def test_rolls_over_by_size(self):
+        handler = DailyRotatingFileHandler(self.tmp.name, max_bytes=100, backup_count=2)
+        self.addCleanup(handler.close)
+        for i in range(10):
+            self._emit(handler, f"line {i} " + "x" * 40)
+
+        names = sorted(os.listdir(self.tmp.name))
+        base = os.path.basename(handler.baseFilename)
+        self.assertEqual(names, [base, base + ".1", base + ".2"])
+
+    def test_switches_file_at_midnight_and_removes_old_days(self):
+        old = os.path.join(self.tmp.name, "biliinsight_2023-12-31.log")
+        for path in (old, old + ".1"):
+            open(path, "w").close()
+        dates = iter(["2024-01-01", "2024-01-02", "2024-01-02", "2024-01-03", "2024-01-03"])
+        with mock.patch.object(DailyRotatingFileHandler, "_today", lambda self: next(dates)):
+            handler = DailyRotatingFileHandler(self.tmp.name, keep_days=2)
+            self.addCleanup(handler.close)
+            self._emit(handler, "first")
+            self._emit(handler, "second")
+
+        self.assertEqual(sorted(os.listdir(self.tmp.name)),
+                         ["biliinsight_2024-01-02.log", "biliinsight_2024-01-03.log"])
@@ -0,0 +1,123 @@
+import threading
+import unittest
+
+from client.login_poller import (
+    STATUS_EXPIRED,
+    STATUS_NOT_SCANNED,
+    STATUS_SCANNED,
+    STATUS_SUCCESS,
+    STATUS_TIMEOUT,
+    LoginPoller,
+)
+
+
+class ScriptedStatus:
+    """Return scripted statuses per QR key; the last one repeats forever."""
+
+    def __init__(self, scripts):
+        self.scripts = {key: list(values) for key, values in scripts.items()}
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, key):
+        with self.lock:
+            self.calls.append(key)
+            values = self.scripts[key]
+            status = values.pop(0) if len(values) > 1 else values[0]
+        return status, ({"SESSDATA": "x"} if status == STATUS_SUCCESS else None)
+
+
+def make_poller(check, **kwargs):
+    options = dict(fast_interval=0.001, idle_interval=0.001, max_idle_interval=0.005, timeout=5)
+    options.update(kwargs)
+    return LoginPoller(check, **options)
+
+
+class TestLoginPoller(unittest.TestCase):
+    def run_until_result(self, poller, key, on_status=None):
+        done = threading.Event()
+        results = []
+
+        def on_result(status, cookies):
+            results.append((status, cookies))
+            done.set()
+
+        poller.start(key, on_result, on_status)
+        self.assertTrue(done.wait(5))
+        return results
+
+    def test_reports_success_with_cookies(self):
+        check = ScriptedStatus({"a": [STATUS_NOT_SCANNED, STATUS_SCANNED, STATUS_SUCCESS]})
+        statuses = []
+        results = self.run_until_result(make_poller(check), "a", statuses.append)
+        self.assertEqual(results, [(STATUS_SUCCESS, {"SESSDATA": "x"})])
+        self.assertEqual(statuses, [STATUS_NOT_SCANNED, STATUS_SCANNED])
+
+    def test_expired_and_network_errors_finish_polling(self):
+        for status in (STATUS_EXPIRED, -1):
+            check = ScriptedStatus({"a": [status]})
+            results = self.run_until_result(make_poller(check), "a")
+            self.assertEqual(results, [(status, None)])
+            self.assertEqual(len(check.calls), 1)
+
+    def test_times_out(self):
+        check = ScriptedStatus({"a": [STATUS_NOT_SCANNED]})
+        results = self.run_until_result(make_poller(check, timeout=0.02), "a")
+        self.assertEqual(results, [(STATUS_TIMEOUT, None)])
+
+    def test_new_session_replaces_old_one_on_same_thread(self):
+        check = ScriptedStatus({"old": [STATUS_NOT_SCANNED], "new": [STATUS_SUCCESS]})
+        poller = make_poller(check, idle_interval=10, max_idle_interval=10)
+        stale = []
+        poller.start("old", lambda *args: stale.append(args))
+        results = self.run_until_result(poller, "new")
+        self.assertEqual(results[0][0], STATUS_SUCCESS)
+        self.assertEqual(stale, [])
+        self.assertNotIn("old", check.calls[check.calls.index("new"):])
+
+    def test_cancel_stops_worker(self):
+        check = ScriptedStatus({"a": [STATUS_NOT_SCANNED]})
+        poller = make_poller(check, idle_interval=10, max_idle_interval=10)
+        poller.start("a", lambda *args: self.fail("cancelled job reported a result"))
+        poller.cancel()
+        self.assertFalse(poller.active)
+        thread = poller._thread
+        if thread is not None:
+            thread.join(1)
+            self.assertFalse(thread.is_alive())
+
+    def test_failing_callback_does_not_stop_worker(self):
+        check = ScriptedStatus({"a": [STATUS_SUCCESS], "b": [STATUS_NOT_SCANNED, STATUS_SUCCESS]})
+        poller = make_poller(check)
+        failed = threading.Event()
+
+        def on_result(status, cookies):
+            failed.set()
+            raise RuntimeError("login handler failed")
+
+        with self.assertLogs("biliinsight.client.login_poller", "ERROR"):
+            poller.start("a", on_result)
+            self.assertTrue(failed.wait(5))
+            results = self.run_until_result(poller, "b")
+        self.assertEqual(results, [(STATUS_SUCCESS, {"SESSDATA": "x"})])
+
+    def test_check_error_is_reported_as_failure(self):
+        def check(key):
+            raise ConnectionError("offline")
+
+        with self.assertLogs("biliinsight.client.login_poller", "ERROR"):
+            results = self.run_until_result(make_poller(check), "a")
+        self.assertEqual(results, [(-1, None)])
+
+    def test_backoff_is_fast_after_scan_and_grows_while_idle(self):
+        poller = LoginPoller(lambda key: (0, None))
+        job = type("Job", (), {"idle_polls": 0})()
+        idle = [poller.next_delay(job, STATUS_NOT_SCANNED) for _ in range(5)]
+        self.assertEqual(idle, sorted(idle))
+        self.assertEqual(idle[-1], poller.max_idle_interval)
+        self.assertEqual(poller.next_delay(job, STATUS_SCANNED), poller.fast_interval)
+        self.assertEqual(poller.next_delay(job, STATUS_NOT_SCANNED), poller.idle_interval)
+
+
+if __name__ == "__main__":
+    unittest.main()
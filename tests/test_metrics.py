@@ -0,0 +1,61 @@
+import json
+import unittest
+from unittest import mock
+
+from client import api
+from utils.metrics import REGISTRY, MetricsRegistry
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_span_records_duration_items_and_bytes(self):
+        with self.registry.span("work") as current:
+            current.count = 3
+            current.bytes = 100
+        with self.assertRaises(ValueError):
+            with self.registry.span("work"):
+                raise ValueError("boom")
+
+        entry = self.registry.snapshot()["work"]
+        self.assertEqual((entry["calls"], entry["errors"], entry["count"], entry["bytes"]), (2, 1, 3, 100))
+        self.assertGreaterEqual(entry["max"], entry["p50"])
+
+    def test_timed_decorator(self):
+        @self.registry.timed("add")
+        def add(a, b):
+            return a + b
+
+        self.assertEqual(add(1, 2), 3)
+        self.assertEqual(add.__name__, "add")
+        self.assertEqual(self.registry.snapshot()["add"]["calls"], 1)
+
+    def test_exports(self):
+        for seconds in (0.1, 0.2, 0.3, 0.4):
+            self.registry.observe('api "page"', seconds, count=30, nbytes=1000)
+        data = json.loads(self.registry.to_json())
+        self.assertAlmostEqual(data['api "page"']["p50"], 0.3)
+        self.assertEqual(data['api "page"']["count"], 120)
+
+        text = self.registry.to_prometheus()
+        self.assertIn('biliinsight_span_seconds_count{span="api \\"page\\""} 4', text)
+        self.assertIn('biliinsight_span_bytes_total{span="api \\"page\\""} 4000', text)
+        self.assertIn("# TYPE biliinsight_span_seconds summary", text)
+
+
+class TestApiInstrumentation(unittest.TestCase):
+    def test_history_page_span(self):
+        response = mock.Mock(content=b"x" * 42)
+        response.json.return_value = {"code": 0, "data": {"list": [{}, {}], "cursor": {}}}
+        session = mock.Mock()
+        session.get.return_value = response
+        REGISTRY.reset()
+        with mock.patch.object(api, "_get_session", return_value=session):
+            api.fetch_history_page({}, {"ps": 30})
+        entry = REGISTRY.snapshot()["api.history_page"]
+        self.assertEqual((entry["calls"], entry["count"], entry["bytes"]), (1, 2, 42))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import pstats
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from utils import profiling
+
+
+def busy_loop(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patcher = mock.patch.object(profiling, "default_log_dir", return_value=tmp.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(profiling.set_profile_mode, profiling.profile_mode())
+
+    def test_off_writes_nothing(self):
+        profiling.set_profile_mode(profiling.PROFILE_OFF)
+        with profiling.profiled("action") as path:
+            busy_loop(0.001)
+        self.assertIsNone(path)
+        self.assertFalse(os.path.exists(profiling.profile_dir()))
+
+    def test_cprofile_writes_stats(self):
+        profiling.set_profile_mode(profiling.PROFILE_CPROFILE)
+        with profiling.profiled("action") as path:
+            busy_loop(0.01)
+
+        self.assertTrue(path.endswith("_action.prof"))
+        functions = {name for _, _, name in pstats.Stats(path).stats}
+        self.assertIn("busy_loop", functions)
+
+    def test_sample_writes_collapsed_stacks(self):
+        profiling.set_profile_mode(profiling.PROFILE_SAMPLE)
+        wrapped = profiling.profile_action("busy")(busy_loop)
+        wrapped(0.1)
+
+        names = os.listdir(profiling.profile_dir())
+        self.assertEqual(len(names), 1)
+        self.assertTrue(names[0].endswith("_busy.folded"))
+        with open(os.path.join(profiling.profile_dir(), names[0]), encoding="utf-8") as fp:
+            lines = fp.read().splitlines()
+        self.assertTrue(any("busy_loop (test_profiling.py:" in line for line in lines))
+        self.assertTrue(all(line.rsplit(" ", 1)[1].isdigit() for line in lines))
+
+    def test_nested_actions_write_one_file(self):
+        profiling.set_profile_mode(profiling.PROFILE_CPROFILE)
+        with profiling.profiled("outer"):
+            with profiling.profiled("inner") as inner:
+                busy_loop(0.001)
+
+        self.assertIsNone(inner)
+        self.assertEqual(len(os.listdir(profiling.profile_dir())), 1)
+
+    def test_concurrent_action_runs_unprofiled(self):
+        profiling.set_profile_mode(profiling.PROFILE_CPROFILE)
+        paths = []
+
+        def refresh():
+            with profiling.profiled("sync") as path:
+                paths.append(path)
+
+        with profiling.profiled("ui"):
+            thread = threading.Thread(target=refresh)
+            thread.start()
+            thread.join()
+
+        self.assertEqual(paths, [None])
+        self.assertEqual(len(os.listdir(profiling.profile_dir())), 1)
+
+    def test_env_values(self):
+        for value, mode in (("sample", profiling.PROFILE_SAMPLE), ("1", profiling.PROFILE_CPROFILE),
+                            ("0", profiling.PROFILE_OFF), ("false", profiling.PROFILE_OFF),
+                            (" off ", profiling.PROFILE_OFF), ("", profiling.PROFILE_OFF)):
+            self.assertEqual(profiling._mode_from_env(value), mode, value)
+        with self.assertLogs("biliinsight.utils.profiling", "WARNING"):
+            self.assertEqual(profiling._mode_from_env("perf"), profiling.PROFILE_OFF)
+
+    def test_rejects_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            profiling.set_profile_mode("perf")
@@ -0,0 +1,78 @@
+import json
+import unittest
+
+from client.history_refresher import record_key, rollup_retain_since
+from utils.analysis import generate_analysis_data, generate_rollup_analysis
+from utils.rollups import HistoryRollups
+from utils.time_buckets import DayBuckets
+
+# 2024-03-10 12:00:00 UTC+8，星期日
+NOW = 1710043200
+OFFSET = 8 * 3600
+
+RECORDS = [
+    {"kid": 1, "view_at": NOW, "progress": 600, "tag_name": "知识", "author_name": "甲"},
+    {"kid": 2, "view_at": NOW - 11 * 3600, "progress": -1, "duration": 300, "tag_name": "知识", "author_name": "甲"},
+    {"kid": 3, "view_at": NOW - 20 * 86400, "progress": 60, "tag_name": "音乐", "author_name": "乙"},
+]
+
+
+class TestHistoryRollups(unittest.TestCase):
+    def setUp(self):
+        self.rollups = HistoryRollups(utc_offset=OFFSET)
+        self.rollups.apply(RECORDS, record_key)
+
+    def test_matches_raw_analysis(self):
+        for days in (7, 30):
+            expected = generate_analysis_data(RECORDS, days=days, now=NOW, utc_offset=OFFSET)
+            if days == 7:
+                # 原始记录统计包含窗口外的记录，预聚合表只统计窗口内
+                expected = generate_analysis_data(RECORDS[:2], days=days, now=NOW, utc_offset=OFFSET)
+            self.assertEqual(generate_rollup_analysis(self.rollups, days=days, now=NOW), expected)
+
+    def test_hour_of_week_covers_the_same_window(self):
+        for days in (7, 30):
+            first_day = DayBuckets(days, now=NOW, utc_offset=OFFSET).first_day
+            data = generate_rollup_analysis(self.rollups, days=days, now=NOW)
+            self.assertEqual(sum(self.rollups.hour_of_week(first_day, days)), data["total_videos"])
+
+    def test_apply_is_idempotent_and_corrects_progress(self):
+        self.assertEqual(self.rollups.apply(RECORDS, record_key), 0)
+        rewatched = dict(RECORDS[0], progress=900)
+        self.assertEqual(self.rollups.apply([rewatched], record_key), 1)
+        today = (NOW + OFFSET) // 86400
+        self.assertEqual(self.rollups.day_totals[today], [2, 1200])
+
+        # 再次观看产生新的 view_at，算作一次新的观看
+        self.rollups.apply([dict(RECORDS[0], view_at=NOW + 60)], record_key)
+        self.assertEqual(self.rollups.day_totals[today][0], 3)
+
+    def test_retain_since_keeps_counts(self):
+        self.rollups.apply([], record_key, retain_since=NOW - 86400)
+        self.assertEqual(len(self.rollups), 2)
+        data = generate_rollup_analysis(self.rollups, days=30, now=NOW)
+        self.assertEqual(data["total_videos"], 3)
+
+    def test_growing_window_after_prune_does_not_double_count(self):
+        # 先按 30 天同步，再按 7 天同步一次，最后时间范围扩大到 30 天重新全量拉取
+        self.rollups.apply([], record_key, retain_since=rollup_retain_since(7, now=NOW))
+        self.assertEqual(self.rollups.apply(RECORDS, record_key, retain_since=rollup_retain_since(30, now=NOW)), 0)
+        data = generate_rollup_analysis(self.rollups, days=30, now=NOW)
+        self.assertEqual(data["total_videos"], len(RECORDS))
+
+    def test_round_trip_and_hour_of_week(self):
+        restored = HistoryRollups.from_dict(json.loads(json.dumps(self.rollups.to_dict())))
+        self.assertEqual(restored.to_dict(), self.rollups.to_dict())
+        self.assertEqual(restored.apply(RECORDS, record_key), 0)
+
+        buckets = DayBuckets(7, now=NOW, utc_offset=OFFSET)
+        table = restored.hour_of_week(buckets.first_day, 7)
+        self.assertEqual(sum(table), 2)
+        self.assertEqual(table[6 * 24 + 12], 1)  # 星期日 12 点
+        self.assertEqual(table[6 * 24 + 1], 1)
+
+        self.assertEqual(len(HistoryRollups.from_dict({"format": 0})), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+from utils.startup import DEFERRED_MODULES, IMPORT_BUDGET_MS
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# 与 main.py 相同的登录页导入链路，先导入 flet 以便只统计项目自身的开销。
+_PROBE = """
+import json, sys, time
+sys.path.insert(0, {src!r})
+import flet
+start = time.perf_counter()
+import utils.logging_config, client.bilibili_client, ui.login_screen
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{"elapsed_ms": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+@unittest.skipUnless(importlib.util.find_spec("flet"), "flet is not installed")
+class TestStartupImports(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # 取多次测量的最小值，避免测试并发运行时的偶发抖动
+        cls.result = min((cls._probe() for _ in range(3)), key=lambda result: result["elapsed_ms"])
+
+    @staticmethod
+    def _probe():
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(src=SRC_DIR)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+    def test_login_path_skips_deferred_modules(self):
+        loaded = set(self.result["modules"])
+        self.assertEqual([name for name in DEFERRED_MODULES if name in loaded], [])
+
+    def test_login_path_within_import_budget(self):
+        self.assertLess(self.result["elapsed_ms"], IMPORT_BUDGET_MS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import stat
+import tempfile
+import time
+import unittest
+from http.cookiejar import Cookie
+from unittest import mock
+
+from client import storage
+from client.storage import DEFAULT_SESSION_TTL, SessionStore, SettingsStore, cookies_to_dict
+
+USER = {"mid": 42, "uname": "测试", "face": "http://example.com/face.jpg"}
+
+
+def make_cookie(name, value, expires=None):
+    return Cookie(0, name, value, None, False, ".bilibili.com", True, True, "/", True,
+                  False, expires, False, None, None, {})
+
+
+class TestSessionStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = SessionStore(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_marks_active_account(self):
+        self.store.save({"SESSDATA": "abc", "bili_jct": "def"}, USER)
+        session = self.store.load()
+        self.assertEqual(session["cookies"], {"SESSDATA": "abc", "bili_jct": "def"})
+        self.assertEqual(session["user_info"], USER)
+        self.assertEqual(self.store.active_account(), "42")
+        self.assertEqual(self.store.list_accounts(), ["42"])
+        self.assertAlmostEqual(session["expires_at"], time.time() + DEFAULT_SESSION_TTL, delta=5)
+
+    def test_session_file_is_private(self):
+        self.store.save({"SESSDATA": "abc"}, USER)
+        mode = os.stat(self.store.account_dir(42) / "session.json").st_mode
+        self.assertEqual(stat.S_IMODE(mode), 0o600)
+
+    def test_expiry_comes_from_auth_cookie(self):
+        expires = int(time.time()) + 3600
+        jar = [make_cookie("SESSDATA", "abc", expires), make_cookie("bili_jct", "def")]
+        self.assertEqual(self.store.save(jar, USER)["expires_at"], expires)
+        self.assertEqual(cookies_to_dict(jar), {"SESSDATA": "abc", "bili_jct": "def"})
+
+    def test_expired_session_is_dropped(self):
+        jar = [make_cookie("SESSDATA", "abc", int(time.time()) - 1)]
+        self.store.save(jar, USER)
+        self.assertIsNone(self.store.load())
+        self.assertIsNone(self.store.active_account())
+
+    def test_clear_keeps_history(self):
+        self.store.save({"SESSDATA": "abc"}, USER)
+        self.store.history_store(42).save([{"kid": 1, "view_at": 10}])
+        self.store.clear()
+        self.assertIsNone(self.store.load(42))
+        self.assertEqual(self.store.history_store(42).load(), [{"kid": 1, "view_at": 10}])
+
+    def test_corrupt_files_are_ignored(self):
+        path = self.store.account_dir(42) / "session.json"
+        path.parent.mkdir(parents=True)
+        path.write_text("{not json", encoding="utf-8")
+        self.assertIsNone(self.store.load(42))
+        self.assertEqual(self.store.history_store(42).load(), [])
+
+
+class TestSettingsStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_file_is_read_once(self):
+        SettingsStore(self.tmp.name).set("dark_theme", False)
+        store = SettingsStore(self.tmp.name)
+        with mock.patch.object(storage, "_read_json", wraps=storage._read_json) as read:
+            for _ in range(5):
+                self.assertFalse(store.get("dark_theme", True))
+            store.set("dark_theme", True)
+            self.assertTrue(store.get("dark_theme"))
+        self.assertEqual(read.call_count, 1)
+        self.assertTrue(SettingsStore(self.tmp.name).get("dark_theme"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import random
+import unittest
+
+from utils.history_model import HistoryIndex, SelectionSummary, watch_seconds
+from utils.topk import SpaceSaving, TopK, most_common
+
+
+def brute_force(counter, k):
+    return sorted(counter.items(), key=lambda kv: kv[1], reverse=True)[:k]
+
+
+class TestTopK(unittest.TestCase):
+    def test_most_common_matches_sorting(self):
+        counter = {"a": 3, "b": 5, "c": 3, "d": 1}
+        self.assertEqual(most_common(counter, 3), brute_force(counter, 3))
+
+    def test_incremental_updates_match_recount(self):
+        rng = random.Random(7)
+        topk = TopK()
+        counts = {}
+        for _ in range(2000):
+            key = rng.choice("abcdefghij")
+            n = 1 if rng.random() < 0.6 or not counts.get(key) else -1
+            topk.add(key, n)
+            counts[key] = counts.get(key, 0) + n
+            expected = {k: v for k, v in counts.items() if v > 0}
+            self.assertEqual(topk.counts, expected)
+            top = topk.most_common(3)
+            self.assertEqual([v for _, v in top], sorted(expected.values(), reverse=True)[:3])
+        self.assertLess(len(topk._heap), 2 * len(topk) + 65)
+
+    def test_ties_prefer_first_seen(self):
+        topk = TopK(["x", "y", "y", "x"])
+        self.assertEqual(topk.top(), "x")
+        topk.remove("x", 2)
+        self.assertEqual(topk.most_common(5), [("y", 2)])
+        topk.remove("y", 2)
+        self.assertIsNone(topk.top())
+
+
+class TestSpaceSaving(unittest.TestCase):
+    def test_exact_below_capacity(self):
+        sketch = SpaceSaving(10)
+        sketch.update({"a": 3, "b": 1})
+        sketch.add("a")
+        self.assertEqual(sketch.counts, {"a": 4, "b": 1})
+        self.assertEqual(sketch.error("a"), 0)
+
+    def test_keeps_heavy_hitters(self):
+        rng = random.Random(1)
+        sketch = SpaceSaving(20)
+        stream = ["hot"] * 300 + ["warm"] * 150 + [f"cold{i}" for i in range(500)]
+        rng.shuffle(stream)
+        for key in stream:
+            sketch.add(key)
+        self.assertEqual(len(sketch), 20)
+        self.assertEqual([key for key, _ in sketch.most_common(2)], ["hot", "warm"])
+        self.assertLessEqual(sketch.counts["hot"] - sketch.error("hot"), 300)
+        self.assertGreaterEqual(sketch.counts["hot"], 300)
+
+
+class TestSelectionSummary(unittest.TestCase):
+    def test_incremental_matches_recount(self):
+        rng = random.Random(3)
+        records = [
+            {"view_at": i, "progress": rng.randint(0, 600), "tag_name": rng.choice(["知识", "音乐", ""]),
+             "author_name": rng.choice(["甲", "乙", "丙"])}
+            for i in range(200)
+        ]
+        index = HistoryIndex(records, version=1)
+        summary = SelectionSummary()
+        for _ in range(30):
+            selected = rng.sample(range(200), rng.randint(0, 200))
+            summary.update(index, selected)
+            self.assertEqual(len(summary), len(selected))
+            self.assertEqual(summary.seconds, sum(watch_seconds(records[i]) for i in selected))
+            authors = {}
+            for i in selected:
+                authors[records[i]["author_name"]] = authors.get(records[i]["author_name"], 0) + 1
+            self.assertEqual(summary.authors.counts, authors)
+
+
+if __name__ == "__main__":
+    unittest.main()
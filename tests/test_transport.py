@@ -0,0 +1,105 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from client import api
+from client.synthetic import generate_history, history_cassette, synthetic_transport
+from client.transport import (
+    REDACTED,
+    RecordingTransport,
+    ReplayTransport,
+    load_cassette,
+    set_transport,
+)
+
+
+class TestSyntheticHistory(unittest.TestCase):
+    def test_records_are_deterministic_and_within_window(self):
+        now = 1_700_000_000
+        records = generate_history(500, days=7, now=now, seed=3)
+        self.assertEqual(records, generate_history(500, days=7, now=now, seed=3))
+        self.assertEqual(len({item["kid"] for item in records}), 500)
+        view_at = [item["view_at"] for item in records]
+        self.assertEqual(view_at, sorted(view_at, reverse=True))
+        self.assertTrue(all(now - 7 * 86400 < ts <= now for ts in view_at))
+
+    def test_cassette_pages_end_with_an_empty_list(self):
+        entries = history_cassette(generate_history(65, seed=1), page_size=30)
+        self.assertEqual([len(e["body"]["data"]["list"]) for e in entries], [30, 30, 5, 0])
+
+
+class TestReplayTransport(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(set_transport, None)
+
+    def test_sync_pages_through_synthetic_history(self):
+        transport = synthetic_transport(200, days=7)
+        set_transport(transport)
+        history = api.get_watch_history({}, days=7)
+        self.assertEqual(len(history), 200)
+        self.assertEqual(transport.requests, 8)  # 7 页 + 末尾的空页
+
+    def test_injected_errors_and_latency(self):
+        transport = synthetic_transport(100, error_rate=1.0, latency_ms=5, seed=0)
+        set_transport(transport)
+        start = time.perf_counter()
+        self.assertEqual(api.get_watch_history({}, days=7), [])
+        self.assertGreaterEqual(time.perf_counter() - start, 0.005)
+        self.assertEqual(transport.errors, 1)
+
+    def test_unrecorded_request_is_a_404(self):
+        set_transport(ReplayTransport([]))
+        self.assertIsNone(api.get_nav_info({}))
+
+    def test_old_recordings_are_shifted_to_now(self):
+        old = generate_history(40, days=7, now=1_600_000_000)
+        set_transport(ReplayTransport(history_cassette(old)))
+        history = api.get_watch_history({}, days=7)
+        self.assertEqual(len(history), 40)
+        self.assertGreater(history[0]["view_at"], time.time() - 60)
+
+
+class TestRecordingTransport(unittest.TestCase):
+    def test_records_exchanges_without_cookie_values(self):
+        response = mock.Mock(status_code=200)
+        response.json.return_value = {"code": 0, "data": {"isLogin": True, "uname": "u", "mid": 1, "face": ""}}
+        response.cookies.keys.return_value = ["SESSDATA"]
+        session = mock.Mock()
+        session.get.return_value = response
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cassette.jsonl")
+            set_transport(RecordingTransport(path, session=session))
+            self.addCleanup(set_transport, None)
+            self.assertEqual(api.get_user_info({"SESSDATA": "secret"})["mid"], 1)
+
+            entries = load_cassette(path)
+            self.assertEqual(entries[0]["path"], "/x/web-interface/nav")
+            self.assertEqual(entries[0]["cookies"], {"SESSDATA": REDACTED})
+            self.assertNotIn("secret", open(path, encoding="utf-8").read())
+
+            set_transport(ReplayTransport(entries))
+            self.assertEqual(api.get_user_info({})["uname"], "u")
+
+    def test_login_poll_response_is_redacted(self):
+        login_url = "https://passport.biligame.com/x/passport-mng/crossDomain?SESSDATA=secret&bili_jct=secret"
+        response = mock.Mock(status_code=200)
+        response.json.return_value = {"code": 0, "data": {
+            "url": login_url, "refresh_token": "secret", "timestamp": 1, "code": 0, "message": ""}}
+        response.cookies.keys.return_value = ["SESSDATA", "bili_jct"]
+        session = mock.Mock()
+        session.get.return_value = response
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cassette.jsonl")
+            set_transport(RecordingTransport(path, session=session))
+            self.addCleanup(set_transport, None)
+            self.assertEqual(api.check_login_status("key")[0], 0)
+
+            self.assertNotIn("secret", open(path, encoding="utf-8").read())
+            entry = load_cassette(path)[0]
+            self.assertEqual(entry["body"]["data"]["url"], REDACTED)
+            self.assertEqual(entry["body"]["data"]["refresh_token"], REDACTED)
+            self.assertEqual(entry["body"]["data"]["code"], 0)
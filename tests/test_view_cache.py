@@ -0,0 +1,78 @@
+import unittest
+
+import flet as ft
+
+from ui.view_cache import ViewCache, count_controls
+
+
+class _ContentArea(ft.Container):
+    """Content area that is not on a page; counts updates instead of sending them."""
+
+    def __init__(self):
+        super().__init__()
+        self.updates = 0
+
+    def update(self):
+        self.updates += 1
+
+
+def _view(size):
+    return ft.Column([ft.Text(str(i)) for i in range(size - 1)])
+
+
+class TestViewCache(unittest.TestCase):
+    def setUp(self):
+        self.area = _ContentArea()
+        self.builds = []
+
+    def builder(self, name, size=3, refresh=None):
+        def build():
+            self.builds.append(name)
+            self.area.content = _view(size)
+            return refresh
+        return build
+
+    def test_count_controls(self):
+        self.assertEqual(count_controls(ft.Container(content=_view(4))), 5)
+
+    def test_reuses_tree_while_version_unchanged(self):
+        views = ViewCache(self.area)
+        self.assertFalse(views.show("history", 1, self.builder("history")))
+        history = self.area.content
+        views.show("analysis", 1, self.builder("analysis"))
+        self.assertTrue(views.show("history", 1, self.builder("history")))
+        self.assertIs(self.area.content, history)
+        self.assertEqual(self.builds, ["history", "analysis"])
+
+        views.show("analysis", 2, self.builder("analysis"))
+        self.assertEqual(self.builds, ["history", "analysis", "analysis"])
+
+    def test_stale_view_with_refresh_is_refreshed_in_place(self):
+        refreshed = []
+        views = ViewCache(self.area)
+        views.show("history", 1, self.builder("history", refresh=lambda: refreshed.append(True)))
+        views.show("settings", 1, self.builder("settings"), cache=False)
+        self.assertTrue(views.show("history", 2, self.builder("history")))
+        self.assertEqual((self.builds, refreshed), (["history", "settings"], [True]))
+        self.assertNotIn("settings", views)
+
+    def test_keeps_tree_the_view_rendered_itself(self):
+        views = ViewCache(self.area)
+        views.show("analysis", 1, self.builder("analysis"))
+        other_range = self.area.content = _view(5)
+        views.show("history", 1, self.builder("history"))
+        views.show("analysis", 1, self.builder("analysis"))
+        self.assertIs(self.area.content, other_range)
+
+    def test_evicts_hidden_views_over_the_control_budget(self):
+        views = ViewCache(self.area, max_controls=10)
+        views.show("history", 1, self.builder("history", size=8))
+        views.show("analysis", 1, self.builder("analysis", size=5))
+        views.show("wordcloud", 1, self.builder("wordcloud", size=3))
+        self.assertNotIn("history", views)
+        self.assertIn("analysis", views)
+        self.assertEqual(views.stats()["evictions"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 
-from src.utils.wordcloud_gen import _normalize_hex_color, _sanitize_tags, is_dark_color
+from utils.wordcloud_gen import _normalize_hex_color, _sanitize_tags, is_dark_color
 
 
 class TestWordCloudHelpers(unittest.TestCase):